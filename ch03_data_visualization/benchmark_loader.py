@@ -0,0 +1,85 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import sys, os, csv, time, tempfile, tracemalloc, argparse
+import numpy as np
+from data_loader import loadTypedCSV, loadCachedCSV, IRIS_SCHEMA, IRIS_CATEGORIES
+
+def parseCommandLine():
+    """Use argparse to parse the command line for how many times the iris rows
+    are repeated in the scaled-up file."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-s", "--scale", type=int, default=5000,
+        help="Number of copies of the iris rows in the benchmark file")
+    args = vars(parser.parse_args())
+    return args
+
+def createScaledFile(source_name, scale):
+    """Write a copy of the iris dataset with its rows repeated scale times.
+    Return the path of the temporary file."""
+    with open(source_name, "r", newline="") as csv_f:
+        rows = list(csv.reader(csv_f))
+    header, rows = rows[0], rows[1:]
+
+    fd, scaled_name = tempfile.mkstemp(suffix=".csv")
+    with os.fdopen(fd, "w", newline="") as csv_f:
+        writer = csv.writer(csv_f)
+        writer.writerow(header)
+        for _ in range(scale):
+            writer.writerows(rows)
+    return scaled_name
+
+def loadStringArray(file_name):
+    """The original loader: a string array converted column by column, with the
+    labels encoded in a Python loop."""
+    with open(file_name, "r") as csv_f:
+        reader = csv.reader(csv_f)
+        header_labels = next(reader)
+        data = np.array(list(reader))
+
+    columns = [data[:, i].astype(float) for i in range(4)]
+    encoded_labels = []
+    for label in data[:, 4].astype(str):
+        if label == "Setosa":
+            encoded_labels.append(0)
+        elif label == "Versicolor":
+            encoded_labels.append(1)
+        elif label == "Virginica":
+            encoded_labels.append(2)
+    return data, columns, encoded_labels
+
+def loadTyped(file_name):
+    """Parse the file with the schema-aware loader."""
+    return loadTypedCSV(file_name, IRIS_SCHEMA, IRIS_CATEGORIES)
+
+def loadCached(file_name):
+    """Read the file through its binary sidecar cache."""
+    return loadCachedCSV(file_name, IRIS_SCHEMA, IRIS_CATEGORIES)
+
+def measure(load, file_name):
+    """Return the time in seconds and the peak memory in MB used by load()."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    load(file_name)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 ** 2
+
+if __name__ == "__main__":
+    args = parseCommandLine()
+    scaled_name = createScaledFile("files/iris.csv", args["scale"])
+    try:
+        # The first call to loadCached() builds the cache; the measured call reads it
+        print("Rows: {}".format(len(loadCached(scaled_name)[0])))
+        for name, load in [("string array", loadStringArray), ("typed loader", loadTyped),
+            ("cached loader", loadCached)]:
+            elapsed, peak = measure(load, scaled_name)
+            print("{:<14} {:8.3f} s  {:9.1f} MB peak".format(name, elapsed, peak))
+    finally:
+        os.remove(scaled_name)
+        if os.path.exists(scaled_name + ".cache.npz"):
+            os.remove(scaled_name + ".cache.npz")
+    sys.exit(0)
@@ -0,0 +1,58 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import sys, time, argparse
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+from matplotlib_canvas import CreateCanvas
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the size of the scatter plot
+    and the number of simulated pan steps."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--points", type=int, default=100000,
+        help="Number of points in the scatter plot")
+    parser.add_argument("-s", "--steps", type=int, default=50,
+        help="Number of pan steps to time")
+    args = vars(parser.parse_args())
+    return args
+
+def timePan(canvas, steps, interactive):
+    """Shift the x limits like a pan does and draw after each step.
+    Return the mean redraw time in milliseconds."""
+    axes = canvas.axes
+    x_min, x_max = axes.get_xlim()
+    step = (x_max - x_min) / (4 * steps)
+
+    if interactive:
+        canvas.startInteractiveRedraw()
+    start = time.perf_counter()
+    for i in range(1, steps + 1):
+        axes.set_xlim(x_min + i * step, x_max + i * step)
+        canvas.draw()
+    elapsed = time.perf_counter() - start
+    if interactive:
+        canvas.stopInteractiveRedraw()
+    axes.set_xlim(x_min, x_max)
+    return 1000 * elapsed / steps
+
+if __name__ == "__main__":
+    args = parseCommandLine()
+    app = QApplication(sys.argv)
+
+    rng = np.random.default_rng(50)
+    x, y = rng.normal(size=(2, args["points"]))
+    canvas = CreateCanvas()
+    canvas.axes.scatter(x, y, s=10, c=rng.integers(0, 3, args["points"]), alpha=0.4)
+    canvas.axes.set_title("{} points".format(args["points"]))
+    canvas.axes.grid(True)
+    canvas.resize(600, 500)
+    canvas.draw()
+
+    print("Full redraw:        {:7.1f} ms per pan step".format(
+        timePan(canvas, args["steps"], interactive=False)))
+    print("Interactive redraw: {:7.1f} ms per pan step".format(
+        timePan(canvas, args["steps"], interactive=True)))
+    sys.exit(0)
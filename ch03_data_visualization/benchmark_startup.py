@@ -0,0 +1,33 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import sys, re, time, statistics, subprocess, argparse
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the number of runs."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--runs", type=int, default=5,
+        help="Number of cold starts of pyqt_matplotlib.py for each mode")
+    args = vars(parser.parse_args())
+    return args
+
+def coldStart(extra_args):
+    """Start pyqt_matplotlib.py in a new interpreter with --startup-report.
+    Return the reported times and the time until the process exited."""
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "pyqt_matplotlib.py", "--startup-report"] + extra_args,
+        capture_output=True, text=True, check=True).stdout
+    process_time = time.perf_counter() - start
+    first_paint, built = [float(value) for value in re.findall(r"([\d.]+) s", output)]
+    return first_paint, built, process_time
+
+if __name__ == "__main__":
+    args = parseCommandLine()
+    for name, extra_args in [("eager", ["--eager"]), ("lazy", [])]:
+        runs = [coldStart(extra_args) for _ in range(args["runs"])]
+        first_paint, built, process_time = [statistics.median(values) for values in zip(*runs)]
+        print("{:<6} first paint {:.3f} s, figures built {:.3f} s, process exited {:.3f} s".format(
+            name, first_paint, built, process_time))
+    sys.exit(0)
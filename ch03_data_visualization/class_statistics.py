@@ -0,0 +1,73 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import numpy as np
+from data_loader import loadCachedArrays
+
+def computeClassStatistics(labels, x_values, y_values, class_count, bins=15):
+    """Group the rows by their encoded label and compute, for every class at once,
+    a histogram of x_values (each class over its own range, like Axes.hist()) and
+    the regression line of y_values on x_values. The regression line for all of the
+    rows is included as well. Return a dict of arrays:
+        counts: rows in each class
+        hist_counts, hist_edges: (class_count, bins) counts and (class_count, bins + 1) edges
+        slopes, intercepts: regression line for each class (NaN if it can't be fitted)
+        slope_all, intercept_all: regression line for all of the rows"""
+    labels = np.asarray(labels)
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float)
+
+    # Sums for each class in one pass each, with bincount
+    def classSums(weights):
+        return np.bincount(labels, weights=weights, minlength=class_count)
+    counts = np.bincount(labels, minlength=class_count)
+    sum_x, sum_y = classSums(x_values), classSums(y_values)
+    sum_xx, sum_xy = classSums(x_values * x_values), classSums(x_values * y_values)
+
+    # Least squares lines from the sums, slope = Sxy / Sxx; the last entry uses the 
+    # totals for all of the classes
+    def leastSquares(n, sum_x, sum_y, sum_xx, sum_xy):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            s_xx = sum_xx - sum_x * sum_x / n
+            s_xy = sum_xy - sum_x * sum_y / n
+            slopes = np.where(s_xx > 0, s_xy / s_xx, np.nan)
+            return slopes, (sum_y - slopes * sum_x) / n
+    sums = np.stack([counts, sum_x, sum_y, sum_xx, sum_xy])
+    sums = np.hstack([sums, sums.sum(axis=1, keepdims=True)])
+    slopes, intercepts = leastSquares(*sums)
+
+    # Histogram edges over each class's own range, then one bincount for every class
+    x_min = np.full(class_count, np.inf)
+    x_max = np.full(class_count, -np.inf)
+    np.minimum.at(x_min, labels, x_values)
+    np.maximum.at(x_max, labels, x_values)
+    x_min[counts == 0], x_max[counts == 0] = 0.0, 1.0
+    # Axes.hist() widens an empty range by 0.5 on either side
+    same = x_min == x_max
+    x_min[same], x_max[same] = x_min[same] - 0.5, x_max[same] + 0.5
+
+    # Same edges and rounding corrections as np.histogram(), so the counts match it
+    hist_edges = np.linspace(x_min, x_max, bins + 1, axis=1)
+    scale = bins / (x_max - x_min)
+    bin_index = ((x_values - x_min[labels]) * scale[labels]).astype(int)
+    bin_index[bin_index == bins] -= 1
+    bin_index[x_values < hist_edges[labels, bin_index]] -= 1
+    bin_index[(x_values >= hist_edges[labels, bin_index + 1]) & (bin_index != bins - 1)] += 1
+
+    hist_counts = np.bincount(labels * bins + bin_index,
+        minlength=class_count * bins).reshape(class_count, bins)
+
+    return {"counts": counts, "hist_counts": hist_counts, "hist_edges": hist_edges,
+        "slopes": slopes[:-1], "intercepts": intercepts[:-1],
+        "slope_all": slopes[-1], "intercept_all": intercepts[-1]}
+
+def loadClassStatistics(file_name, data, label_field, x_field, y_field, class_count, bins=15):
+    """Return computeClassStatistics() for the columns of data, which was loaded from
+    file_name. The results are cached in file_name + ".stats.npz" and only computed
+    again when the file or the parameters change."""
+    params = {"label": label_field, "x": x_field, "y": y_field,
+        "class_count": class_count, "bins": bins}
+    return loadCachedArrays(file_name, ".stats.npz", params, lambda: computeClassStatistics(
+        data[label_field], data[x_field], data[y_field], class_count, bins))
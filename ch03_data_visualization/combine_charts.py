@@ -3,12 +3,32 @@ Written by Joshua Willman
 Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
 """
 # Import necessary modules
-import sys, csv
+import sys, argparse
 import numpy as np
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout
 from PyQt5.QtChart import QChart, QChartView, QScatterSeries, QLineSeries
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor
+from online_regression import RegressionAccumulator
+from density_scatter import DensityScatter, DensityChartView
+from data_loader import loadCachedCSV
+
+# Above this many points the scatter series is drawn with DensityScatter in "auto" mode
+DENSITY_THRESHOLD = 20000
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the data file and how the 
+    scatter points are rendered."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-f", "--file", type=str, default="files/auto_insurance_sweden.csv",
+        help="CSV file with x and y values in the first two columns and no header")
+    parser.add_argument("-r", "--render-mode", type=str, 
+        choices=['auto', 'scatter', 'density'], default="auto",
+        help="Select how the points are drawn: scatter = a QScatterSeries point for \
+            every value; density = a 2D histogram until zoomed in; auto = density \
+            for more than {} points".format(DENSITY_THRESHOLD))
+    args = vars(parser.parse_args())
+    return args
 
 def linearRegression(x_values, y_values):
     """Find the regression line that fits best to the data.
@@ -32,8 +52,10 @@ def linearRegression(x_values, y_values):
 
 class DisplayGraph(QWidget):
 
-    def __init__(self):
+    def __init__(self, file_name="files/auto_insurance_sweden.csv", render_mode="auto"):
         super().__init__()
+        self.file_name = file_name
+        self.render_mode = render_mode
         self.initializeUI()
 
     def initializeUI(self):
@@ -51,15 +73,19 @@ class DisplayGraph(QWidget):
         # Collect x and y data values from the CSV file
         x_values, y_values = self.loadCSVFile()
 
-        # Get the largest x and y values; Used for setting the chart's axes 
-        x_max, y_max = max(x_values), max(y_values)
-        
-        # Create numpy arrays from the x and y values 
-        x_values = np.array(x_values)
-        y_values = np.array(y_values)
+        # Get the largest x and y values; Used for setting the chart's axes. An empty
+        # file shows empty axes from 0 to 1
+        if x_values.size == 0:
+            x_min, x_max, y_max = 0.0, 1.0, 1.0
+        else:
+            x_min, x_max, y_max = x_values.min(), x_values.max(), y_values.max()
+
+        use_density = (self.render_mode == "density" or 
+            (self.render_mode == "auto" and len(x_values) > DENSITY_THRESHOLD))
 
-        # Calculate the regression line 
-        coefficients = linearRegression(x_values, y_values)
+        # Keep running statistics for the regression line so that it can be updated 
+        # in O(1) when points are added with addDataPoint()
+        self.regression = RegressionAccumulator.fromArrays(x_values, y_values)
 
         # Create chart object
         chart = QChart()
@@ -67,23 +93,26 @@ class DisplayGraph(QWidget):
         chart.legend().hide()
         
         # Create scatter series and add points to the series
-        scatter_series = QScatterSeries()
+        self.scatter_series = scatter_series = QScatterSeries()
         scatter_series.setName("DataPoints")
         scatter_series.setMarkerSize(9.0)
-        scatter_series.hovered.connect(self.displayPointInfo)
-
-        for value in range(0, self.row_count - 1):
-            scatter_series.append(x_values[value], y_values[value])
-            scatter_series.setBorderColor(QColor('#000000'))
-
-        # Create line series and add points to the series
-        line_series = QLineSeries()
+        scatter_series.setBorderColor(QColor('#000000'))
+
+        if use_density:
+            # Points are added to the series by DensityScatter once the chart is zoomed 
+            # in; picking uses its spatial index instead of a signal from each point
+            self.density_scatter = DensityScatter(chart, scatter_series, x_values, y_values)
+            self.density_scatter.point_picked.connect(self.displayPointInfo)
+        else:
+            scatter_series.hovered.connect(self.displayPointInfo)
+            for value in range(0, self.row_count - 1):
+                scatter_series.append(x_values[value], y_values[value])
+
+        # Create line series; the regression line only needs its two end points
+        self.line_series = line_series = QLineSeries()
         line_series.setName("RegressionLine")
-
-        # Calculate the regression line
-        for x in x_values:
-            y_pred = coefficients[0] + coefficients[1] * x
-            line_series.append(x, y_pred)
+        self.x_range = [x_min, x_max]
+        self.updateRegressionLine()
 
         # Add both series to the chart and create x and y axes
         chart.addSeries(scatter_series)
@@ -100,38 +129,55 @@ class DisplayGraph(QWidget):
         axis_y[0].setRange(0, y_max + 20)
 
         # Create QChartView object for displaying the chart 
-        chart_view = QChartView(chart)
+        if use_density:
+            self.density_scatter.attachAxes(axis_x[0], axis_y[0])
+            chart_view = DensityChartView(chart, self.density_scatter)
+        else:
+            chart_view = QChartView(chart)
 
         v_box = QVBoxLayout()
         v_box.addWidget(chart_view)
         self.setLayout(v_box)
 
+    def addDataPoint(self, x, y):
+        """Add a new point to the scatter series and update the regression line
+        without recomputing it from all of the points. Used with the "scatter" 
+        render mode; DensityScatter owns the series' points in the other modes."""
+        self.scatter_series.append(x, y)
+        self.regression.addPoint(x, y)
+        self.x_range = [min(self.x_range[0], x), max(self.x_range[1], x)]
+        self.updateRegressionLine()
+
+    def updateRegressionLine(self):
+        """Draw the regression line across the range of x values. The line is hidden
+        while there are fewer than two points with different x values."""
+        self.line_series.clear()
+        try:
+            a_intercept, b_slope = self.regression.coefficients()
+        except ValueError:
+            self.line_series.hide()
+            return
+        self.line_series.show()
+        for x in self.x_range:
+            self.line_series.append(x, a_intercept + b_slope * x)
+
     def displayPointInfo(self, point):
         """Demonstration that series can be interacted with."""
         print("(X: {}, Y: {})".format(point.x(), point.y()))
 
     def loadCSVFile(self):
         """Load data from CSV file for the scatter chart. 
-        Select and store x and y values into Python list objects.
-        Return the x_values and y_values lists."""
-        x_values, y_values = [], []
-        file_name = "files/auto_insurance_sweden.csv"
- 
-        with open(file_name, "r") as csv_f:
-            reader = csv.reader(csv_f) 
-            for row in reader:
-                x = float(row[0])
-                x_values.append(x)
-                y = float(row[1]) 
-                y_values.append(y)  
-
-            # Count the number of rows in the CSV file. Reset the 
-            # reader's current position back to the top of the file
-            csv_f.seek(0)
-            self.row_count = len(list(reader))
-        return x_values, y_values
+        Select and store x and y values into numpy arrays.
+        Return the x_values and y_values arrays."""
+        schema = [("x", "f8"), ("y", "f8")]
+        data, _ = loadCachedCSV(self.file_name, schema, has_header=False)
+
+        # Count the number of rows in the CSV file
+        self.row_count = len(data)
+        return data["x"], data["y"]
 
 if __name__ == "__main__":
+    args = parseCommandLine() # Return any command line arguments
     app = QApplication(sys.argv)
-    window = DisplayGraph()
+    window = DisplayGraph(args["file"], args["render_mode"])
     sys.exit(app.exec_())
\ No newline at end of file
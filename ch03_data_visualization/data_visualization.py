@@ -3,12 +3,17 @@ Written by Joshua Willman
 Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
 """
 # Import necessary modules
-import sys, csv, random
+import sys, random
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QPushButton, 
     QComboBox, QCheckBox, QFormLayout, QDockWidget, QTableView, QHeaderView, QGraphicsView)
 from PyQt5.QtChart import QChart, QChartView, QLineSeries, QValueAxis
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPainter, QColor, QStandardItemModel, QStandardItem
+from data_loader import loadCachedCSV, CATEGORY
+
+# Columns in social_spending_simplified.csv: Entity, Code, Year, SocialExpenditureGDP(%)
+SOCIAL_SPENDING_SCHEMA = [("entity", CATEGORY), ("code", CATEGORY), 
+    ("year", "i4"), ("spending", "f8")]
 
 class ChartView(QChartView):
     
@@ -258,26 +263,12 @@ class MainWindow(QMainWindow):
         Return the xy_data_and_labels list."""
         file_name = "files/social_spending_simplified.csv"
 
-        with open(file_name, "r") as csv_f:
-            reader = csv.reader(csv_f)
-            header_labels = next(reader)
-
-            row_values = [] # Store current row values
-            xy_data_and_labels = [] # Store all values
-
-            for i, row in enumerate(reader):
-                x = int(row[2])  
-                y = float(row[3])   
-                label = row[0]
-
-                row_values.append(x)
-                row_values.append(y)  
-                row_values.append(label)
-
-                # Add row_values to xy_data_and_labels, then reset row_values
-                xy_data_and_labels.append(row_values)
-                row_values = []
+        # The parsed columns are kept in a binary cache next to the CSV file
+        data, categories = loadCachedCSV(file_name, SOCIAL_SPENDING_SCHEMA)
+        entities = categories["entity"]
 
+        xy_data_and_labels = [[x, y, entities[label]] for x, y, label in 
+            zip(data["year"].tolist(), data["spending"].tolist(), data["entity"].tolist())]
         return xy_data_and_labels
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import numpy as np
+from PyQt5.QtWidgets import QGraphicsPixmapItem
+from PyQt5.QtChart import QChartView
+from PyQt5.QtCore import Qt, QObject, QPointF, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap, QPainter, QPolygonF
+
+class GridIndex():
+    """Uniform grid over a set of points. The point indices are sorted by grid cell,
+    so the points in a rectangle or near a position are found without checking
+    every point."""
+
+    def __init__(self, x_values, y_values, cells_per_axis=256):
+        self.x_values = np.asarray(x_values, dtype=float)
+        self.y_values = np.asarray(y_values, dtype=float)
+        self.cells = cells_per_axis
+
+        if len(self.x_values) == 0: # Nothing to index; every query finds no points
+            self.x_min = self.y_min = 0.0
+            self.cell_width = self.cell_height = 1.0
+        else:
+            self.x_min, self.y_min = self.x_values.min(), self.y_values.min()
+            self.cell_width = (self.x_values.max() - self.x_min) / self.cells or 1.0
+            self.cell_height = (self.y_values.max() - self.y_min) / self.cells or 1.0
+
+        cell_ids = self.cellRow(self.y_values) * self.cells + self.cellColumn(self.x_values)
+        self.order = np.argsort(cell_ids, kind="stable")
+        # starts[i]:starts[i + 1] is the slice of order that holds the points in cell i
+        self.starts = np.searchsorted(cell_ids[self.order], np.arange(self.cells ** 2 + 1))
+
+    def cellColumn(self, x):
+        return np.clip(((x - self.x_min) / self.cell_width).astype(int), 0, self.cells - 1)
+
+    def cellRow(self, y):
+        return np.clip(((y - self.y_min) / self.cell_height).astype(int), 0, self.cells - 1)
+
+    def query(self, x_min, x_max, y_min, y_max):
+        """Return the indices of the points inside the rectangle."""
+        first_column, last_column = self.cellColumn(np.array([x_min, x_max]))
+        first_row, last_row = self.cellRow(np.array([y_min, y_max]))
+
+        # The cells in one row of the grid are next to each other in order
+        chunks = [self.order[self.starts[row * self.cells + first_column]:
+            self.starts[row * self.cells + last_column + 1]]
+            for row in range(first_row, last_row + 1)]
+        candidates = np.concatenate(chunks) if chunks else np.empty(0, dtype=int)
+
+        x, y = self.x_values[candidates], self.y_values[candidates]
+        inside = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+        return candidates[inside]
+
+    def nearest(self, x, y, x_radius, y_radius):
+        """Return the index of the point closest to (x, y) within the radii, or None.
+        Distances are scaled by the radii so that they are measured in screen terms."""
+        candidates = self.query(x - x_radius, x + x_radius, y - y_radius, y + y_radius)
+        if len(candidates) == 0:
+            return None
+        distances = (((self.x_values[candidates] - x) / x_radius) ** 2 +
+            ((self.y_values[candidates] - y) / y_radius) ** 2)
+        closest = np.argmin(distances)
+        return int(candidates[closest]) if distances[closest] <= 1.0 else None
+
+class DensityScatter(QObject):
+    """Render mode for scatter series with too many points for QScatterSeries.
+    While more than max_points are visible, the points are binned into a 2D
+    histogram that is drawn as an image over the plot area. Once the view is zoomed
+    in far enough, the visible points are put into the scatter series instead."""
+    point_picked = pyqtSignal(QPointF)
+
+    def __init__(self, chart, scatter_series, x_values, y_values, max_points=5000, bin_size=2):
+        super().__init__(chart)
+        self.chart = chart
+        self.series = scatter_series
+        self.index = GridIndex(x_values, y_values)
+        self.max_points = max_points
+        self.bin_size = bin_size # Width and height of a histogram bin in pixels
+
+        self.image_item = QGraphicsPixmapItem(chart)
+        self.image_item.setZValue(1) # Above the plot area's background
+
+        # Axis ranges change several times while zooming; only update once
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(30)
+        self.update_timer.timeout.connect(self.updateView)
+        chart.plotAreaChanged.connect(self.scheduleUpdate)
+
+    def attachAxes(self, axis_x, axis_y):
+        """Update the view whenever the axes change their ranges."""
+        self.axis_x, self.axis_y = axis_x, axis_y
+        axis_x.rangeChanged.connect(self.scheduleUpdate)
+        axis_y.rangeChanged.connect(self.scheduleUpdate)
+        self.updateView()
+
+    def scheduleUpdate(self):
+        self.update_timer.start()
+
+    def updateView(self):
+        """Draw the visible points as a density image or as scatter points."""
+        x_min, x_max = self.axis_x.min(), self.axis_x.max()
+        y_min, y_max = self.axis_y.min(), self.axis_y.max()
+        visible = self.index.query(x_min, x_max, y_min, y_max)
+
+        if len(visible) <= self.max_points:
+            self.image_item.hide()
+            x, y = self.index.x_values[visible], self.index.y_values[visible]
+            self.series.replace(QPolygonF([QPointF(*point) for point in zip(x.tolist(), y.tolist())]))
+        else:
+            self.series.clear()
+            self.drawDensityImage(visible, x_min, x_max, y_min, y_max)
+
+    def drawDensityImage(self, visible, x_min, x_max, y_min, y_max):
+        """Bin the visible points into a 2D histogram sized to the plot area and draw
+        it with the series' color, using the log of the counts for the opacity."""
+        plot_area = self.chart.plotArea()
+        columns = max(1, int(plot_area.width()) // self.bin_size)
+        rows = max(1, int(plot_area.height()) // self.bin_size)
+
+        counts, _, _ = np.histogram2d(self.index.y_values[visible], self.index.x_values[visible],
+            bins=(rows, columns), range=((y_min, y_max), (x_min, x_max)))
+        counts = np.log1p(counts[::-1]) # Image rows start at the top, the y axis at the bottom
+        alpha = (255 * counts / counts.max()).astype(np.uint8) if counts.max() else counts
+
+        # The chart's theme sets the series' color once the series is added to the chart
+        color = self.series.color()
+        rgba = np.empty((rows, columns, 4), dtype=np.uint8)
+        rgba[..., 0], rgba[..., 1], rgba[..., 2] = color.red(), color.green(), color.blue()
+        rgba[..., 3] = alpha
+        self.rgba = np.ascontiguousarray(rgba) # QImage doesn't copy the buffer
+
+        image = QImage(self.rgba.data, columns, rows, 4 * columns, QImage.Format_RGBA8888)
+        pixmap = QPixmap.fromImage(image).scaled(int(plot_area.width()), int(plot_area.height()))
+        self.image_item.setPixmap(pixmap)
+        self.image_item.setPos(plot_area.topLeft())
+        self.image_item.show()
+
+    def pickPoint(self, position, radius=6):
+        """Find the data point closest to position (in chart coordinates) within
+        radius pixels. Emit point_picked and return the point if one is found."""
+        plot_area = self.chart.plotArea()
+        x_radius = radius * (self.axis_x.max() - self.axis_x.min()) / plot_area.width()
+        y_radius = radius * (self.axis_y.max() - self.axis_y.min()) / plot_area.height()
+
+        value = self.chart.mapToValue(position, self.series)
+        closest = self.index.nearest(value.x(), value.y(), x_radius, y_radius)
+        if closest is None:
+            return None
+        point = QPointF(self.index.x_values[closest], self.index.y_values[closest])
+        self.point_picked.emit(point)
+        return point
+
+class DensityChartView(QChartView):
+    """Chart view with rubber band zooming, zooming with the scroll wheel, and point
+    picking through a DensityScatter instead of signals from each point."""
+
+    def __init__(self, chart, density_scatter):
+        super().__init__(chart)
+        self.density_scatter = density_scatter
+        self.setRubberBand(QChartView.RectangleRubberBand)
+        self.setRenderHint(QPainter.Antialiasing, False)
+
+    def wheelEvent(self, event):
+        """Zoom in or out on the chart with the scroll wheel."""
+        scale_factor = 1.10
+        if event.angleDelta().y() > 0:
+            self.chart().zoom(scale_factor)
+        elif event.angleDelta().y() < 0:
+            self.chart().zoom(1 / scale_factor)
+
+    def mousePressEvent(self, event):
+        """Pick the point under the mouse on a left click. Dragging still draws the 
+        rubber band, and a right click zooms out."""
+        if event.button() == Qt.LeftButton:
+            self.density_scatter.pickPoint(self.chart().mapFromScene(self.mapToScene(event.pos())))
+        super().mousePressEvent(event)
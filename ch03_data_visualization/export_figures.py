@@ -0,0 +1,92 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules. No Qt is needed: figures are rendered with the Agg backend
+import os, sys, time, argparse
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from data_loader import loadIrisData
+from iris_plots import plotSepalScatter, plotPetalAnalysis
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the data file, how the rows are
+    split into segments, and where and how the reports are written."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-f", "--file", type=str, default="files/iris.csv",
+        help="CSV file with the same columns as the iris dataset")
+    parser.add_argument("-o", "--output-dir", type=str, default="reports",
+        help="Folder for the report images")
+    parser.add_argument("-s", "--segment-by", type=str, choices=['rows', 'variety'],
+        default="rows", help="Make one report per block of rows or per variety")
+    parser.add_argument("-r", "--segment-rows", type=int, default=50,
+        help="Number of rows in each segment when segmenting by rows")
+    parser.add_argument("--format", type=str, nargs="+", choices=['png', 'svg'],
+        default=["png"], help="Image format(s) to write")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+        help="Number of worker processes")
+    args = vars(parser.parse_args())
+    return args
+
+# Each worker process loads the dataset once, in loadWorkerData(); the tasks only
+# carry the rows of their segment
+worker_data = {}
+
+def loadWorkerData(file_name):
+    """Initializer for the worker processes. Load the dataset through the binary cache."""
+    worker_data["iris"], worker_data["categories"] = loadIrisData(file_name)
+
+def createSegments(iris_data, categories, segment_by, segment_rows):
+    """Return a list of (name, row selector) pairs, one for each report."""
+    if segment_by == "variety":
+        return [(label, iris_data["variety"] == code)
+            for code, label in enumerate(categories["variety"])]
+    return [("rows_{}-{}".format(start, min(start + segment_rows, len(iris_data)) - 1),
+        slice(start, start + segment_rows)) for start in range(0, len(iris_data), segment_rows)]
+
+def renderReport(name, rows, output_dir, formats):
+    """Render the scatter/regression/histogram layout from pyqt_matplotlib for the
+    selected rows and write it in each format. Return the paths that were written."""
+    iris_data = worker_data["iris"][rows]
+
+    figure = Figure(figsize=(12, 6), dpi=100)
+    FigureCanvasAgg(figure)
+    grid = figure.add_gridspec(2, 2, wspace=0.3, hspace=0.5)
+    plotSepalScatter(figure.add_subplot(grid[:, 0]), iris_data)
+    plotPetalAnalysis(figure.add_subplot(grid[0, 1]), figure.add_subplot(grid[1, 1]),
+        iris_data, worker_data["categories"]["variety"])
+    figure.suptitle(name)
+
+    paths = []
+    for image_format in formats:
+        path = os.path.join(output_dir, "{}.{}".format(name, image_format))
+        figure.savefig(path, format=image_format)
+        paths.append(path)
+    return paths
+
+def exportReports(file_name, output_dir, segment_by="rows", segment_rows=50,
+        formats=("png",), workers=None):
+    """Render one report per segment of the dataset in a pool of worker processes.
+    Return the number of figures rendered and the time taken in seconds."""
+    os.makedirs(output_dir, exist_ok=True)
+    # Build (or refresh) the cache here so the workers only read it
+    iris_data, categories = loadIrisData(file_name)
+    segments = createSegments(iris_data, categories, segment_by, segment_rows)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=loadWorkerData,
+            initargs=(file_name,)) as executor:
+        futures = [executor.submit(renderReport, name, rows, output_dir, formats)
+            for name, rows in segments]
+        for future in futures:
+            future.result() # Raise any error from the workers
+    return len(segments), time.perf_counter() - start
+
+if __name__ == "__main__":
+    args = parseCommandLine() # Return any command line arguments
+    count, elapsed = exportReports(args["file"], args["output_dir"], args["segment_by"],
+        args["segment_rows"], args["format"], args["workers"])
+    print("[INFO] Rendered {} figures in {:.2f} s ({:.1f} figures/s) with {} workers.".format(
+        count, elapsed, count / elapsed, args["workers"]))
+    sys.exit(0)
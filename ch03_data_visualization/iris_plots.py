@@ -0,0 +1,54 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules. Only Matplotlib axes methods are used, so the same
+# functions draw on the Qt canvases and on headless Agg figures
+import numpy as np
+from class_statistics import computeClassStatistics
+
+# Colors for the histogram of each encoded variety label
+HISTOGRAM_COLORS = ['purple', 'lightgreen', 'yellow']
+
+def plotSepalScatter(axes, iris_data):
+    """Scatter plot that visualizes the relationship between sepal_length and sepal_width."""
+    axes.set_title('Sepal Length vs. Sepal Width', fontsize=16)
+    axes.scatter(iris_data["sepal_length"], iris_data["sepal_width"],
+        s=100 * iris_data["petal_width"], c=iris_data["variety"], cmap='viridis',
+        vmin=0, vmax=len(HISTOGRAM_COLORS) - 1, alpha=0.4)
+    axes.set_xlabel("Sepal length (cm)", fontsize=12)
+    axes.set_ylabel("Sepal width (cm)", fontsize=12)
+
+def plotPetalAnalysis(regression_axes, histogram_axes, iris_data, labels, statistics=None):
+    """Scatter plot with a regression line, and a histogram for each variety, that
+    visualize the relationship between petal_length and petal_width. labels holds
+    the variety name for each encoded label. statistics are the precomputed results
+    of computeClassStatistics() for the petal columns; computed here if not given."""
+    petal_length, petal_width = iris_data["petal_length"], iris_data["petal_width"]
+    if statistics is None:
+        statistics = computeClassStatistics(iris_data["variety"], petal_length, petal_width,
+            len(labels))
+
+    regression_axes.scatter(petal_length, petal_width, alpha=0.5,
+        c=iris_data["variety"], cmap='viridis', vmin=0, vmax=len(HISTOGRAM_COLORS) - 1)
+    regression_axes.set_title("Regression Analysis for Iris Petals", fontsize=14)
+    # Regression line for petal length vs. petal width
+    if np.isfinite(statistics["slope_all"]):
+        line_x = np.array([petal_length.min(), petal_length.max()])
+        regression_axes.plot(line_x, statistics["intercept_all"] + statistics["slope_all"] * line_x,
+            c='black')
+    regression_axes.set_xlabel("Petal length (cm)", fontsize=12)
+    regression_axes.set_ylabel("Petal width (cm)", fontsize=12)
+    regression_axes.grid(True)
+
+    # Create histogram for petal length from the counts for each encoded label
+    for code, (label, color) in enumerate(zip(labels, HISTOGRAM_COLORS)):
+        if statistics["counts"][code]:
+            edges = statistics["hist_edges"][code]
+            histogram_axes.hist(edges[:-1], edges, weights=statistics["hist_counts"][code],
+                color=color, alpha=0.6, label=label)
+
+    histogram_axes.set_title("Histogram for Iris Petals", fontsize=14,)
+    histogram_axes.set_xlabel("Petal length (cm)", fontsize=12)
+    histogram_axes.set_ylabel("Petal width (cm)", fontsize=12)
+    histogram_axes.legend()
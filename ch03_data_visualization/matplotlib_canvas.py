@@ -0,0 +1,114 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules. Importing this module loads the Matplotlib Qt backend, 
+# so pyqt_matplotlib only imports it once a canvas is needed
+from PyQt5.QtCore import QTimer
+
+import numpy as np
+import matplotlib
+matplotlib.use('Qt5Agg') # Configure the backend to use Qt5
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg, NavigationToolbar2QT
+from matplotlib.figure import Figure
+
+class CreateCanvas(FigureCanvasQTAgg):
+
+    def __init__(self, parent=None, nrow=1, ncol=1, blit=True, tick_interval=0.25):
+        # Create Matplotlib Figure object
+        figure = Figure(figsize=(6, 5), dpi=100)
+        # Reserve width and height space for subplots
+        figure.subplots_adjust(wspace= 0.3, hspace=0.4)
+        # Create the axes and set the number of rows/columns for the subplot(s)
+        self.axes = figure.subplots(nrow, ncol)
+        super(CreateCanvas, self).__init__(figure)
+
+        # Interactive redraw mode: while panning with the NavigationToolbar2QT, the 
+        # figure is not redrawn. A cached background (axes, ticks, grid and titles) is 
+        # restored and the cached image of each axes' data is moved by the pan offset. 
+        # The full redraw that updates the ticks waits until the drag pauses for 
+        # tick_interval seconds, or ends
+        self.use_blit = blit
+        self.interacting = False
+        self.background = None
+        self.snapshots = {}
+        self.animated_artists = []
+
+        self.tick_timer = QTimer(self)
+        self.tick_timer.setSingleShot(True)
+        self.tick_timer.setInterval(int(tick_interval * 1000))
+        self.tick_timer.timeout.connect(self.cacheFigure)
+        self.mpl_connect("button_press_event", self.mousePressed)
+        self.mpl_connect("button_release_event", self.mouseReleased)
+
+    def mousePressed(self, event):
+        """Start the interactive redraw mode when a pan starts in one of the axes."""
+        if (self.use_blit and event.inaxes is not None and self.toolbar is not None 
+                and self.toolbar.mode == "pan/zoom"):
+            self.startInteractiveRedraw()
+
+    def mouseReleased(self, event):
+        if self.interacting:
+            self.stopInteractiveRedraw()
+
+    def startInteractiveRedraw(self):
+        """Mark the data artists (scatter points, lines and histogram bars) as 
+        animated so that full draws skip them, then cache the figure."""
+        self.animated_artists = [artist for axes in self.figure.axes 
+            for artist in axes.collections + axes.lines + axes.patches]
+        for artist in self.animated_artists:
+            artist.set_animated(True)
+        self.interacting = True
+        self.cacheFigure()
+
+    def stopInteractiveRedraw(self):
+        """Return to normal drawing and redraw the full figure with updated ticks."""
+        self.tick_timer.stop()
+        for artist in self.animated_artists:
+            artist.set_animated(False)
+        self.animated_artists = []
+        self.interacting = False
+        self.background, self.snapshots = None, {}
+        self.draw_idle()
+
+    def cacheFigure(self):
+        """Draw the full figure. Keep a copy of the figure without the data artists, 
+        and of each axes with them, along with the axes' data-to-pixel transform."""
+        if not self.interacting:
+            return
+        super().draw() # Animated artists are skipped
+        self.background = self.copy_from_bbox(self.figure.bbox)
+
+        self.snapshots = {}
+        for axes in self.figure.axes:
+            for artist in axes.collections + axes.lines + axes.patches:
+                axes.draw_artist(artist)
+            self.snapshots[axes] = (self.copy_from_bbox(axes.bbox), axes.transData.frozen())
+        self.blit(self.figure.bbox)
+
+    def draw(self):
+        """Reimplement draw(). In the interactive redraw mode, restore the cached 
+        images, moved by how far each axes has been panned, instead of redrawing."""
+        if not self.interacting:
+            super().draw()
+            return
+
+        self.tick_timer.start() # Restart the wait for a pause in the drag
+        self.restore_region(self.background)
+        for axes, (snapshot, cached_transform) in self.snapshots.items():
+            # Pixel offset of the data since the snapshot; the data's scale must not have 
+            # changed (a right-button drag zooms), otherwise redraw the full figure
+            origin, unit = cached_transform.transform([(0, 0), (1, 1)])
+            new_origin, new_unit = axes.transData.transform([(0, 0), (1, 1)])
+            if not np.allclose(unit - origin, new_unit - new_origin):
+                self.cacheFigure()
+                return
+            dx, dy = np.round(new_origin - origin).astype(int)
+            dy = -dy # Pixel rows in the snapshot run down from the top of the figure
+
+            # Only restore the part of the snapshot that stays inside the axes
+            x0, y0, x1, y1 = snapshot.get_extents()
+            source = (x0 + max(0, -dx), y0 + max(0, -dy), x1 - max(0, dx), y1 - max(0, dy))
+            if source[0] < source[2] and source[1] < source[3]:
+                self.restore_region(snapshot, bbox=source, xy=(x0 + dx, y0 + dy))
+        self.blit(self.figure.bbox)
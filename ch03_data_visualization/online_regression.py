@@ -0,0 +1,117 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+class RegressionAccumulator():
+    """Keep running statistics for a simple linear regression, Y = a + bX.
+    Points can be added, removed, or whole accumulators merged in O(1), using
+    Welford's updates for the means and the co-moments (the sums of squared
+    differences from the mean), so the regression line never has to be
+    recomputed from all of the points."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean_x, self.mean_y = 0.0, 0.0
+        # Co-moments: sum((x - mean_x)**2), sum((y - mean_y)**2) and
+        # sum((x - mean_x) * (y - mean_y))
+        self.m2_x, self.m2_y, self.c_xy = 0.0, 0.0, 0.0
+
+    @classmethod
+    def fromArrays(cls, x_values, y_values):
+        """Create an accumulator for the points in two arrays, computed in one
+        vectorised pass."""
+        x_values = np.asarray(x_values, dtype=float)
+        y_values = np.asarray(y_values, dtype=float)
+        accumulator = cls()
+        accumulator.count = len(x_values)
+        if accumulator.count:
+            accumulator.mean_x, accumulator.mean_y = x_values.mean(), y_values.mean()
+            dx, dy = x_values - accumulator.mean_x, y_values - accumulator.mean_y
+            accumulator.m2_x = float(np.dot(dx, dx))
+            accumulator.m2_y = float(np.dot(dy, dy))
+            accumulator.c_xy = float(np.dot(dx, dy))
+        return accumulator
+
+    def addPoint(self, x, y):
+        """Add a single point."""
+        self.count += 1
+        dx = x - self.mean_x
+        self.mean_x += dx / self.count
+        dy = y - self.mean_y
+        self.mean_y += dy / self.count
+        # Use the difference from the old mean times the difference from the new mean
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+
+    def removePoint(self, x, y):
+        """Remove a point that was added before. The reverse of addPoint()."""
+        if self.count <= 1:
+            self.__init__()
+            return
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.count -= 1
+        self.mean_x -= dx / self.count
+        self.mean_y -= dy / self.count
+        self.m2_x -= dx * (x - self.mean_x)
+        self.m2_y -= dy * (y - self.mean_y)
+        self.c_xy -= dx * (y - self.mean_y)
+
+    def addArrays(self, x_values, y_values):
+        """Add a batch of points."""
+        self.merge(RegressionAccumulator.fromArrays(x_values, y_values))
+
+    def merge(self, other):
+        """Combine the points of another accumulator with this one (Chan et al.'s
+        pairwise update). Return self so that merges can be chained."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        count = self.count + other.count
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.count * other.count / count
+
+        self.m2_x += other.m2_x + dx * dx * weight
+        self.m2_y += other.m2_y + dy * dy * weight
+        self.c_xy += other.c_xy + dx * dy * weight
+        self.mean_x += dx * other.count / count
+        self.mean_y += dy * other.count / count
+        self.count = count
+        return self
+
+    def coefficients(self):
+        """Return (a_intercept, b_slope), the same as linearRegression() in combine_charts."""
+        if self.count < 2 or self.m2_x == 0:
+            raise ValueError("At least two points with different x values are needed.")
+        b_slope = self.c_xy / self.m2_x
+        a_intercept = self.mean_y - b_slope * self.mean_x
+        return (a_intercept, b_slope)
+
+    def correlation(self):
+        """Return Pearson's r for the points."""
+        return self.c_xy / np.sqrt(self.m2_x * self.m2_y)
+
+def _accumulatePartition(partition):
+    """Worker function for parallelRegression()."""
+    return RegressionAccumulator.fromArrays(*partition)
+
+def parallelRegression(x_values, y_values, partitions=4, max_workers=None):
+    """Split the points into partitions, accumulate each one in a separate
+    process and merge the results. Return the merged RegressionAccumulator."""
+    x_parts = np.array_split(np.asarray(x_values, dtype=float), partitions)
+    y_parts = np.array_split(np.asarray(y_values, dtype=float), partitions)
+
+    accumulator = RegressionAccumulator()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for partial in executor.map(_accumulatePartition, zip(x_parts, y_parts)):
+            accumulator.merge(partial)
+    return accumulator
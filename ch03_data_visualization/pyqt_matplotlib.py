@@ -2,102 +2,81 @@
 Written by Joshua Willman
 Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
 """
-# Import necessary modules
-import sys, csv
+# Import necessary modules. Matplotlib, NumPy and the data loader are imported when
+# the first canvas is built so that the window can appear sooner
+import sys, time, argparse
+start_time = time.perf_counter() # Used for the start-up report; set before PyQt5 is imported
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout
-
-import numpy as np
-import matplotlib
-matplotlib.use('Qt5Agg') # Configure the backend to use Qt5
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg, NavigationToolbar2QT
-from matplotlib.figure import Figure
- 
-class CreateCanvas(FigureCanvasQTAgg):
-
-    def __init__(self, parent=None, nrow=1, ncol=1):
-        # Create Matplotlib Figure object
-        figure = Figure(figsize=(6, 5), dpi=100)
-        # Reserve width and height space for subplots
-        figure.subplots_adjust(wspace= 0.3, hspace=0.4)
-        # Create the axes and set the number of rows/columns for the subplot(s)
-        self.axes = figure.subplots(nrow, ncol)
-        super(CreateCanvas, self).__init__(figure)
+from PyQt5.QtCore import QObject, QTimer, QEvent
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the start-up options."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-e", "--eager", action="store_true",
+        help="Build both figures before the window is shown, instead of when they first appear")
+    parser.add_argument("-r", "--startup-report", action="store_true",
+        help="Print the time to the first paint and until the figures are built, then quit")
+    args = vars(parser.parse_args())
+    return args
+
+class LazyCanvas(QWidget):
+    """Placeholder widget that calls build_function to create its contents the first
+    time it is painted."""
+
+    def __init__(self, build_function, parent=None):
+        super().__init__(parent)
+        self.build_function = build_function
+        self.canvas = None
+        self.build_queued = False
+
+        v_box = QVBoxLayout()
+        v_box.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(v_box)
+
+    def paintEvent(self, event):
+        """The first paint means that the placeholder is visible on screen. Queue 
+        building the canvas so that the rest of the window is painted first."""
+        super().paintEvent(event)
+        if self.canvas is None and not self.build_queued:
+            self.build_queued = True
+            QTimer.singleShot(0, self.buildCanvas)
+
+    def buildCanvas(self):
+        """Create the canvas, if that hasn't happened yet, and add it to the layout."""
+        if self.canvas is None:
+            self.canvas = self.build_function()
+            self.layout().addWidget(self.canvas)
+        return self.canvas
 
 class DisplayGraph(QMainWindow):
 
-    def __init__(self):
+    def __init__(self, lazy=True):
         super().__init__()
+        self.lazy = lazy
+        self.file_name = "files/iris.csv"
         self.initializeUI()
 
     def initializeUI(self):
-        """Initialize the window and display its contents."""
+        """Initialize the window and display its contents."""
         self.setMinimumSize(1000, 800)
         self.setWindowTitle("3.2 - PyQt5 + Matplotlib")
 
+        self.iris_data, self.categories = None, None
         self.setupChart()
         self.show()
 
     def setupChart(self):
-        """Set up the GUI's window and widgets that are embedded with Matplotlib figures."""
-        # Load the iris dataset from the CSV file
-        iris_data = self.loadCSVFile()
-
-        # Create the different feature variables for each of the columns in the iris dataset
-        sepal_length, sepal_width = iris_data[:, 0].astype(float), iris_data[:, 1].astype(float)
-        petal_length, petal_width = iris_data[:, 2].astype(float), iris_data[:, 3].astype(float)
-        labels = iris_data[:, 4].astype(str)
-        
-        # Convert target labels to encoded labels that will be used for color coding the 
-        # points in the scatter plots
-        encoded_labels = []
-
-        for label in labels:
-            if label == "Setosa":
-                encoded_labels.append(0)
-            elif label == "Versicolor":
-                encoded_labels.append(1)
-            elif label == "Virginica":
-                encoded_labels.append(2)
-
-        # Create a canvas object for the scatter plot that visualizes the relationship 
-        # between sepal_length and sepal_width
-        scatter_canvas = CreateCanvas(self)
-        scatter_canvas.axes.set_title('Sepal Length vs. Sepal Width', fontsize=16)
-        scatter_canvas.axes.scatter(sepal_length, sepal_width, s=100 * petal_width,
-            c=encoded_labels, cmap='viridis', alpha=0.4)
-        scatter_canvas.axes.set_xlabel("Sepal length (cm)", fontsize=12)
-        scatter_canvas.axes.set_ylabel("Sepal width (cm)", fontsize=12)
-        self.addToolBar(NavigationToolbar2QT(scatter_canvas, self))
-
-        # Regression line for petal length vs. petal width
-        reg_line = np.polyfit(petal_length, petal_width, 1)
-        poly_reg_line = np.poly1d(reg_line)
-
-        # Create a canvas object for the scatter plot and histogram that visualize the 
-        # relationship between petal_length and petal_width
-        mixed_canvas = CreateCanvas(self, nrow=2, ncol=1)
-        mixed_canvas.axes[0].scatter(petal_length, petal_width, alpha=0.5, 
-            c=encoded_labels, cmap='viridis')
-        mixed_canvas.axes[0].set_title("Regression Analysis for Iris Petals", fontsize=14)
-        mixed_canvas.axes[0].plot(petal_length, poly_reg_line(petal_length), c='black')
-        mixed_canvas.axes[0].set_xlabel("Petal length (cm)", fontsize=12)
-        mixed_canvas.axes[0].set_ylabel("Petal width (cm)", fontsize=12)
-        mixed_canvas.axes[0].grid(True)
-
-        # Create histogram for petal length
-        mixed_canvas.axes[1].hist(petal_length[:50], bins=15, color='purple', alpha=0.6, label="Setosa")
-        mixed_canvas.axes[1].hist(petal_length[51:100], bins=15, color='lightgreen', alpha=0.6, label="Versicolor")
-        mixed_canvas.axes[1].hist(petal_length[101:149], bins=15, color='yellow', alpha=0.6, label="Virginica")    
-
-        mixed_canvas.axes[1].set_title("Histogram for Iris Petals", fontsize=14,)
-        mixed_canvas.axes[1].set_xlabel("Petal length (cm)", fontsize=12)
-        mixed_canvas.axes[1].set_ylabel("Petal width (cm)", fontsize=12)
-        mixed_canvas.axes[1].legend()
-        self.addToolBar(NavigationToolbar2QT(mixed_canvas, self))
+        """Set up the GUI's window and widgets that are embedded with Matplotlib figures.
+        Each figure is built in a LazyCanvas, when it is first shown, unless lazy is False."""
+        self.scatter_holder = LazyCanvas(self.createScatterCanvas)
+        self.mixed_holder = LazyCanvas(self.createMixedCanvas)
+        if not self.lazy:
+            self.scatter_holder.buildCanvas()
+            self.mixed_holder.buildCanvas()
 
         charts_h_box = QHBoxLayout()
-        charts_h_box.addWidget(scatter_canvas)
-        charts_h_box.addWidget(mixed_canvas)
+        charts_h_box.addWidget(self.scatter_holder)
+        charts_h_box.addWidget(self.mixed_holder)
 
         main_v_box = QVBoxLayout()
         main_v_box.addLayout(charts_h_box)
@@ -106,17 +85,79 @@ class DisplayGraph(QMainWindow):
         container.setLayout(main_v_box)
         self.setCentralWidget(container)
 
-    def loadCSVFile(self):
-        """Load the iris dataset and store the data in a numpy array."""
-        file_name = "files/iris.csv"
+    def createScatterCanvas(self):
+        """Create a canvas object for the scatter plot that visualizes the relationship
+        between sepal_length and sepal_width."""
+        from matplotlib_canvas import CreateCanvas, NavigationToolbar2QT
+        from iris_plots import plotSepalScatter
+
+        scatter_canvas = CreateCanvas(self)
+        plotSepalScatter(scatter_canvas.axes, self.loadIrisData())
+        self.addToolBar(NavigationToolbar2QT(scatter_canvas, self))
+        return scatter_canvas
+
+    def createMixedCanvas(self):
+        """Create a canvas object for the scatter plot and histogram that visualize the
+        relationship between petal_length and petal_width."""
+        from matplotlib_canvas import CreateCanvas, NavigationToolbar2QT
+        from iris_plots import plotPetalAnalysis
+        from class_statistics import loadClassStatistics
 
-        with open(file_name, "r") as csv_f:
-            reader = csv.reader(csv_f)
-            header_labels = next(reader)
-            data = np.array(list(reader))
-        return data
+        iris_data = self.loadIrisData()
+        labels = self.categories["variety"]
+        # Histograms and regression lines for each variety; cached next to the CSV file
+        statistics = loadClassStatistics(self.file_name, iris_data, "variety",
+            "petal_length", "petal_width", len(labels))
+
+        mixed_canvas = CreateCanvas(self, nrow=2, ncol=1)
+        plotPetalAnalysis(mixed_canvas.axes[0], mixed_canvas.axes[1], iris_data, labels, statistics)
+        self.addToolBar(NavigationToolbar2QT(mixed_canvas, self))
+        return mixed_canvas
+
+    def loadIrisData(self):
+        """Return the iris dataset, loading it the first time it is needed. The variety
+        labels are encoded as ints (Setosa = 0, Versicolor = 1, Virginica = 2), which
+        are used for color coding the points in the scatter plots."""
+        if self.iris_data is None:
+            self.iris_data, self.categories = self.loadCSVFile()
+        return self.iris_data
+
+    def loadCSVFile(self):
+        """Load the iris dataset into a typed numpy structured array."""
+        from data_loader import loadIrisData
+        return loadIrisData(self.file_name)
+
+class StartupReport(QObject):
+    """Event filter that records when the window is first painted and when both
+    canvases have been built, prints the times and quits the application."""
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        self.first_paint = None
+        window.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and self.first_paint is None:
+            self.first_paint = time.perf_counter() - start_time
+            QTimer.singleShot(0, self.checkBuilt)
+        return False
+
+    def checkBuilt(self):
+        """Wait for both canvases to be built and drawn, then report."""
+        if self.window.scatter_holder.canvas is None or self.window.mixed_holder.canvas is None:
+            QTimer.singleShot(10, self.checkBuilt)
+            return
+        QApplication.processEvents()
+        built = time.perf_counter() - start_time
+        print("Time to first paint: {:.3f} s".format(self.first_paint))
+        print("Time to figures built: {:.3f} s".format(built))
+        QApplication.quit()
 
 if __name__ == '__main__':
+    args = parseCommandLine() # Return any command line arguments
     app = QApplication(sys.argv)
-    window = DisplayGraph()
-    sys.exit(app.exec_())
\ No newline at end of file
+    window = DisplayGraph(lazy=not args["eager"])
+    if args["startup_report"]:
+        report = StartupReport(window)
+    sys.exit(app.exec_())
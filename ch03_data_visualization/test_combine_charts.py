@@ -0,0 +1,40 @@
+"""
+Tests for building the chart of combine_charts.py from small or degenerate datasets.
+Run with: python -m pytest ch03_data_visualization
+"""
+import os, sys
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import pytest
+from PyQt5.QtWidgets import QApplication
+from combine_charts import DisplayGraph
+
+@pytest.fixture
+def app():
+    return QApplication.instance() or QApplication(sys.argv)
+
+def writeCSV(folder, text):
+    file_name = str(folder / "points.csv")
+    with open(file_name, "w") as csv_f:
+        csv_f.write(text)
+    return file_name
+
+@pytest.mark.parametrize("render_mode", ["scatter", "density"])
+def testPointsWithTheSameXHideTheRegressionLine(app, tmp_path, render_mode):
+    window = DisplayGraph(writeCSV(tmp_path, "1,2\n1,3\n"), render_mode)
+    assert not window.line_series.isVisible()
+    assert window.line_series.count() == 0
+
+    if render_mode == "scatter":
+        window.addDataPoint(2, 5) # Two different x values: the line can be drawn
+        assert window.line_series.isVisible()
+        assert window.line_series.count() == 2
+    window.close()
+
+@pytest.mark.parametrize("render_mode", ["scatter", "density"])
+def testEmptyFileShowsEmptyChart(app, tmp_path, render_mode):
+    window = DisplayGraph(writeCSV(tmp_path, ""), render_mode)
+    assert window.scatter_series.count() == 0
+    assert window.line_series.count() == 0
+    if render_mode == "density":
+        assert len(window.density_scatter.index.query(0, 1, 0, 1)) == 0
+    window.close()
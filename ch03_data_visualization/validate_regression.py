@@ -0,0 +1,77 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import sys, csv, time, argparse
+import numpy as np
+from online_regression import RegressionAccumulator, parallelRegression
+from combine_charts import linearRegression
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the number of random points
+    used in the large comparison."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--points", type=int, default=2000000,
+        help="Number of random points for the large dataset")
+    args = vars(parser.parse_args())
+    return args
+
+def compare(name, x_values, y_values, coefficients):
+    """Print the coefficients next to linearRegression() and np.polyfit()."""
+    expected = linearRegression(x_values, y_values)
+    slope, intercept = np.polyfit(x_values, y_values, 1)
+    matches = np.allclose(coefficients, expected) and np.allclose(coefficients, (intercept, slope))
+    print("{:<22} a={:.6f} b={:.6f} {}".format(name, coefficients[0], coefficients[1],
+        "OK" if matches else "MISMATCH"))
+    return matches
+
+if __name__ == "__main__":
+    args = parseCommandLine()
+    results = []
+
+    # Small dataset from the chart, one point at a time
+    with open("files/auto_insurance_sweden.csv", "r") as csv_f:
+        points = np.array([[float(row[0]), float(row[1])] for row in csv.reader(csv_f)])
+    x_values, y_values = points[:, 0], points[:, 1]
+
+    accumulator = RegressionAccumulator()
+    for x, y in points:
+        accumulator.addPoint(x, y)
+    results.append(compare("addPoint()", x_values, y_values, accumulator.coefficients()))
+
+    # Remove the last ten points again
+    for x, y in points[-10:]:
+        accumulator.removePoint(x, y)
+    results.append(compare("removePoint()", x_values[:-10], y_values[:-10],
+        accumulator.coefficients()))
+
+    # Large random dataset: vectorised, merged and parallel partitions
+    rng = np.random.default_rng(50)
+    x_values = rng.uniform(0, 100, args["points"])
+    y_values = 3.5 + 2.0 * x_values + rng.normal(0, 10, args["points"])
+
+    start = time.perf_counter()
+    expected = linearRegression(x_values, y_values)
+    print("linearRegression() on {} points: {:.3f} s".format(args["points"],
+        time.perf_counter() - start))
+
+    halves = np.array_split(np.arange(args["points"]), 2)
+    merged = RegressionAccumulator.fromArrays(x_values[halves[0]], y_values[halves[0]])
+    merged.merge(RegressionAccumulator.fromArrays(x_values[halves[1]], y_values[halves[1]]))
+    results.append(compare("merge()", x_values, y_values, merged.coefficients()))
+
+    start = time.perf_counter()
+    parallel = parallelRegression(x_values, y_values, partitions=4)
+    print("parallelRegression(): {:.3f} s".format(time.perf_counter() - start))
+    results.append(compare("parallelRegression()", x_values, y_values, parallel.coefficients()))
+
+    # Cost of updating the line when one more point arrives
+    start = time.perf_counter()
+    for x, y in zip(x_values[:10000].tolist(), y_values[:10000].tolist()):
+        merged.addPoint(x, y)
+        merged.coefficients()
+    print("addPoint() + coefficients(): {:.2f} µs per point".format(
+        (time.perf_counter() - start) / 10000 * 1e6))
+
+    sys.exit(0 if all(results) else 1)
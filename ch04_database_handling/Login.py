@@ -3,7 +3,7 @@ Written by Joshua Willman
 Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
 """
 # Import necessary modules
-import sys, time, json
+import sys
 from PyQt5.QtWidgets import (QWidget, QDialog, QLabel, QPushButton, QLineEdit, 
     QMessageBox, QFormLayout, QVBoxLayout) 
 from PyQt5.QtCore import Qt
@@ -11,9 +11,10 @@ from PyQt5.QtGui import QFont
 
 class LoginGUI(QWidget):
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, credentials=None):
         super().__init__()
         self.parent = parent
+        self.credentials = credentials # CredentialStore with the login accounts
         self.initializeUI()
 
     def initializeUI(self):
@@ -62,25 +63,14 @@ class LoginGUI(QWidget):
         self.setLayout(main_v_box)
 
     def connectToDatabase(self):
-        """Check the user's information. Close the login window if a match is found, 
-        and open the SQL manager window."""
-        users = {} # Create an empty dictionary to store user information
-
-        with open('files/login.json') as json_f:
-            login_data = json.load(json_f)
-
-        # Load information from json file into a dictionary
-        for login in login_data['loginList']:
-            user, pswd = login['username'], login['password']
-            users[user] = pswd # Set the dict's key and value pair
-
+        """Check the user's information against the credential store. Close the login
+        window if a match is found, and open the SQL manager window."""
         # Collect information that the user entered    
         user_name = self.user_entry.text()
         password = self.password_entry.text()
-        if (user_name, password) in users.items():
+        if self.credentials.verify(user_name, password):
             self.close()
             # Open the SQL management application
-            time.sleep(0.5) # Pause slightly before showing the parent window
             self.parent.show()
         else:
             QMessageBox.warning(self, "Information Incorrect", 
@@ -122,8 +112,8 @@ class LoginGUI(QWidget):
         self.new_user_dialog.show()
 
     def acceptUserInfo(self):
-        """Verify that the user's passwords match. If so, save them user's info
-        to the json file and display the login window."""
+        """Verify that the user's passwords match. If so, add the user's account to
+        the credential store and display the login window."""
         user_name_text = self.new_user_entry.text()
         pswd_text = self.new_password.text()
         confirm_text = self.confirm_password.text()
@@ -132,19 +122,11 @@ class LoginGUI(QWidget):
             QMessageBox.warning(self, "Error Message", 
                 "The passwords you entered do not match. Please try again.", 
                 QMessageBox.Close)
-        else:
-            # If the passwords match, save the passwords to the json file
-            # and return to the login screen.
-            user_info = {}
-
-            with open('files/login.json', "r+") as json_f:
-                login_data = json.load(json_f)
-                login_data['loginList'].append({
-                    "username": user_name_text,
-                    "password": pswd_text})
-
-                login_data.update(user_info)
-                json_f.seek(0) # Reset the file pointer to position 0
-                json.dump(login_data, json_f, indent=2)
+        elif not self.credentials.addUser(user_name_text, pswd_text):
+            QMessageBox.warning(self, "Error Message", 
+                "The user name you entered is already taken. Please try again.", 
+                QMessageBox.Close)
+            return
+        # If the passwords match, return to the login screen
         self.new_user_dialog.close()
         self.show()
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import sys, os, time, random, argparse, tempfile
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtSql import QSqlDatabase, QSqlQuery
+from database_schema import createTables, createIndexes, analyzeDatabase, execStatement
+from create_database import sampleData, bulkInsert, setLoadPragmas, TABLE_COLUMNS
+
+# Typical joins between orders, customers and products. Each query has a function
+# that returns random parameters for one run
+QUERIES = {
+    "orders of a customer": ("""SELECT o.order_id, o.order_date, p.product_name, op.quantity
+        FROM orders o JOIN order_products op ON op.order_id = o.order_id
+        JOIN products p ON p.product_id = op.product_id
+        WHERE o.customer_id = ?""",
+        lambda rng, orders: [rng.randint(1, orders // 2)]),
+    "customers of 100 orders": ("""SELECT c.first_name, c.last_name, c.email, o.order_date
+        FROM orders o JOIN customers c ON c.customer_id = o.customer_id
+        WHERE o.order_id BETWEEN ? AND ?""",
+        lambda rng, orders: (lambda first: [first, first + 99])(rng.randint(1, orders - 99))),
+    "spend of customers by name": ("""SELECT c.customer_id, SUM(op.quantity * op.list_price)
+        FROM customers c JOIN orders o ON o.customer_id = c.customer_id
+        JOIN order_products op ON op.order_id = o.order_id
+        WHERE c.first_name = ? AND c.last_name = ? GROUP BY c.customer_id""",
+        lambda rng, orders: ["First{}".format(rng.randrange(97)), "Last{}".format(rng.randrange(89))]),
+    "buyers of a product in a store": ("""SELECT COUNT(DISTINCT o.customer_id)
+        FROM order_products op JOIN orders o ON o.order_id = op.order_id
+        WHERE op.product_id = ? AND o.store_id = ?""",
+        lambda rng, orders: [rng.randint(1, 14), rng.randint(1, 2)]),
+    "store revenue for a month": ("""SELECT s.store_name, SUM(op.quantity * op.list_price)
+        FROM orders o JOIN stores s ON s.store_id = o.store_id
+        JOIN order_products op ON op.order_id = o.order_id
+        WHERE o.order_date BETWEEN ? AND ? GROUP BY s.store_id""",
+        lambda rng, orders: (lambda month: ["2020-{:02d}-01".format(month),
+            "2020-{:02d}-31".format(month)])(rng.randint(1, 12)))}
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the database sizes and how often
+    each query runs."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--orders", type=int, nargs="+", default=[10000, 1000000, 10000000],
+        help="Numbers of orders to generate; there are half as many customers")
+    parser.add_argument("-r", "--repeat", type=int, default=10,
+        help="Number of runs of each query, with different parameters")
+    parser.add_argument("-t", "--time-limit", type=float, default=10.0,
+        help="Stop repeating a query once its runs took this many seconds")
+    parser.add_argument("-k", "--keep-dir", type=str, default=None,
+        help="Folder to keep the generated databases in (default: a temporary folder)")
+    args = vars(parser.parse_args())
+    return args
+
+def generateDatabase(database, order_count):
+    """Fill the tables with order_count orders of one product each and half as many
+    customers. The rows are generated inside SQLite with recursive CTEs, so even
+    10 million orders don't need to fit in Python's memory. The values are
+    deterministic, spread out by multiplying the row number with large primes."""
+    createTables(database)
+    setLoadPragmas(database)
+    data = sampleData()
+    for table in ["stores", "products"]:
+        bulkInsert(database, table, TABLE_COLUMNS[table], [data[table]])
+
+    customer_count = max(1, order_count // 2)
+    numbers = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {}) "
+    database.transaction()
+    execStatement(database, """INSERT INTO customers (first_name, last_name, phone, email) """
+        + numbers.format(customer_count)
+        + """SELECT 'First' || (i % 97), 'Last' || (i % 89), 'NULL', 'customer' || i || '@email.com'
+        FROM n""")
+    execStatement(database, """INSERT INTO orders (customer_id, order_date, order_status, store_id) """
+        + numbers.format(order_count)
+        + """SELECT (i * 2654435761) % {} + 1, date('2020-01-01', '+' || (i * 7919 % 366) || ' days'),
+        i % 4 + 1, i % 2 + 1 FROM n""".format(customer_count))
+    execStatement(database, """INSERT INTO order_products (order_id, product_id, quantity, list_price) """
+        + numbers.format(order_count)
+        + """SELECT i, i * 40503 % 14 + 1, i % 5 + 1,
+        (SELECT list_price FROM products WHERE product_id = i * 40503 % 14 + 1) FROM n""")
+    database.commit()
+
+def timeQueries(database, order_count, repeat, time_limit, seed=40):
+    """Run every query up to repeat times. Return a dict of query name: mean
+    seconds per run. The same seed gives the same parameters for each call."""
+    results = {}
+    for name, (statement, parameters) in QUERIES.items():
+        rng = random.Random(seed)
+        query = QSqlQuery(database)
+        query.setForwardOnly(True)
+        query.prepare(statement)
+        runs, elapsed = 0, 0.0
+        while runs < repeat and elapsed < time_limit:
+            for value in parameters(rng, order_count):
+                query.addBindValue(value)
+            start = time.perf_counter()
+            if not query.exec_():
+                raise RuntimeError("{} failed: {}".format(name, query.lastError().text()))
+            while query.next(): # Read every row, as a view would
+                pass
+            elapsed += time.perf_counter() - start
+            runs += 1
+        results[name] = elapsed / runs
+    return results
+
+if __name__ == "__main__":
+    args = parseCommandLine()
+    app = QCoreApplication(sys.argv)
+    folder = args["keep_dir"] or tempfile.mkdtemp()
+    os.makedirs(folder, exist_ok=True)
+    database = QSqlDatabase.addDatabase("QSQLITE")
+
+    for order_count in args["orders"]:
+        database_name = os.path.join(folder, "FishingStores_{}.sql".format(order_count))
+        database.setDatabaseName(database_name)
+        if not database.open():
+            print("Connection failed: ", database.lastError().text())
+            sys.exit(1)
+
+        start = time.perf_counter()
+        generateDatabase(database, order_count)
+        print("[INFO] {} orders: generated in {:.1f} s".format(order_count, time.perf_counter() - start))
+        # Without the secondary indexes or statistics, as the original schema was
+        before = timeQueries(database, order_count, args["repeat"], args["time_limit"])
+
+        start = time.perf_counter()
+        createIndexes(database)
+        analyzeDatabase(database)
+        print("[INFO] Indexes and ANALYZE took {:.1f} s".format(time.perf_counter() - start))
+        after = timeQueries(database, order_count, args["repeat"], args["time_limit"])
+
+        print("  {:32} {:>12} {:>12} {:>9}".format("query", "before (ms)", "after (ms)", "speedup"))
+        for name in QUERIES:
+            print("  {:32} {:12.2f} {:12.2f} {:8.1f}x".format(name, 1000 * before[name],
+                1000 * after[name], before[name] / after[name] if after[name] else 0))
+        database.close()
+        if not args["keep_dir"]:
+            for suffix in ["", "-wal", "-shm"]:
+                if os.path.exists(database_name + suffix):
+                    os.remove(database_name + suffix)
+
+    if not args["keep_dir"]:
+        os.rmdir(folder)
+    sys.exit(0)
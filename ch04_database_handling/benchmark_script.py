@@ -0,0 +1,66 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import sys, os, time, argparse, tempfile
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtSql import QSqlDatabase, QSqlQuery
+from database_schema import createTables
+from sql_script import splitStatements, groupStatements, ScriptRunner
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the size of the generated script."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--statements", type=int, default=100000,
+        help="Number of INSERT statements in the script run by the script runner")
+    parser.add_argument("-c", "--compare-statements", type=int, default=1000,
+        help="Number of them to also run one per line with autocommit, as SQLManager used to")
+    args = vars(parser.parse_args())
+    return args
+
+def createScript(insert_count):
+    """Return a DML script with insert_count customers, one INSERT per line, and an UPDATE."""
+    lines = ["INSERT INTO customers (first_name, last_name, phone, email) VALUES "
+        "('First{0}', 'O''Last{0}', NULL, 'customer{0}@email.com');".format(i) for i in range(insert_count)]
+    lines.append("UPDATE customers SET phone = '(555) 010-0000' WHERE customer_id % 10 = 0;")
+    return "\n".join(lines)
+
+def runLineByLine(database, script):
+    """The original path: every line is its own statement and commits on its own."""
+    for line in script.split("\n"):
+        if line != "":
+            QSqlQuery(database).exec_(line)
+
+def runScript(database, script):
+    """Split, group and run script in one transaction with the script runner."""
+    runner = ScriptRunner(database)
+    database.transaction()
+    for line, statements, template, values_list in groupStatements(splitStatements(script)):
+        runner.runGroup(statements, template, values_list)
+    database.commit()
+
+if __name__ == "__main__":
+    args = parseCommandLine()
+    app = QCoreApplication(sys.argv)
+    database = QSqlDatabase.addDatabase("QSQLITE")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rates = {}
+        for name, run, count in [("script runner", runScript, args["statements"]),
+                ("line by line", runLineByLine, args["compare_statements"])]:
+            database.setDatabaseName(os.path.join(temp_dir, name.replace(" ", "_") + ".sql"))
+            database.open()
+            createTables(database)
+            script = createScript(count)
+            start = time.perf_counter()
+            run(database, script)
+            elapsed = time.perf_counter() - start
+            rates[name] = (count + 1) / elapsed
+            print("[INFO] {:14} {:8d} statements in {:8.3f} s ({:10,.0f} statements/s)".format(
+                name, count + 1, elapsed, rates[name]))
+            database.close()
+
+    print("[INFO] The script runner is {:.0f}x faster per statement.".format(
+        rates["script runner"] / rates["line by line"]))
+    sys.exit(0)
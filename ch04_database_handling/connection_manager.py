@@ -0,0 +1,94 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import threading, itertools
+from PyQt5.QtSql import QSqlDatabase, QSqlQuery
+
+class ConnectionManager:
+    """Hands out connections to one SQLite database file, one per thread. A
+    QSqlDatabase connection can only be used by the thread that opened it, so
+    each thread gets its own named connection the first time it asks, and gets the
+    same one back on every later call: the GUI thread and long-lived workers reuse
+    theirs across queries instead of opening the file again.
+
+    Each connection is opened with write-ahead logging, so readers on other
+    threads don't block a writer and a writer doesn't block them, a page cache of
+    cache_size_kb, memory-mapped reads of up to mmap_size bytes, and a busy timeout
+    so a connection waits for a lock instead of failing right away.
+
+    A worker thread calls releaseConnection() at the end of its run(); closeAll()
+    closes the connections that are left when the application exits. Neither may
+    be called while a QSqlDatabase instance for the connection is still kept.
+
+    A thread's connection name is kept in thread-local storage and numbered, not
+    derived from the thread id: ids are reused once a thread exits, so a new thread
+    could otherwise be handed a connection that a finished thread never released."""
+
+    def __init__(self, database_name, cache_size_kb=65536, mmap_size=256 * 1024 * 1024,
+            busy_timeout_ms=5000):
+        self.database_name = database_name
+        self.pragmas = {"journal_mode": "WAL", "cache_size": -cache_size_kb, # Negative is in KiB
+            "mmap_size": mmap_size, "busy_timeout": busy_timeout_ms}
+        self.prefix = "connection_{}".format(id(self))
+        self.numbers = itertools.count()
+        self.local = threading.local() # The calling thread's connection name
+        self.names = set() # Names of the open connections, of every thread
+        self.lock = threading.Lock()
+
+    def connection(self):
+        """Return the open connection of the calling thread, opening it on first use.
+        Raise RuntimeError if the database can't be opened."""
+        name = getattr(self.local, "name", None)
+        with self.lock:
+            is_open = name in self.names # closeAll() may have closed it since
+        if is_open:
+            return QSqlDatabase.database(name, False)
+
+        with self.lock:
+            name = "{}_{}".format(self.prefix, next(self.numbers))
+        database = QSqlDatabase.addDatabase("QSQLITE", name)
+        database.setDatabaseName(self.database_name)
+        if not database.open():
+            error = database.lastError().text()
+            del database # The connection can only be removed once no instance refers to it
+            QSqlDatabase.removeDatabase(name)
+            raise RuntimeError("Unable to open {}: {}".format(self.database_name, error))
+        self.configure(database)
+        with self.lock:
+            self.names.add(name)
+        self.local.name = name
+        return database
+
+    def configure(self, database):
+        query = QSqlQuery(database)
+        for pragma, value in self.pragmas.items():
+            query.exec_("PRAGMA {} = {}".format(pragma, value))
+        query.exec_("PRAGMA journal_mode")
+        if query.next() and query.value(0).lower() != "wal" and self.database_name != ":memory:":
+            print("[WARNING] Could not switch {} to WAL mode.".format(self.database_name))
+        query.finish()
+
+    def releaseConnection(self):
+        """Close and remove the connection of the calling thread, if it has one."""
+        name, self.local.name = getattr(self.local, "name", None), None
+        with self.lock:
+            is_open = name in self.names
+            self.names.discard(name)
+        if is_open:
+            closeConnection(name)
+
+    def closeAll(self):
+        """Close and remove every connection that is left. Call it once the worker
+        threads have finished, e.g. when the application exits."""
+        with self.lock:
+            names, self.names = list(self.names), set()
+        for name in names:
+            closeConnection(name)
+
+def closeConnection(name):
+    # Removing a connection closes it. QSqlDatabase.database() isn't used, as it
+    # refuses connections that another thread opened, such as one that a finished
+    # thread never released
+    QSqlDatabase.removeDatabase(name)
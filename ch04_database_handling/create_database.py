@@ -3,197 +3,258 @@ Written by Joshua Willman
 Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
 """
 # Import necessary modules
-import sys, os
+import sys, os, csv, time, datetime, argparse, tempfile
 from PyQt5.QtCore import QCoreApplication
 from PyQt5.QtSql import QSqlDatabase, QSqlQuery
+from database_schema import createTables, createIndexes, analyzeDatabase
+from synthetic_data import SyntheticData
+from connection_manager import ConnectionManager
 
 # Uncomment to load all relevant information about the different plugins,
 # in this case SQL Drivers, that PyQt is trying to load. Useful if you want to use 
 # plugins other than SQLite and are getting errors 
 #os.environ['QT_DEBUG_PLUGINS'] = "1"
 
-class CreateDatabaseObjects():
-    """Select the SQL driver and set up the database tables."""
-    # Create connection to the database. If .sql file does not exist,
-    # a new .sql file will be created.
-    database = QSqlDatabase.addDatabase("QSQLITE") # SQLite version 3 
-    database.setDatabaseName("databases/FishingStores.sql")
+def parseCommandLine():
+    """Use argparse to parse the command line for the database file, how it is
+    loaded and the size of the synthetic data for the scale mode."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-f", "--file", type=str, default=None,
+        help="Database file (default: databases/FishingStores.sql, or \
+            databases/FishingStores_scale.sql with --scale)")
+    parser.add_argument("-s", "--scale", type=int, default=0,
+        help="Generate this many synthetic customers instead of loading the sample data")
+    parser.add_argument("--orders-per-customer", type=float, default=2.0,
+        help="With --scale, the average number of orders per customer")
+    parser.add_argument("--stores", type=int, default=2,
+        help="With --scale, the number of stores (up to 16)")
+    parser.add_argument("--seed", type=int, default=41,
+        help="With --scale, the seed of the generator; the same seed gives the same data")
+    parser.add_argument("--chunk-size", type=int, default=50000,
+        help="With --scale, rows generated and inserted at a time")
+    parser.add_argument("--log", type=str, default=None,
+        help="CSV file to append the settings and throughput of the load to")
+    parser.add_argument("--synchronous", type=str, choices=['OFF', 'NORMAL', 'FULL'],
+        default="NORMAL", help="SQLite synchronous setting used while loading")
+    parser.add_argument("--compare-rows", type=int, default=2000,
+        help="With --scale, also load this many rows of each table one at a time without \
+            a transaction (the original path) into a temporary database and compare; 0 skips it")
+    args = vars(parser.parse_args())
+    return args
 
-    if not database.open():
+# Sample data for the tables
+CUSTOMERS = [["James", "Smith", 'NULL'], ["Mary", "Johnson", 'NULL'], 
+              ["John", "Williams", 'NULL'], ["Patricia", "Brown", '(716) 472-1234'],
+              ["Lijing", "Ye", 'NULL'], ["Andrea", "Cotman", 'NULL'],
+              ["Aaron", "Rountree", 'NULL'], ["Malik", "Ranger", 'NULL'], 
+              ["Helen", "Rodriguez", 'NULL'], ["Linda", "Martinez", 'NULL'],
+              ["William", "Hernandez", '(757) 408-1121'], ["Elizabeth", "Lopez", '(804) 543-9876'], 
+              ["David", "Gonzalez", 'NULL'], ["Barbara", "Wilson", 'NULL'], 
+              ["Richard", "Anderson", 'NULL'], ["Susan", "Thomas", '(213) 854-7771'], 
+              ["Joseph", "Taylor", '(609) 341-9801'], ["Jessica", "Moore", '(707) 121-0909'], 
+              ["Thomas", "Jackson", 'NULL'], ["Sarah", "Martin", 'NULL'], 
+              ["Ryan", "Lee", 'NULL'], ["Cynthia", "Perez", '(754) 908-5432'], 
+              ["Jacob", "Thompson", '(763) 765-1023'], ["Kathleen", "White", 'NULL'], 
+              ["Gary", "Harris", 'NULL'], ["Amy", "Sanchez", '(213) 198-4510'], 
+              ["Nicholas", "Clark", 'NULL'], ["Shirley", "Ramirez", '(231) 480-1567'], 
+              ["Eric", "Lewis", 'NULL'], ["Angela", "Miller", 'NULL']]
+
+STORES = [['Boston Fish Supplies', '(617) 987-6543', 'MA'],
+          ['Miami Fish Supplies', '(786) 123-4567', 'FL']]
+
+ORDERS = [[2, '2020-01-04', 1, 1], [18, '2020-01-05', 2, 1], [30, '2020-01-08', 1, 2], [6, '2020-01-10', 3, 2],
+            [21, '2020-01-11', 1, 2], [19, '2020-01-11', 3, 1], [27, '2020-01-12', 3, 1], [1, '2020-01-14', 2, 2],
+            [5, '2020-01-15', 1, 2], [29, '2020-01-15', 2, 1], [28, '2020-01-16', 1, 2], [9, '2020-01-17', 1, 1],
+            [26, '2020-01-17', 2, 2], [10, '2020-01-18', 3, 1], [3, '2020-01-18', 3, 2], [11, '2020-01-19', 4, 2],
+            [14, '2020-01-20', 1, 1], [20, '2020-01-20', 2, 1], [8, '2020-01-20', 3, 1], [12, '2020-01-20', 2, 2],
+            [15, '2020-01-21', 4, 1], [4, '2020-01-23', 1, 1], [22, '2020-01-24', 3, 2], [13, '2020-01-26', 2, 2],
+            [7, '2020-01-26', 1, 2], [16, '2020-01-27', 3, 2], [17, '2020-01-29', 2, 1], [23, '2020-01-30', 3, 1], 
+            [24, '2020-02-01', 1, 2], [25, '2020-02-03',2, 2]]
+
+PRODUCTS = [['Orca Topwater Lure, 7 1/2"', 27.99, 2019], ['Feather Lure, 6"', 12.99, 2019],
+            ['Sailure Fishing Lure, 5 1/2"', 24.99, 2020], ['Waxwing Saltwater Jig, 1/2 oz.', 13.99, 2020],
+            ['7\'3" Bait-Stik Spinning Rod', 59.99, 2018], ['6\'6" Handcrafted Spinning Rod', 119.95, 2019],
+            ['7\' Lite Spinning Rod', 169.99, 2020], ['7\' Boat Spinning Rod', 79.99, 2020],
+            ['6\'6" Conventional Rod', 69.99, 2020], ['165 qt. Maxcold Cooler', 129.99, 2018],
+            ['120 qt. Premium Marine Cooler', 399.99, 2019], ['5.3 Lever Drag Casting Reel', 199.99, 2018],
+            ['4.6 Lever Drag Casting Reel', 249.99, 2020], ['Offshore Tackle Bag', 159.99, 2017]]
+
+ORDER_PRODUCTS = [[1, 2, 1, 24.99], [2, 14, 2, 159.99], [3, 11, 1, 399.99], [4, 1, 8, 27.99], [5, 1, 2, 12.99], 
+                  [6, 4, 4, 13.99], [7, 1, 1, 27.99], [8, 8, 2, 79.99], [9, 8, 1, 79.99], [10, 13, 1, 249.99],
+                  [11, 1, 1, 27.99], [12, 11, 3, 399.99], [13, 12, 2, 199.99], [14, 7, 1, 169.99], [15, 3, 3, 24.99], 
+                  [16, 10, 1, 129.99], [17, 13, 1, 249.99], [18, 6, 2, 119.95], [19, 5, 1, 59.99], [20, 8, 1, 79.99],
+                  [21, 6, 1, 119.95], [22, 5, 2, 59.99], [23, 14, 1, 159.99], [24, 2, 2, 12.99], [25, 1, 1, 27.99], 
+                  [26, 10, 1, 129.99], [27, 2, 3, 12.99], [28, 9, 1, 69.99], [29, 13, 1, 249.99], [30, 6, 1, 119.95]]
+
+# Columns filled for each table, in the order of the values in the data above
+TABLE_COLUMNS = {
+    "customers": ["first_name", "last_name", "phone", "email"],
+    "stores": ["store_name", "phone", "state"],
+    "orders": ["customer_id", "order_date", "order_status", "store_id"],
+    "products": ["product_name", "list_price", "model_year"],
+    "order_products": ["order_id", "product_id", "quantity", "list_price"]}
+
+def createConnection(connections):
+    """Open this thread's connection from the ConnectionManager connections. If the
+    file does not exist, a new one is created."""
+    try:
+        return connections.connection() # SQLite version 3
+    except RuntimeError as error:
         print("Unable to open data source file.")
-        print("Connection failed: ", database.lastError().text())
+        print("Connection failed: ", error)
         sys.exit(1) # Error code 1 - signifies error in opening file
 
-    query = QSqlQuery()
-
-    # Erase tables if they already exist (avoids having duplicate data)
-    query.exec_("DROP TABLE IF EXISTS customers")
-    query.exec_("DROP TABLE IF EXISTS stores")
-    query.exec_("DROP TABLE IF EXISTS orders")
-    query.exec_("DROP TABLE IF EXISTS products")
-    query.exec_("DROP TABLE IF EXISTS order_products")
-
-    # Create customers table
-    query.exec_("""CREATE TABLE customers (
-            customer_id INTEGER PRIMARY KEY AUTOINCREMENT UNIQUE NOT NULL,
-            first_name VARCHAR (100) NOT NULL,
-            last_name VARCHAR (100) NOT NULL,
-            phone VARCHAR (25),
-            email VARCHAR (255) NOT NULL)""")
-
-    # Create stores table
-    query.exec_("""CREATE TABLE stores (
-            store_id INTEGER PRIMARY KEY AUTOINCREMENT UNIQUE NOT NULL,
-            store_name VARCHAR (100) NOT NULL,
-            phone VARCHAR (25),
-            state VARCHAR (5))""")
-
-    # Create orders table
-    # order_status: Pending = 1, Processing = 2, Completed = 3, Rejected = 4
-    query.exec_("""CREATE TABLE orders (
-            order_id INTEGER PRIMARY KEY AUTOINCREMENT UNIQUE NOT NULL,
-            customer_id INTEGER,
-            order_date TEXT NOT NULL,
-            order_status TINYINT NOT NULL,
-            store_id INTEGER NOT NULL,
-            FOREIGN KEY (customer_id) REFERENCES customers (customer_id),
-            FOREIGN KEY (store_id) REFERENCES stores (store_name))""")
-
-    # Create products table
-    query.exec_("""CREATE TABLE products (
-            product_id INTEGER PRIMARY KEY AUTOINCREMENT UNIQUE NOT NULL,
-            product_name VARCHAR (100) NOT NULL,
-            model_year VARCHAR (100) NOT NULL,
-            list_price DECIMAL (10, 2) NOT NULL)""")
-
-    # Create order_products table
-    query.exec_("""CREATE TABLE order_products (
-            order_id INTEGER,
-            product_id INTEGER,
-            quantity INTEGER NOT NULL,
-            list_price DECIMAL (10, 2) NOT NULL,
-            FOREIGN KEY (order_id) REFERENCES orders (order_id),
-            FOREIGN KEY (product_id) REFERENCES products (product_name))""")
-
-class InsertDataIntoTables():
-    """Create data and populate the tables.""" 
-    customers = [["James", "Smith", 'NULL'], ["Mary", "Johnson", 'NULL'], 
-                  ["John", "Williams", 'NULL'], ["Patricia", "Brown", '(716) 472-1234'],
-                  ["Lijing", "Ye", 'NULL'], ["Andrea", "Cotman", 'NULL'],
-                  ["Aaron", "Rountree", 'NULL'], ["Malik", "Ranger", 'NULL'], 
-                  ["Helen", "Rodriguez", 'NULL'], ["Linda", "Martinez", 'NULL'],
-                  ["William", "Hernandez", '(757) 408-1121'], ["Elizabeth", "Lopez", '(804) 543-9876'], 
-                  ["David", "Gonzalez", 'NULL'], ["Barbara", "Wilson", 'NULL'], 
-                  ["Richard", "Anderson", 'NULL'], ["Susan", "Thomas", '(213) 854-7771'], 
-                  ["Joseph", "Taylor", '(609) 341-9801'], ["Jessica", "Moore", '(707) 121-0909'], 
-                  ["Thomas", "Jackson", 'NULL'], ["Sarah", "Martin", 'NULL'], 
-                  ["Ryan", "Lee", 'NULL'], ["Cynthia", "Perez", '(754) 908-5432'], 
-                  ["Jacob", "Thompson", '(763) 765-1023'], ["Kathleen", "White", 'NULL'], 
-                  ["Gary", "Harris", 'NULL'], ["Amy", "Sanchez", '(213) 198-4510'], 
-                  ["Nicholas", "Clark", 'NULL'], ["Shirley", "Ramirez", '(231) 480-1567'], 
-                  ["Eric", "Lewis", 'NULL'], ["Angela", "Miller", 'NULL']]	   
-
-    stores = [['Boston Fish Supplies', '(617) 987-6543', 'MA'],
-              ['Miami Fish Supplies', '(786) 123-4567', 'FL']]
-
-    orders = [[2, '2020-01-04', 1, 1], [18, '2020-01-05', 2, 1], [30, '2020-01-08', 1, 2], [6, '2020-01-10', 3, 2],
-                [21, '2020-01-11', 1, 2], [19, '2020-01-11', 3, 1], [27, '2020-01-12', 3, 1], [1, '2020-01-14', 2, 2],
-                [5, '2020-01-15', 1, 2], [29, '2020-01-15', 2, 1], [28, '2020-01-16', 1, 2], [9, '2020-01-17', 1, 1],
-                [26, '2020-01-17', 2, 2], [10, '2020-01-18', 3, 1], [3, '2020-01-18', 3, 2], [11, '2020-01-19', 4, 2],
-                [14, '2020-01-20', 1, 1], [20, '2020-01-20', 2, 1], [8, '2020-01-20', 3, 1], [12, '2020-01-20', 2, 2],
-                [15, '2020-01-21', 4, 1], [4, '2020-01-23', 1, 1], [22, '2020-01-24', 3, 2], [13, '2020-01-26', 2, 2],
-                [7, '2020-01-26', 1, 2], [16, '2020-01-27', 3, 2], [17, '2020-01-29', 2, 1], [23, '2020-01-30', 3, 1], 
-                [24, '2020-02-01', 1, 2], [25, '2020-02-03',2, 2]]
-
-    products = [['Orca Topwater Lure, 7 1/2"', 27.99, 2019], ['Feather Lure, 6"', 12.99, 2019],
-                ['Sailure Fishing Lure, 5 1/2"', 24.99, 2020], ['Waxwing Saltwater Jig, 1/2 oz.', 13.99, 2020],
-                ['7\'3" Bait-Stik Spinning Rod', 59.99, 2018], ['6\'6" Handcrafted Spinning Rod', 119.95, 2019],
-                ['7\' Lite Spinning Rod', 169.99, 2020], ['7\' Boat Spinning Rod', 79.99, 2020],
-                ['6\'6" Conventional Rod', 69.99, 2020], ['165 qt. Maxcold Cooler', 129.99, 2018],
-                ['120 qt. Premium Marine Cooler', 399.99, 2019], ['5.3 Lever Drag Casting Reel', 199.99, 2018],
-                ['4.6 Lever Drag Casting Reel', 249.99, 2020], ['Offshore Tackle Bag', 159.99, 2017]]
-
-    order_products = [[1, 2, 1, 24.99], [2, 14, 2, 159.99], [3, 11, 1, 399.99], [4, 1, 8, 27.99], [5, 1, 2, 12.99], 
-                      [6, 4, 4, 13.99], [7, 1, 1, 27.99], [8, 8, 2, 79.99], [9, 8, 1, 79.99], [10, 13, 1, 249.99],
-                      [11, 1, 1, 27.99], [12, 11, 3, 399.99], [13, 12, 2, 199.99], [14, 7, 1, 169.99], [15, 3, 3, 24.99], 
-                      [16, 10, 1, 129.99], [17, 13, 1, 249.99], [18, 6, 2, 119.95], [19, 5, 1, 59.99], [20, 8, 1, 79.99],
-                      [21, 6, 1, 119.95], [22, 5, 2, 59.99], [23, 14, 1, 159.99], [24, 2, 2, 12.99], [25, 1, 1, 27.99], 
-                      [26, 10, 1, 129.99], [27, 2, 3, 12.99], [28, 9, 1, 69.99], [29, 13, 1, 249.99], [30, 6, 1, 119.95]]
-
-    # Create the QSqlQuery instance
-    query = QSqlQuery()
-
-    # Positional binding to insert records into the customers table
-    query.prepare("INSERT INTO customers (first_name, last_name, phone, email) VALUES (?, ?, ?, ?)")
-    # Add the values to the query to be inserted into the customers table
-    for i in range(len(customers)):
-        first_name = customers[i][0]
-        last_name = customers[i][1]
-        phone = customers[i][2]
-        email = (last_name).lower() + "." + (first_name).lower() + "@email.com"
-        query.addBindValue(first_name)
-        query.addBindValue(last_name)
-        query.addBindValue(phone)
-        query.addBindValue(email)
-        query.exec_()
-
-    # Positional binding to insert records into the stores table 
-    query.prepare("INSERT INTO stores (store_name, phone, state) VALUES (?, ?, ?)")
-    # Add the values to the query to be inserted into the stores table
-    for i in range(len(stores)):
-        store_name = stores[i][0]
-        phone = stores[i][1]
-        state = stores[i][2]
-        query.addBindValue(store_name)
-        query.addBindValue(phone)
-        query.addBindValue(state)
-        query.exec_() 
-    
-    # Positional binding to insert records into the orders table
-    query.prepare("INSERT INTO orders (customer_id, order_date, order_status, store_id) VALUES (?, ?, ?, ?)")
-    # Add the values to the query to be inserted into the orders table
-    for i in range(len(orders)):
-        customer_id = orders[i][0]
-        order_date = orders[i][1]
-        order_status = orders[i][2]
-        store_id = orders[i][3]
-        query.addBindValue(customer_id)
-        query.addBindValue(order_date)
-        query.addBindValue(order_status)
-        query.addBindValue(store_id)
-        query.exec_()    
-
-    # Positional binding to insert records into the products table
-    query.prepare("INSERT INTO products (product_name, model_year, list_price) VALUES (?, ?, ?)")  
-    # Add the values to the query to be inserted into the products table
-    for i in range(len(products)):
-        product_name = products[i][0]
-        model_year = products[i][1]
-        list_price = products[i][2]
-        query.addBindValue(product_name)
-        query.addBindValue(model_year)
-        query.addBindValue(list_price)
-        query.exec_()   
-
-    # Positional binding to insert records into the order_products table
-    query.prepare("INSERT INTO order_products (order_id, product_id, quantity, list_price) VALUES (?, ?, ?, ?)")  
-    # Add the values to the query to be inserted into the order_products table
-    for i in range(len(order_products)):
-        order_id = order_products[i][0]
-        product_id = order_products[i][1]
-        quantity = order_products[i][2]
-        list_price = order_products[i][3]
-        query.addBindValue(order_id)
-        query.addBindValue(product_id)
-        query.addBindValue(quantity)
-        query.addBindValue(list_price)
-        query.exec_()   
+def setLoadPragmas(database, synchronous="NORMAL"):
+    """Switch the database to write-ahead logging and set how often SQLite syncs to
+    disk on this connection. In WAL mode, NORMAL only syncs at checkpoints, and a
+    crash can lose the last transactions but can't corrupt the database."""
+    query = QSqlQuery(database)
+    query.exec_("PRAGMA journal_mode=WAL")
+    if not query.next() or query.value(0).lower() != "wal":
+        print("[WARNING] Could not switch the database to WAL mode.")
+    query.exec_("PRAGMA synchronous={}".format(synchronous))
 
-    print("[INFO] Database successfully created.")
-    sys.exit(0) # Exit the program after creating the database 
+def bulkInsert(database, table, columns, chunks):
+    """Insert rows into table in a single transaction. chunks is an iterable of
+    chunks of rows, each holding one list per column in the order of columns; each
+    chunk is bound as lists and sent with one execBatch() call, so the rows can be
+    generated while they are inserted. Return the number of rows inserted."""
+    query = QSqlQuery(database)
+    query.prepare("INSERT INTO {} ({}) VALUES ({})".format(
+        table, ", ".join(columns), ", ".join("?" * len(columns))))
+
+    row_count = 0
+    database.transaction()
+    for chunk in chunks:
+        for column_values in chunk:
+            query.addBindValue(column_values)
+        if not query.execBatch():
+            error = query.lastError().text()
+            database.rollback()
+            raise RuntimeError("Inserting into {} failed: {}".format(table, error))
+        row_count += len(chunk[0])
+    if not database.commit():
+        raise RuntimeError("Committing {} failed: {}".format(table, database.lastError().text()))
+    return row_count
+
+def insertRowByRow(database, table, columns, chunks):
+    """The original loader: positional binding and one exec_() per row, outside of 
+    a transaction, so SQLite commits every row. Return the number of rows inserted."""
+    query = QSqlQuery(database)
+    query.prepare("INSERT INTO {} ({}) VALUES ({})".format(
+        table, ", ".join(columns), ", ".join("?" * len(columns))))
+    row_count = 0
+    for chunk in chunks:
+        for row in zip(*chunk):
+            for value in row:
+                query.addBindValue(value)
+            query.exec_()
+            row_count += 1
+    return row_count
+
+def sampleData():
+    """Return the sample data as a dict of table name: one list per column."""
+    emails = [last_name.lower() + "." + first_name.lower() + "@email.com"
+        for first_name, last_name, _ in CUSTOMERS]
+    rows = {"customers": [customer + [email] for customer, email in zip(CUSTOMERS, emails)],
+        "stores": STORES, "orders": ORDERS, "products": PRODUCTS, "order_products": ORDER_PRODUCTS}
+    return {table: [list(column) for column in zip(*rows[table])] for table in TABLE_COLUMNS}
+
+def timedChunks(chunks, timer):
+    """Yield the chunks, adding the seconds spent producing them to timer["generate"]."""
+    chunks = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        timer["generate"] += time.perf_counter() - start
+        if chunk is None:
+            return
+        yield chunk
+
+def loadTables(database, data, insert_function):
+    """Insert data, a dict of table name: iterable of chunks, into every table with
+    insert_function. Return a list of (table, rows, seconds, generate seconds) for
+    each table, where the total seconds include the time spent generating the chunks."""
+    timings = []
+    for table, columns in TABLE_COLUMNS.items():
+        timer = {"generate": 0.0}
+        start = time.perf_counter()
+        row_count = insert_function(database, table, columns, timedChunks(data[table], timer))
+        timings.append((table, row_count, time.perf_counter() - start, timer["generate"]))
+    return timings
+
+def printTimings(title, timings):
+    """Print the rows per second of each table and of the whole load. Return the
+    overall rate."""
+    print(title)
+    print("  {:15} {:>15} {:>11} {:>12} {:>15}".format("table", "rows", "total",
+        "generating", "rows/s"))
+    for table, row_count, elapsed, generating in timings + [("total",
+            sum(timing[1] for timing in timings), sum(timing[2] for timing in timings),
+            sum(timing[3] for timing in timings))]:
+        print("  {:15} {:10d} rows {:9.3f} s {:10.3f} s {:8.0f} rows/s".format(
+            table, row_count, elapsed, generating, row_count / elapsed if elapsed else 0))
+    total_rows = sum(timing[1] for timing in timings)
+    total_time = sum(timing[2] for timing in timings)
+    return total_rows / total_time if total_time else 0
+
+def logThroughput(log_name, database_name, args, timings):
+    """Append one CSV row with the settings and throughput of the load to log_name,
+    writing a header first if the file is new."""
+    total_rows = sum(timing[1] for timing in timings)
+    total_time = sum(timing[2] for timing in timings)
+    new_file = not os.path.exists(log_name)
+    with open(log_name, "a", newline="") as log_f:
+        writer = csv.writer(log_f)
+        if new_file:
+            writer.writerow(["date", "database", "scale", "seed", "chunk_size", "synchronous",
+                "rows", "seconds", "generate_seconds", "rows_per_second"])
+        writer.writerow([datetime.datetime.now().isoformat(timespec="seconds"), database_name,
+            args["scale"], args["seed"], args["chunk_size"], args["synchronous"], total_rows,
+            round(total_time, 3), round(sum(timing[3] for timing in timings), 3),
+            round(total_rows / total_time if total_time else 0)])
 
 if __name__ == "__main__":
+    args = parseCommandLine() # Return any command line arguments
     app = QCoreApplication(sys.argv)
-    CreateDatabaseObjects()
-    InsertDataIntoTables()
-    sys.exit(app.exec_())
\ No newline at end of file
+    database_name = args["file"] or ("databases/FishingStores_scale.sql" if args["scale"]
+        else "databases/FishingStores.sql")
+    if args["scale"]:
+        generator = SyntheticData(args["scale"], PRODUCTS, args["stores"],
+            args["orders_per_customer"], seed=args["seed"])
+        data = {table: generator.chunks(table, args["chunk_size"]) for table in TABLE_COLUMNS}
+    else:
+        data = {table: [columns] for table, columns in sampleData().items()}
+
+    connections = ConnectionManager(database_name)
+    database = createConnection(connections)
+    createTables(database)
+    setLoadPragmas(database, args["synchronous"])
+    timings = loadTables(database, data, bulkInsert)
+    bulk_rate = printTimings("[INFO] Bulk load into {}:".format(database_name), timings)
+    if args["log"]:
+        logThroughput(args["log"], database_name, args, timings)
+    start = time.perf_counter()
+    createIndexes(database)
+    analyzeDatabase(database)
+    print("[INFO] Created the indexes and ran ANALYZE in {:.3f} s.".format(time.perf_counter() - start))
+    del database # The connection can only be removed once no instance refers to it
+    connections.closeAll()
+
+    if args["scale"] and args["compare_rows"]:
+        # The original path on the first rows of each table, in a throwaway database
+        # opened with the default connection and settings
+        subset = {table: [next(generator.chunks(table, args["compare_rows"]))]
+            for table in TABLE_COLUMNS}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            database = QSqlDatabase.addDatabase("QSQLITE")
+            database.setDatabaseName(os.path.join(temp_dir, "compare.sql"))
+            database.open()
+            createTables(database)
+            row_rate = printTimings("[INFO] Row-by-row load (original path):",
+                loadTables(database, subset, insertRowByRow))
+            database.close()
+        print("[INFO] Bulk load is {:.0f}x faster per row.".format(bulk_rate / row_rate))
+
+    print("[INFO] Database successfully created.")
+    sys.exit(0)
@@ -0,0 +1,96 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import os, json, hmac, hashlib
+from PyQt5.QtSql import QSqlQuery
+from PyQt5.QtCore import QByteArray
+from database_schema import execStatement
+
+# Login accounts. Passwords are stored as salted PBKDF2-SHA256 hashes, with the
+# number of iterations per account so it can be raised for new accounts later.
+# The unique index makes looking up a user name a B-tree search, so checking a
+# login takes the same time however many accounts there are
+CREDENTIALS_TABLE = """CREATE TABLE IF NOT EXISTS credentials (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+        username VARCHAR (100) NOT NULL,
+        salt BLOB NOT NULL,
+        password_hash BLOB NOT NULL,
+        iterations INTEGER NOT NULL)"""
+CREDENTIALS_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS credentials_username ON credentials (username)"
+PBKDF2_ITERATIONS = 100000
+
+def hashPassword(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+
+class CredentialStore:
+    """Login accounts in the credentials table of database, checked and added
+    through statements that are prepared once. If the table doesn't exist yet, it is
+    created and the accounts of json_file (the old login.json) are imported, so the
+    file is read once rather than on every login."""
+
+    def __init__(self, database, json_file="files/login.json", iterations=PBKDF2_ITERATIONS):
+        self.database = database
+        self.iterations = iterations
+        if "credentials" not in database.tables():
+            self.createTable(json_file)
+
+        self.lookup_query = QSqlQuery(database)
+        self.lookup_query.prepare("SELECT salt, password_hash, iterations FROM credentials WHERE username = ?")
+        # Hashed for unknown users, so they take as long to reject as a wrong password
+        self.dummy = (os.urandom(16), b"", iterations)
+
+    def createTable(self, json_file):
+        execStatement(self.database, CREDENTIALS_TABLE)
+        execStatement(self.database, CREDENTIALS_INDEX)
+        if os.path.exists(json_file):
+            with open(json_file) as json_f:
+                login_data = json.load(json_f)
+            self.addUsers([(login["username"], login["password"]) for login in login_data["loginList"]])
+
+    def account(self, user_name):
+        """Return (salt, hash, iterations) of user_name, or None if there is no such user."""
+        self.lookup_query.addBindValue(user_name)
+        if not self.lookup_query.exec_():
+            raise RuntimeError(self.lookup_query.lastError().text())
+        account = None
+        if self.lookup_query.next():
+            account = (bytes(self.lookup_query.value(0)), bytes(self.lookup_query.value(1)),
+                self.lookup_query.value(2))
+        self.lookup_query.finish()
+        return account
+
+    def verify(self, user_name, password):
+        """Return True if password is the password of user_name."""
+        account = self.account(user_name)
+        salt, password_hash, iterations = account if account is not None else self.dummy
+        # compare_digest() takes the same time wherever the hashes differ
+        return hmac.compare_digest(hashPassword(password, salt, iterations), password_hash) \
+            and account is not None
+
+    def addUser(self, user_name, password):
+        """Add an account. Return False if the user name is already taken."""
+        if self.account(user_name) is not None:
+            return False
+        self.addUsers([(user_name, password)])
+        return True
+
+    def addUsers(self, accounts):
+        """Add a list of (user name, password) in one transaction, with one execBatch()
+        call. Raise RuntimeError if it fails, e.g. because a user name is taken."""
+        rows = []
+        for user_name, password in accounts:
+            salt = os.urandom(16)
+            # Python bytes would be bound as text, so blobs are bound as QByteArray
+            rows.append((user_name, QByteArray(salt),
+                QByteArray(hashPassword(password, salt, self.iterations)), self.iterations))
+        query = QSqlQuery(self.database)
+        query.prepare("INSERT INTO credentials (username, salt, password_hash, iterations) VALUES (?, ?, ?, ?)")
+        for column in zip(*rows):
+            query.addBindValue(list(column))
+        self.database.transaction()
+        if not query.execBatch():
+            self.database.rollback()
+            raise RuntimeError(query.lastError().text())
+        self.database.commit()
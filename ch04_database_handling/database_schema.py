@@ -0,0 +1,93 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+from PyQt5.QtSql import QSqlQuery
+
+# Tables of the FishingStores database, in the order they are created. An INTEGER
+# PRIMARY KEY is the rowid, so it is unique without a separate UNIQUE index
+TABLES = {
+    "customers": """CREATE TABLE customers (
+            customer_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            first_name VARCHAR (100) NOT NULL,
+            last_name VARCHAR (100) NOT NULL,
+            phone VARCHAR (25),
+            email VARCHAR (255) NOT NULL)""",
+
+    "stores": """CREATE TABLE stores (
+            store_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            store_name VARCHAR (100) NOT NULL,
+            phone VARCHAR (25),
+            state VARCHAR (5))""",
+
+    # order_status: Pending = 1, Processing = 2, Completed = 3, Rejected = 4
+    "orders": """CREATE TABLE orders (
+            order_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            customer_id INTEGER,
+            order_date TEXT NOT NULL,
+            order_status TINYINT NOT NULL,
+            store_id INTEGER NOT NULL,
+            FOREIGN KEY (customer_id) REFERENCES customers (customer_id),
+            FOREIGN KEY (store_id) REFERENCES stores (store_id))""",
+
+    "products": """CREATE TABLE products (
+            product_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            product_name VARCHAR (100) NOT NULL,
+            model_year VARCHAR (100) NOT NULL,
+            list_price DECIMAL (10, 2) NOT NULL)""",
+
+    "order_products": """CREATE TABLE order_products (
+            order_id INTEGER,
+            product_id INTEGER,
+            quantity INTEGER NOT NULL,
+            list_price DECIMAL (10, 2) NOT NULL,
+            FOREIGN KEY (order_id) REFERENCES orders (order_id),
+            FOREIGN KEY (product_id) REFERENCES products (product_id))"""}
+
+# Secondary indexes for the foreign keys that the joins follow, and for the order
+# dates that reports filter on. The primary keys are already indexed as the tables'
+# rowids. orders.store_id has no index of its own: with a handful of stores, it
+# matches too many rows to beat a table scan. The extra columns make the indexes
+# covering, so the joins from orders to their products, from products to their
+# orders and date range reports by store don't have to read the tables themselves
+INDEXES = {
+    "orders_customer_id": "CREATE INDEX IF NOT EXISTS orders_customer_id ON orders (customer_id)",
+    "orders_order_date":
+        "CREATE INDEX IF NOT EXISTS orders_order_date ON orders (order_date, store_id)",
+    "order_products_order_id": """CREATE INDEX IF NOT EXISTS order_products_order_id
+        ON order_products (order_id, product_id, quantity, list_price)""",
+    "order_products_product_id":
+        "CREATE INDEX IF NOT EXISTS order_products_product_id ON order_products (product_id, order_id)"}
+
+def execStatement(database, statement):
+    """Run statement on database. Raise RuntimeError if it fails."""
+    query = QSqlQuery(database)
+    if not query.exec_(statement):
+        raise RuntimeError("{} failed: {}".format(statement.split("(")[0].strip(),
+            query.lastError().text()))
+    return query
+
+def createTables(database):
+    """Create the tables, dropping any that already exist (avoids having duplicate
+    data). The indexes are created separately, after the data is loaded, which is
+    faster than updating them for every inserted row."""
+    for table in TABLES:
+        execStatement(database, "DROP TABLE IF EXISTS {}".format(table))
+    for statement in TABLES.values():
+        execStatement(database, statement)
+
+def createIndexes(database):
+    """Create the secondary indexes that don't exist yet."""
+    for statement in INDEXES.values():
+        execStatement(database, statement)
+
+def dropIndexes(database):
+    """Drop the secondary indexes, e.g. before a bulk load or to compare query plans."""
+    for index in INDEXES:
+        execStatement(database, "DROP INDEX IF EXISTS {}".format(index))
+
+def analyzeDatabase(database):
+    """Gather the table and index statistics that SQLite's query planner uses to
+    choose between indexes and join orders."""
+    execStatement(database, "ANALYZE")
@@ -0,0 +1,211 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+from collections import OrderedDict
+from PyQt5.QtWidgets import QHeaderView
+from PyQt5.QtSql import QSqlQuery
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from query_cache import QueryCache, columnNames
+
+class PagedResultModel(QAbstractTableModel):
+    """Read-only table model for large query results. Rows are fetched in pages of
+    page_size rows when the view scrolls near the end (canFetchMore()/fetchMore()),
+    and only the max_pages most recently used pages are kept in memory, so scrolling
+    through millions of rows uses bounded memory. A page that was dropped is asked
+    for again when the view needs it.
+
+    The model doesn't read the rows itself: it asks for them with more_requested
+    and page_requested, and a page source answers with appendPage() and setPage().
+    QueryPageSource answers right away on the GUI thread; QueryWorkerThread answers
+    from its own thread, and the rows of a page that is still on its way are shown
+    empty until it arrives."""
+    more_requested = pyqtSignal()
+    page_requested = pyqtSignal(int)
+
+    def __init__(self, page_size=1000, max_pages=20):
+        super().__init__()
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.column_names = []
+        self.clear()
+
+    def clear(self):
+        self.pages = OrderedDict() # Page number: rows, from least to most recently used
+        self.pending_pages = set()
+        self.row_count = 0
+        self.at_end = True
+        self.more_pending = False
+
+    def rowCount(self, index=QModelIndex()):
+        return 0 if index.isValid() else self.row_count
+
+    def columnCount(self, index=QModelIndex()):
+        return 0 if index.isValid() else len(self.column_names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        number, offset = divmod(index.row(), self.page_size)
+        if number not in self.pages and number not in self.pending_pages:
+            self.page_requested.emit(number)
+            # A source on another thread answers later; setPage() then refreshes the rows
+            if number not in self.pages:
+                self.pending_pages.add(number)
+        rows = self.pages.get(number)
+        if rows is None or offset >= len(rows): # On its way, or the data changed since
+            return None
+        self.pages.move_to_end(number)
+        return rows[offset][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self.column_names):
+            return self.column_names[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, index=QModelIndex()):
+        return not index.isValid() and not self.at_end
+
+    def fetchMore(self, index=QModelIndex()):
+        if not self.canFetchMore(index) or self.more_pending:
+            return
+        self.more_pending = True
+        self.more_requested.emit()
+
+    def setColumns(self, column_names):
+        """Start a new, empty result with column_names. Pages are then added with appendPage()."""
+        self.beginResetModel()
+        self.column_names = column_names
+        self.clear()
+        self.at_end = False
+        self.endResetModel()
+
+    def appendPage(self, rows, at_end):
+        """Add the next page of rows to the end of the result; at_end is True if it is the last."""
+        self.more_pending = False
+        self.at_end = at_end
+        if rows:
+            number = self.row_count // self.page_size
+            self.beginInsertRows(QModelIndex(), self.row_count, self.row_count + len(rows) - 1)
+            self.storePage(number, rows)
+            self.row_count += len(rows)
+            self.endInsertRows()
+
+    def setPage(self, number, rows):
+        """Store a page that was asked for with page_requested."""
+        self.storePage(number, rows)
+        if number in self.pending_pages and rows:
+            self.pending_pages.discard(number)
+            first_row = number * self.page_size
+            self.dataChanged.emit(self.index(first_row, 0),
+                self.index(first_row + len(rows) - 1, len(self.column_names) - 1))
+
+    def storePage(self, number, rows):
+        self.pages[number] = rows
+        self.pages.move_to_end(number)
+        while len(self.pages) > self.max_pages:
+            self.pages.popitem(last=False) # Drop the least recently used page
+
+class QueryPageSource:
+    """Answers the requests of a PagedResultModel on the GUI thread, through a
+    QueryCache. The next pages are read from one forward-only query, so reading
+    ahead never runs the statement again; a dropped page is read again with LIMIT
+    and OFFSET. Every page that is read is kept in the cache's result cache, so
+    setting the same query again, e.g. when a view is reopened, shows the pages
+    without running it while the data hasn't changed. Only SELECT statements can
+    be paged."""
+
+    def __init__(self, database, model, cache=None):
+        self.database = database
+        self.model = model
+        self.cache = cache if cache is not None else QueryCache(database)
+        self.statement = None
+        self.query = None # Open forward-only query, positioned at row query_offset
+        model.more_requested.connect(self.readNextPage)
+        model.page_requested.connect(self.readPage)
+
+    def setQuery(self, statement):
+        """Show the first page of statement. Raise RuntimeError if it fails."""
+        self.finishQuery()
+        statement = statement.strip().rstrip(";")
+        if statement != self.statement:
+            self.statement = statement
+            self.query = QSqlQuery(self.database)
+            self.query.setForwardOnly(True) # Rows that were read are not kept by the query
+            if not self.query.prepare("SELECT * FROM ({}\n) LIMIT -1 OFFSET ?".format(statement)):
+                self.statement = None
+                raise RuntimeError(self.query.lastError().text())
+        columns, rows = self.readRowsAt(0)
+        self.model.setColumns(columns)
+        self.model.appendPage(rows, len(rows) < self.model.page_size)
+
+    def readNextPage(self):
+        columns, rows = self.readRowsAt(self.model.row_count)
+        self.model.appendPage(rows, len(rows) < self.model.page_size)
+
+    def readPage(self, number):
+        columns, rows = self.cache.execute(pageStatement(self.statement),
+            [self.model.page_size, number * self.model.page_size])
+        self.model.setPage(number, rows)
+
+    def readRowsAt(self, offset):
+        """Return the column names and the page of rows that starts at row offset:
+        from the open query if it is there, else from the result cache, else from
+        the query run again from offset."""
+        parameters = [self.model.page_size, offset]
+        if not self.query.isActive() or self.query_offset != offset:
+            result = self.cache.cachedResult(pageStatement(self.statement), parameters)
+            if result is not None:
+                return result
+            self.finishQuery()
+            self.version = self.cache.dataVersion()
+            self.query.addBindValue(offset)
+            if not self.query.exec_():
+                raise RuntimeError(self.query.lastError().text())
+            self.query_offset = offset
+        columns = columnNames(self.query)
+        rows = readRows(self.query, self.model.page_size)
+        self.query_offset += len(rows)
+        if len(rows) < self.model.page_size:
+            self.finishQuery()
+        self.cache.storeResult(pageStatement(self.statement), parameters, self.version, columns, rows)
+        return columns, rows
+
+    def finishQuery(self):
+        if self.query is not None and self.query.isActive():
+            self.query.finish() # Release the statement, which ends SQLite's read transaction
+
+def readRows(query, row_count):
+    """Read up to row_count rows from query, as lists of values."""
+    column_count = query.record().count()
+    rows = []
+    while len(rows) < row_count and query.next():
+        rows.append([query.value(i) for i in range(column_count)])
+    return rows
+
+def pageStatement(statement):
+    return "SELECT * FROM ({}\n) LIMIT ? OFFSET ?".format(statement) # The statement may end in a comment
+
+def pageQuery(database, statement, number, page_size):
+    """Return an executed query for page number of the SELECT statement. SQLite still
+    steps over the rows before the page, so reading a page far from the start takes longer."""
+    query = QSqlQuery(database)
+    query.setForwardOnly(True)
+    query.prepare(pageStatement(statement))
+    query.addBindValue(page_size)
+    query.addBindValue(number * page_size)
+    query.exec_()
+    return query
+
+def setupHeaders(table_view, sample_rows=1000):
+    """Size the headers of table_view without measuring every row. Rows get a fixed
+    height, and columns are sized to the contents of at most sample_rows rows; the
+    Stretch and ResizeToContents modes would measure every row of the result."""
+    vertical_header = table_view.verticalHeader()
+    vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+    vertical_header.setDefaultSectionSize(table_view.fontMetrics().height() + 8)
+    horizontal_header = table_view.horizontalHeader()
+    horizontal_header.setSectionResizeMode(QHeaderView.Interactive)
+    horizontal_header.setResizeContentsPrecision(sample_rows)
+    horizontal_header.setStretchLastSection(True)
@@ -0,0 +1,100 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+from collections import OrderedDict
+from PyQt5.QtSql import QSqlQuery
+
+class QueryCache:
+    """Query layer for one connection with two caches:
+
+    * Prepared statements, keyed by their SQL text, so a statement that runs again
+      isn't parsed and planned again. The max_statements most recently used are kept.
+    * Results, keyed by the SQL text and the parameters, so a view that is opened
+      again doesn't read its rows again. Each result is stored with the data version
+      of the database, and is only used while the version is the same. The
+      max_results most recently used results are kept; 0 turns the cache off.
+
+    The data version combines PRAGMA data_version, which changes when another
+    connection commits, with total_changes() of this connection, which counts the
+    changes made through it. Checking it is one small query."""
+
+    def __init__(self, database, max_statements=64, max_results=64):
+        self.database = database
+        self.max_statements = max_statements
+        self.max_results = max_results
+        self.statements = OrderedDict() # SQL text: prepared QSqlQuery
+        self.results = OrderedDict() # (SQL text, parameters): (data version, columns, rows)
+        self.hits = self.misses = 0
+        self.version_query = QSqlQuery(database)
+        self.version_query.prepare("SELECT (SELECT data_version FROM pragma_data_version), total_changes()")
+
+    def dataVersion(self):
+        self.version_query.exec_()
+        self.version_query.next()
+        version = (self.version_query.value(0), self.version_query.value(1))
+        self.version_query.finish()
+        return version
+
+    def preparedQuery(self, statement):
+        """Return a forward-only query with statement prepared, or raise RuntimeError."""
+        query = self.statements.get(statement)
+        if query is None:
+            query = QSqlQuery(self.database)
+            query.setForwardOnly(True) # Rows are read once, so don't keep them in the query
+            if not query.prepare(statement):
+                raise RuntimeError(query.lastError().text())
+            self.statements[statement] = query
+            while len(self.statements) > self.max_statements:
+                self.statements.popitem(last=False)
+        self.statements.move_to_end(statement)
+        return query
+
+    def cachedResult(self, statement, parameters=()):
+        """Return (columns, rows) of statement if its result is cached and the data
+        hasn't changed since, else None."""
+        key = (statement, tuple(parameters))
+        cached = self.results.get(key)
+        if cached is not None and cached[0] == self.dataVersion():
+            self.results.move_to_end(key)
+            self.hits += 1
+            return cached[1], cached[2]
+        self.misses += 1
+        return None
+
+    def storeResult(self, statement, parameters, version, columns, rows):
+        """Cache the result of statement, read at the data version that dataVersion()
+        returned before it ran."""
+        if self.max_results <= 0:
+            return
+        key = (statement, tuple(parameters))
+        self.results[key] = (version, columns, rows)
+        self.results.move_to_end(key)
+        while len(self.results) > self.max_results:
+            self.results.popitem(last=False)
+
+    def execute(self, statement, parameters=()):
+        """Run statement with parameters and return its column names and rows, from
+        the result cache if the data hasn't changed. Raise RuntimeError if it fails."""
+        result = self.cachedResult(statement, parameters)
+        if result is not None:
+            return result
+        query = self.preparedQuery(statement)
+        version = self.dataVersion()
+        for value in parameters:
+            query.addBindValue(value)
+        if not query.exec_():
+            raise RuntimeError(query.lastError().text())
+        columns = columnNames(query)
+        rows = []
+        while query.next():
+            rows.append([query.value(i) for i in range(len(columns))])
+        query.finish() # Release the statement, which ends SQLite's read transaction
+        if query.isSelect():
+            self.storeResult(statement, parameters, version, columns, rows)
+        return columns, rows
+
+def columnNames(query):
+    record = query.record()
+    return [record.fieldName(i) for i in range(record.count())]
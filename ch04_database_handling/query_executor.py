@@ -0,0 +1,144 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import time, queue
+from PyQt5.QtCore import QThread, pyqtSignal
+from paged_model import pageQuery
+from sql_script import ScriptRunner, groupStatements, controlsTransactions
+
+class QueryWorkerThread(QThread):
+    """Worker thread that runs a SQL script on its own connection from a
+    ConnectionManager, so a slow query never blocks the GUI. A QSqlDatabase
+    connection can only be used by the thread that opened it, so the connection is
+    opened and released in run().
+
+    The statements come from splitStatements() and run through a ScriptRunner, inside
+    one transaction unless the script controls transactions itself. If a statement
+    fails or the script is cancelled, the transaction is rolled back.
+
+    Each SELECT becomes a numbered result that is shown in a PagedResultModel. The
+    thread sends the first page of each result, keeps the queries open and waits for
+    the models to ask for more with requestNextPage() or requestPage(), so only the
+    pages that the views scroll to are read. It keeps serving pages until it is cancelled.
+
+    The SQLite driver plugin links SQLite statically and doesn't expose
+    sqlite3_interrupt(), so cancelling is cooperative: the thread checks for it
+    between rows and between statements. A statement that spends a long time before
+    returning its first row (e.g. sorting a large table) finishes that step first;
+    the GUI stops listening to the thread right away, so it is never blocked by it."""
+    # Signals for the columns of a new result, its pages (the next page and whether
+    # it is the last, or a page asked for by number), the end of each group of
+    # statements (line, first statement, statements in the group, rows read or
+    # changed, whether a result has more rows, seconds), errors (line, statement,
+    # error) and the end of the script (whether its changes were kept, seconds)
+    columns_ready = pyqtSignal(int, list)
+    page_ready = pyqtSignal(int, list, bool)
+    numbered_page_ready = pyqtSignal(int, int, list)
+    statement_finished = pyqtSignal(int, str, int, int, bool, float)
+    query_failed = pyqtSignal(int, str, str)
+    script_finished = pyqtSignal(bool, float)
+
+    def __init__(self, connections, statements, page_size=1000):
+        super().__init__()
+        self.connections = connections
+        self.statements = statements
+        self.page_size = page_size
+        self.is_cancelled = False
+        self.results = [] # [query, statement, at end] for each SELECT
+        self.requests = queue.Queue() # (result, "next" or a page number), or None to stop
+
+    def cancel(self):
+        """Ask the thread to stop after the current row. Safe to call from the GUI thread."""
+        self.is_cancelled = True
+        self.requests.put(None)
+
+    def requestNextPage(self, result):
+        self.requests.put((result, "next"))
+
+    def requestPage(self, result, number):
+        self.requests.put((result, number))
+
+    def run(self):
+        """Open the thread's connection, run the script, serve the pages of its results
+        and release the connection. Each thread has its own connection, so a cancelled
+        thread that is still finishing a step doesn't share one with the next."""
+        try:
+            database = self.connections.connection()
+        except RuntimeError as error:
+            self.query_failed.emit(0, "", str(error))
+            return
+        self.runScript(database)
+        self.servePages(database)
+        self.results = []
+        del database # The connection can only be removed once no instance refers to it
+        self.connections.releaseConnection()
+
+    def runScript(self, database):
+        start = time.perf_counter()
+        runner = ScriptRunner(database)
+        in_transaction = not controlsTransactions(self.statements) and database.transaction()
+        succeeded = True
+        for line, statements, template, values_list in groupStatements(self.statements):
+            if self.is_cancelled:
+                succeeded = False
+                break
+            group_start = time.perf_counter()
+            try:
+                query, row_count = runner.runGroup(statements, template, values_list)
+            except RuntimeError as error:
+                self.query_failed.emit(line, statements[0], str(error))
+                succeeded = False
+                break
+            more = False
+            if query is not None:
+                result = len(self.results)
+                self.results.append([query, statements[0], False])
+                record = query.record()
+                self.columns_ready.emit(result, [record.fieldName(i) for i in range(record.count())])
+                row_count = self.sendNextPage(result)
+                more = not self.results[result][2]
+            self.statement_finished.emit(line, statements[0], len(statements), row_count, more,
+                time.perf_counter() - group_start)
+
+        kept = succeeded
+        if in_transaction:
+            kept = succeeded and database.commit()
+            if not kept:
+                database.rollback()
+        self.script_finished.emit(kept, time.perf_counter() - start)
+
+    def servePages(self, database):
+        """Answer the models' requests for pages until cancelled."""
+        while self.results and not self.is_cancelled:
+            request = self.requests.get() # Wait for a view to need more rows
+            if request is None:
+                break
+            result, page = request
+            query, statement, at_end = self.results[result]
+            if page == "next":
+                if not at_end:
+                    self.sendNextPage(result)
+            else:
+                page_query = pageQuery(database, statement, page, self.page_size)
+                self.numbered_page_ready.emit(result, page, self.readRows(page_query))
+
+    def sendNextPage(self, result):
+        """Read and send the next page of result. Return the number of rows in it."""
+        query = self.results[result][0]
+        rows = self.readRows(query)
+        at_end = len(rows) < self.page_size
+        if at_end:
+            query.finish()
+        self.results[result][2] = at_end
+        self.page_ready.emit(result, rows, at_end)
+        return len(rows)
+
+    def readRows(self, query):
+        """Read up to page_size rows from query, stopping early if cancelled."""
+        column_count = query.record().count()
+        rows = []
+        while len(rows) < self.page_size and not self.is_cancelled and query.next():
+            rows.append([query.value(i) for i in range(column_count)])
+        return rows
@@ -0,0 +1,268 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import sys, os, csv, json, time, struct, argparse
+from array import array
+from PyQt5.QtSql import QSqlQuery
+from PyQt5.QtCore import QCoreApplication, QThread, QByteArray, pyqtSignal
+from query_cache import columnNames
+from connection_manager import ConnectionManager
+
+# Files in the columnar format start with MAGIC and a JSON header with the column
+# names. The rows follow in chunks: the row count (uint32), then for each column a
+# type code, a bitmap of the NULL rows, and the values. Integers are stored in the
+# narrowest of int8/16/32/64 that holds the chunk (the array type codes "bhiq"),
+# other numbers as float64; text and blobs as an array of byte lengths in the
+# narrowest of uint8/16/32 ("BHI", after the type code), followed by the bytes.
+# The types are chosen per chunk, so a file is written without reading the rows twice
+MAGIC = b"QCOL\x01"
+INTEGERS, REAL, TEXT, BLOB, NULL = "bhiq", b"d", b"T", b"X", b"N"
+LENGTHS = "BHI"
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the query to export and the file to write."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--database", type=str, default="databases/FishingStores.sql",
+        help="Database to query")
+    parser.add_argument("-q", "--query", type=str, default="SELECT * FROM order_products",
+        help="Query whose rows are exported")
+    parser.add_argument("-o", "--output", type=str, required=True, help="File to write")
+    parser.add_argument("-f", "--format", type=str, choices=["csv", "columns"], default=None,
+        help="csv = comma separated values; columns = compact binary columnar file. \
+            The default follows the file extension (.csv or .qcol)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=50000,
+        help="Rows read and written at a time")
+    args = vars(parser.parse_args())
+    return args
+
+class CsvWriter:
+    """Writes rows to a CSV file with a header row. NULL is written as an empty
+    field and blobs as hex digits."""
+    blobValue = staticmethod(lambda value: bytes(value).hex())
+
+    def __init__(self, file_name, columns):
+        self.file = open(file_name, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def writeChunk(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+class ColumnarWriter:
+    """Writes rows to a file in the columnar format, one chunk at a time."""
+    blobValue = bytes
+
+    def __init__(self, file_name, columns):
+        self.file = open(file_name, "wb")
+        header = json.dumps({"columns": columns}).encode()
+        self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def writeChunk(self, rows):
+        if not rows:
+            return
+        self.file.write(struct.pack("<I", len(rows)))
+        for values in zip(*rows):
+            self.writeColumn(values)
+
+    def writeColumn(self, values):
+        nulls = bytearray((len(values) + 7) // 8)
+        kinds = set(map(type, values))
+        if type(None) in kinds:
+            kinds.discard(type(None))
+            for row, value in enumerate(values):
+                if value is None:
+                    nulls[row >> 3] |= 1 << (row & 7)
+            empty = 0 if kinds <= {int, float} else b"" if kinds <= {bytes} else ""
+            values = [empty if value is None else value for value in values]
+        if not kinds:
+            self.file.write(NULL + nulls)
+            return
+
+        if kinds <= {int}:
+            code = narrowestType(INTEGERS, min(values), max(values))
+            kind, data = code.encode(), array(code, values)
+        elif kinds <= {int, float}:
+            kind, data = REAL, array("d", values)
+        else:
+            kind = BLOB if kinds <= {bytes} else TEXT
+            encoded = values if kind == BLOB else [str(value).encode() for value in values]
+            lengths = list(map(len, encoded))
+            code = narrowestType(LENGTHS, 0, max(lengths))
+            data = array(code, lengths)
+            kind += code.encode()
+            encoded = b"".join(encoded)
+        if sys.byteorder == "big":
+            data.byteswap()
+        self.file.write(kind + nulls + data.tobytes())
+        if kind[:1] in (TEXT, BLOB):
+            self.file.write(encoded)
+
+    def close(self):
+        self.file.close()
+
+WRITERS = {"csv": CsvWriter, "columns": ColumnarWriter}
+
+def narrowestType(codes, low, high):
+    """Return the first array type code in codes whose items hold low to high."""
+    for code in codes:
+        bits = 8 * array(code).itemsize
+        if code.isupper(): # Unsigned
+            if low >= 0 and high < 1 << bits:
+                return code
+        elif -(1 << bits - 1) <= low and high < 1 << bits - 1:
+            return code
+    return codes[-1]
+
+def readColumnar(file_name):
+    """Read a file in the columnar format. Yield the column names, then each chunk
+    as a list of columns, each a list of values with None for NULL."""
+    with open(file_name, "rb") as columns_f:
+        if columns_f.read(len(MAGIC)) != MAGIC:
+            raise RuntimeError("{} is not a columnar export file".format(file_name))
+        header_size, = struct.unpack("<I", columns_f.read(4))
+        columns = json.loads(columns_f.read(header_size))["columns"]
+        yield columns
+        while True:
+            size = columns_f.read(4)
+            if not size:
+                break
+            row_count, = struct.unpack("<I", size)
+            chunk = []
+            for column in columns:
+                kind = columns_f.read(1)
+                length_code = columns_f.read(1).decode() if kind in (TEXT, BLOB) else None
+                nulls = columns_f.read((row_count + 7) // 8)
+                if kind == NULL:
+                    values = [None] * row_count
+                elif length_code is not None:
+                    lengths = readArray(columns_f, length_code, row_count)
+                    data = columns_f.read(sum(lengths))
+                    values, start = [], 0
+                    for length in lengths:
+                        value = data[start:start + length]
+                        values.append(value if kind == BLOB else value.decode())
+                        start += length
+                else:
+                    values = readArray(columns_f, kind.decode(), row_count)
+                for row in range(row_count):
+                    if nulls[row >> 3] & (1 << (row & 7)):
+                        values[row] = None
+                chunk.append(values)
+            yield chunk
+
+def readExportRows(query, row_count, blobValue):
+    """Read up to row_count rows from query, as lists of values with None for NULL
+    and blobs converted by blobValue. QSqlQuery.value() returns NULL as an empty
+    string, so isNull() is only asked about the rows that have one."""
+    columns = range(query.record().count())
+    value = query.value
+    rows = []
+    while len(rows) < row_count and query.next():
+        row = list(map(value, columns))
+        if "" in row or QByteArray in set(map(type, row)):
+            for i in columns:
+                if type(row[i]) is QByteArray:
+                    row[i] = blobValue(row[i])
+                elif row[i] == "" and query.isNull(i):
+                    row[i] = None
+        rows.append(row)
+    return rows
+
+def readArray(columns_f, code, count):
+    values = array(code)
+    values.frombytes(columns_f.read(count * values.itemsize))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+def exportQuery(database, statement, file_name, file_format="csv", chunk_size=50000,
+        progress=None, is_cancelled=lambda: False):
+    """Run statement and write its rows to file_name, chunk_size rows at a time, so
+    only one chunk is ever held in memory. progress(rows, bytes) is called after each
+    chunk. Return the number of rows, or None if is_cancelled() turned True, in which
+    case the partial file is removed. Raise RuntimeError if the query fails."""
+    query = QSqlQuery(database)
+    query.setForwardOnly(True) # Rows that were read are not kept by the query
+    if not query.exec_(statement):
+        raise RuntimeError(query.lastError().text())
+    writer = WRITERS[file_format](file_name, columnNames(query))
+    row_count = 0
+    try:
+        while not is_cancelled():
+            rows = readExportRows(query, chunk_size, writer.blobValue)
+            writer.writeChunk(rows)
+            row_count += len(rows)
+            if progress is not None:
+                progress(row_count, writer.file.tell())
+            if len(rows) < chunk_size:
+                break
+    finally:
+        query.finish()
+        writer.close()
+    if is_cancelled():
+        os.remove(file_name)
+        return None
+    return row_count
+
+def exportFormat(file_name):
+    """Return the export format that the extension of file_name stands for."""
+    return "csv" if file_name.lower().endswith(".csv") else "columns"
+
+class ExportWorkerThread(QThread):
+    """Worker thread that exports the rows of a query to a file on its own connection
+    from a ConnectionManager, so a large export never blocks the GUI. Progress is sent after each
+    chunk with the rows and bytes written and the seconds since the start."""
+    export_progress = pyqtSignal(int, int, float)
+    export_finished = pyqtSignal(int, int, float)
+    export_failed = pyqtSignal(str)
+
+    def __init__(self, connections, statement, file_name, file_format="csv", chunk_size=50000):
+        super().__init__()
+        self.connections = connections
+        self.statement = statement
+        self.file_name = file_name
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.is_cancelled = False
+
+    def cancel(self):
+        self.is_cancelled = True
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            row_count = exportQuery(self.connections.connection(), self.statement, self.file_name,
+                self.file_format, self.chunk_size, lambda rows, size: self.export_progress.emit(
+                    rows, size, time.perf_counter() - start), lambda: self.is_cancelled)
+            if row_count is not None:
+                self.export_finished.emit(row_count, os.path.getsize(self.file_name),
+                    time.perf_counter() - start)
+        except (RuntimeError, OSError) as error:
+            self.export_failed.emit(str(error))
+        self.connections.releaseConnection()
+
+if __name__ == "__main__":
+    args = parseCommandLine()
+    app = QCoreApplication(sys.argv)
+    file_format = args["format"] or exportFormat(args["output"])
+
+    connections = ConnectionManager(args["database"])
+    thread = ExportWorkerThread(connections, args["query"], args["output"],
+        file_format, args["chunk_size"])
+    thread.export_progress.connect(lambda rows, size, elapsed: print(
+        "[INFO] {:12,} rows {:10.1f} MB {:8.1f} MB/s".format(rows, size / 1e6, size / 1e6 / elapsed),
+        end="\r", flush=True))
+    thread.export_finished.connect(lambda rows, size, elapsed: print(
+        "\n[INFO] Exported {:,} rows ({:.1f} MB) to {} in {:.2f} s: {:.1f} MB/s, {:,.0f} rows/s".format(
+            rows, size / 1e6, args["output"], elapsed, size / 1e6 / elapsed, rows / elapsed)))
+    thread.export_failed.connect(lambda error: print("\n[INFO] Export failed: {}".format(error)))
+    thread.finished.connect(app.quit)
+    thread.start()
+    exit_code = app.exec_()
+    connections.closeAll()
+    sys.exit(exit_code)
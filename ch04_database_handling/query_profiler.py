@@ -0,0 +1,268 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import os, re, csv, hashlib, datetime
+from PyQt5.QtWidgets import (QWidget, QLabel, QTreeWidget, QTreeWidgetItem, QTextEdit,
+    QTableWidget, QTableWidgetItem, QSplitter, QVBoxLayout)
+from PyQt5.QtSql import QSqlQuery
+from PyQt5.QtGui import QColor, QFont
+from PyQt5.QtCore import Qt
+from sql_script import LITERALS, stripComments
+
+# Queries that take at least this many seconds are written to the slow query log
+SLOW_QUERY_SECONDS = 0.1
+
+# Plan steps that make a query slow on large tables: issue name: (pattern, advice)
+PLAN_ISSUES = {
+    "full table scan": (re.compile(r"^SCAN (?!CONSTANT ROW)(\w+)(?: AS \w+)?$"),
+        "Reads every row of the table"),
+    "automatic index": (re.compile(r"USING AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX"),
+        "SQLite builds a temporary index on every run; the table needs a permanent one"),
+    "full index scan": (re.compile(r"^SCAN \w+(?: AS \w+)? USING (?:COVERING )?INDEX"),
+        "Reads every entry of the index"),
+    "temporary b-tree": (re.compile(r"^USE TEMP B-TREE"),
+        "Sorts or groups the rows in a temporary table")}
+ISSUE_COLORS = {"full table scan": QColor("#f8c9c4"), "automatic index": QColor("#f8c9c4"),
+    "full index scan": QColor("#fbe7b5"), "temporary b-tree": QColor("#fbe7b5")}
+
+# Plan steps that read a table: SCAN or SEARCH, the table or alias, the index used
+# and the constraints (e.g. "customer_id=?") in parentheses
+PLAN_STEP = re.compile(r"^(SCAN|SEARCH) (\w+)(?: AS \w+)?(?: USING (.*?))?(?: \((.*)\))?$")
+# Tables in FROM, JOIN and UPDATE clauses, with their aliases
+TABLE_REFERENCE = re.compile(r"""\b(?:FROM|JOIN|UPDATE(?:\s+OR\s+\w+)?|INTO)\s+(\w+)
+    (?:\s+(?:AS\s+)?(?!(?:WHERE|JOIN|ON|USING|LEFT|RIGHT|FULL|INNER|OUTER|CROSS|NATURAL|GROUP|ORDER
+        |LIMIT|HAVING|WINDOW|UNION|EXCEPT|INTERSECT|SET|VALUES|SELECT|DEFAULT|RETURNING)\b)(\w+))?""",
+    re.IGNORECASE | re.VERBOSE)
+# Comparisons of a column with a value (constant) or with another column (join)
+PREDICATE = re.compile(r"""(?:\b(\w+)\.)?\b(\w+)\s*
+    (=|==|<=|>=|<|>|\bIN\b|\bBETWEEN\b|\bLIKE\b|\bIS\b)\s*
+    (?:(\w+)\.(\w+)\b)?""", re.IGNORECASE | re.VERBOSE)
+# The SET clause of an UPDATE, up to its WHERE
+ASSIGNMENTS = re.compile(r"\bSET\b.*?(?=\bWHERE\b|$)", re.IGNORECASE | re.DOTALL)
+RANGE_OPERATORS = {"<", "<=", ">", ">=", "BETWEEN", "LIKE"}
+
+def explainQueryPlan(database, statement):
+    """Return the plan of statement as a list of (id, parent id, detail), or raise
+    RuntimeError. Parameters are bound to NULL, which doesn't change the plan."""
+    query = QSqlQuery(database)
+    if not query.prepare("EXPLAIN QUERY PLAN " + statement):
+        raise RuntimeError(query.lastError().text())
+    for match in LITERALS.finditer(stripComments(statement)):
+        if match.lastgroup == "parameter":
+            query.addBindValue(None)
+    if not query.exec_():
+        raise RuntimeError(query.lastError().text())
+    plan = []
+    while query.next():
+        plan.append((query.value(0), query.value(1), query.value(3)))
+    return plan
+
+def planIssue(detail):
+    """Return the name of the issue that a plan step shows, or an empty string."""
+    for name, (pattern, advice) in PLAN_ISSUES.items():
+        if pattern.search(detail):
+            return name
+    return ""
+
+def planHash(plan):
+    """Return a short hash of the steps of plan, which changes when the plan does
+    (e.g. after an index was added) but not with the values in the statement."""
+    return hashlib.sha1("\n".join(detail for _, _, detail in plan).encode()).hexdigest()[:12]
+
+def tableAliases(statement):
+    """Return a dict of alias (or table name): table name for the tables the statement uses."""
+    aliases = {}
+    for table, alias in TABLE_REFERENCE.findall(stripComments(statement)):
+        aliases[alias or table] = table
+        aliases.setdefault(table, table)
+    return aliases
+
+def tableColumns(database, table):
+    """Return the columns of table and the name of its INTEGER PRIMARY KEY column, if any."""
+    query = QSqlQuery(database)
+    query.exec_("PRAGMA table_info({})".format(table))
+    columns, rowid_column = [], None
+    while query.next():
+        columns.append(query.value(1))
+        if query.value(5) == 1 and query.value(2).upper() == "INTEGER":
+            rowid_column = query.value(1)
+    return columns, rowid_column
+
+def indexedColumns(database, table):
+    """Return a list of the column lists of the indexes of table."""
+    index_list = QSqlQuery(database)
+    index_list.exec_("PRAGMA index_list({})".format(table))
+    indexes = []
+    while index_list.next():
+        index_info = QSqlQuery(database)
+        index_info.exec_("PRAGMA index_info({})".format(index_list.value(1)))
+        columns = []
+        while index_info.next():
+            columns.append(index_info.value(2))
+        indexes.append(columns)
+    return indexes
+
+def suggestIndexes(database, statement, plan):
+    """Suggest indexes for the tables that the plan scans, or searches without using
+    the columns that the statement compares with values. The columns of an index are
+    the ones compared for equality with a value, then the ones joined to other
+    tables, then one compared with a range. Return a list of (table, columns,
+    CREATE INDEX statement), leaving out indexes that already exist."""
+    aliases = tableAliases(statement)
+    text = stripComments(statement)
+    # Replace strings, so that words in them aren't taken for columns
+    text = LITERALS.sub(lambda match: "?" if match.lastgroup == "string" else match.group(), text)
+    text = ASSIGNMENTS.sub(" ", text) # SET a = 1 is not a predicate
+    comparisons = []
+    for qualifier, column, operator, other_alias, other_column in PREDICATE.findall(text):
+        comparisons.append((qualifier, column, operator, other_alias, other_column))
+        if other_column: # A join compares the columns of both sides
+            comparisons.append((other_alias, other_column, operator, qualifier, column))
+    suggestions = []
+    for _, _, detail in plan:
+        step = PLAN_STEP.match(detail)
+        if not step or step.group(2) not in aliases:
+            continue
+        operation, alias, using, constraints = step.groups()
+        table = aliases[alias]
+        columns, rowid_column = tableColumns(database, table)
+        used = set(re.findall(r"(\w+)(?:=|>|<|\bIN\b)", constraints or ""))
+        automatic = using is not None and "AUTOMATIC" in using
+        if operation == "SEARCH" and not automatic and "rowid" not in used and not (
+                rowid_column and rowid_column in used):
+            continue # Already uses an index for this table
+
+        equal, joined, ranged = [], [], []
+        for qualifier, column, operator, other_alias, other_column in comparisons:
+            if column not in columns or column == rowid_column:
+                continue
+            if qualifier and qualifier != alias and not (qualifier == table and alias == table):
+                continue
+            if not qualifier and sum(column in tableColumns(database, other)[0]
+                    for other in set(aliases.values())) > 1:
+                continue # Ambiguous without a qualifier
+            if other_column and other_alias != alias:
+                target = joined
+            elif operator.upper() in RANGE_OPERATORS:
+                target = ranged
+            else:
+                target = equal
+            if column not in equal + joined + ranged:
+                target.append(column)
+
+        if operation == "SEARCH" and not automatic and not (set(equal) - used):
+            continue # The search already uses everything the statement filters on
+        index_columns = equal + joined + ranged[:1]
+        if not index_columns:
+            continue
+        if any(index[:len(index_columns)] == index_columns for index in indexedColumns(database, table)):
+            continue
+        name = "{}_{}".format(table, "_".join(index_columns))
+        suggestions.append((table, index_columns, "CREATE INDEX IF NOT EXISTS {} ON {} ({})".format(
+            name, table, ", ".join(index_columns))))
+    return suggestions
+
+class SlowQueryLog:
+    """Slow queries, kept in a CSV file so that the log lasts across sessions. Each
+    entry has the time, the database, the seconds and rows of the run, the plan hash
+    and the statement, so runs of the same query before and after a change of plan
+    can be told apart."""
+    COLUMNS = ["time", "database", "seconds", "rows", "plan_hash", "statement"]
+
+    def __init__(self, file_name="files/slow_queries.csv", threshold=SLOW_QUERY_SECONDS):
+        self.file_name = file_name
+        self.threshold = threshold
+
+    def record(self, database_name, statement, seconds, row_count, plan_hash):
+        """Append a run to the log if it took at least threshold seconds. Return True if it did."""
+        if seconds < self.threshold:
+            return False
+        new_file = not os.path.exists(self.file_name)
+        with open(self.file_name, "a", newline="") as log_f:
+            writer = csv.writer(log_f)
+            if new_file:
+                writer.writerow(self.COLUMNS)
+            writer.writerow([datetime.datetime.now().isoformat(timespec="seconds"), database_name,
+                round(seconds, 4), row_count, plan_hash, " ".join(statement.split())])
+        return True
+
+    def entries(self, limit=200):
+        """Return the last limit entries as dicts, the most recent first."""
+        if not os.path.exists(self.file_name):
+            return []
+        with open(self.file_name, newline="") as log_f:
+            return list(csv.DictReader(log_f))[-limit:][::-1]
+
+class ProfilerPanel(QWidget):
+    """Panel with the query plan of a statement, where steps that make it slow are
+    highlighted, the suggested indexes and the slow query log."""
+
+    def __init__(self, slow_query_log):
+        super().__init__()
+        self.slow_query_log = slow_query_log
+
+        self.statement_label = QLabel("Place the cursor in a statement and choose Explain Query.")
+        self.statement_label.setWordWrap(True)
+
+        self.plan_tree = QTreeWidget()
+        self.plan_tree.setHeaderLabels(["Plan step", "Issue"])
+        self.plan_tree.setColumnWidth(0, 450)
+
+        self.suggestions_edit = QTextEdit()
+        self.suggestions_edit.setReadOnly(True)
+        self.suggestions_edit.setFont(QFont("Courier", 12))
+        self.suggestions_edit.setPlaceholderText("Suggested indexes")
+
+        self.log_table = QTableWidget(0, len(SlowQueryLog.COLUMNS))
+        self.log_table.setHorizontalHeaderLabels(SlowQueryLog.COLUMNS)
+        self.log_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.log_table.horizontalHeader().setStretchLastSection(True)
+
+        splitter = QSplitter(Qt.Vertical)
+        splitter.addWidget(self.plan_tree)
+        splitter.addWidget(self.suggestions_edit)
+        splitter.addWidget(self.log_table)
+
+        v_box = QVBoxLayout()
+        v_box.addWidget(self.statement_label)
+        v_box.addWidget(splitter)
+        self.setLayout(v_box)
+        self.refreshLog()
+
+    def showPlan(self, database, statement):
+        """Show the plan of statement and the indexes suggested for it."""
+        self.statement_label.setText(" ".join(statement.split()))
+        self.plan_tree.clear()
+        self.suggestions_edit.clear()
+        try:
+            plan = explainQueryPlan(database, statement)
+        except RuntimeError as error:
+            self.suggestions_edit.setPlainText("Could not explain the statement: {}".format(error))
+            return
+
+        items = {0: self.plan_tree.invisibleRootItem()}
+        for step_id, parent_id, detail in plan:
+            issue = planIssue(detail)
+            item = QTreeWidgetItem(items.get(parent_id, items[0]), [detail, issue])
+            if issue:
+                item.setToolTip(1, PLAN_ISSUES[issue][1])
+                for column in range(2):
+                    item.setBackground(column, ISSUE_COLORS[issue])
+            items[step_id] = item
+        self.plan_tree.expandAll()
+
+        suggestions = suggestIndexes(database, statement, plan)
+        lines = ["-- Plan hash {}".format(planHash(plan))]
+        lines += ["{};".format(create_index) for _, _, create_index in suggestions]
+        if not suggestions:
+            lines.append("-- No index to suggest")
+        self.suggestions_edit.setPlainText("\n".join(lines))
+
+    def refreshLog(self):
+        entries = self.slow_query_log.entries()
+        self.log_table.setRowCount(len(entries))
+        for row, entry in enumerate(entries):
+            for column, name in enumerate(SlowQueryLog.COLUMNS):
+                self.log_table.setItem(row, column, QTableWidgetItem(entry.get(name, "")))
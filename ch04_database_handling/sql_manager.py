@@ -3,14 +3,23 @@ Written by Joshua Willman
 Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
 """
 # Import necessary modules
-import sys
+import sys, time
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QTextEdit, QTableView, 
-    QTreeView, QHeaderView, QSplitter, QToolBar, QAction, QFileSystemModel, QMessageBox, 
-    QHBoxLayout, QSplashScreen)
-from PyQt5.QtSql import QSqlDatabase, QSqlQuery, QSqlQueryModel
+    QTreeView, QSplitter, QToolBar, QAction, QFileSystemModel, QMessageBox, 
+    QHBoxLayout, QSplashScreen, QStyle, QTabWidget, QTableWidget, QTableWidgetItem, QFileDialog)
 from PyQt5.QtGui import QFont, QIcon, QPixmap
-from PyQt5.QtCore import Qt, QSize, QDir
+from PyQt5.QtCore import Qt, QSize, QDir, QTimer
 from Login import LoginGUI # Import the login script
+from connection_manager import ConnectionManager
+from credential_store import CredentialStore
+from query_executor import QueryWorkerThread
+from paged_model import PagedResultModel, setupHeaders
+from sql_script import splitStatements
+from query_profiler import ProfilerPanel, SlowQueryLog, explainQueryPlan, planHash
+from query_export import ExportWorkerThread, exportFormat
+
+def rowsPerSecond(row_count, elapsed):
+    return row_count / elapsed if elapsed > 0 else 0.0
 
 class SQLManager(QMainWindow):
 
@@ -24,21 +33,30 @@ class SQLManager(QMainWindow):
         self.move(QApplication.desktop().screen().rect().center() - self.rect().center())
         self.setWindowTitle("4.1 - SQL Management GUI")
 
-        self.login = LoginGUI(self)
-        self.login.show()
+        self.query_thread = None
+        self.finishing_threads = set() # Cancelled threads that are still running
+        self.results = [] # (model, view) for each SELECT of the last script
+        self.slow_query_log = SlowQueryLog()
+        self.export_thread = None
 
         self.createConnection()
+        self.login = LoginGUI(self, CredentialStore(self.database))
+        self.login.show()
+
         self.setupWindow()
         self.setupToolbar()
+        self.setupStatusBar()
 
     def createConnection(self):
-        """Set up connection to the database. Check if the tables needed exist."""
-        self.database = QSqlDatabase.addDatabase("QSQLITE")
-        self.database.setDatabaseName("databases/FishingStores.sql")
-
-        if not self.database.open():
+        """Set up connection to the database. Check if the tables needed exist. The
+        GUI thread's connection is kept for the window's lifetime, and the query and
+        export threads get their own connections from the same manager."""
+        self.connections = ConnectionManager("databases/FishingStores.sql")
+        try:
+            self.database = self.connections.connection()
+        except RuntimeError as error:
             print("Unable to open data source file.")
-            print("Connection failed: ", self.database.lastError().text())
+            print("Connection failed: ", error)
             sys.exit(1) # Error code 1 - signifies error in opening file
     
         # Check if the tables we want to use exist in the database
@@ -69,21 +87,26 @@ class SQLManager(QMainWindow):
         self.query_entry_field.setFont(QFont("Courier", 14))
         self.query_entry_field.setPlaceholderText("Enter your queries here...")
 
-        # Create the model/view instances 
-        self.sql_model = QSqlQueryModel()
+        # Each statement's timing is listed in the Statements tab, the Profiler tab
+        # shows query plans and the slow query log, and the results of each SELECT
+        # get a tab of their own (see addResultTab())
+        self.statements_table = QTableWidget(0, 5)
+        self.statements_table.setHorizontalHeaderLabels(["Line", "Statement", "Rows", "Time (ms)", "Rows/s"])
+        self.statements_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        setupHeaders(self.statements_table)
+
+        self.profiler_panel = ProfilerPanel(self.slow_query_log)
 
-        # Create the table view instance and set its parameters and its delegate
-        table_view = QTableView()
-        table_view.setAlternatingRowColors(True)
-        table_view.setModel(self.sql_model)
-        table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table_view.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.result_tabs = QTabWidget()
+        self.result_tabs.addTab(self.statements_table, "Statements")
+        self.result_tabs.addTab(self.profiler_panel, "Profiler")
+        self.fixed_tab_count = self.result_tabs.count()
 
-        # Create splitter that contains the text edit and table view objects
+        # Create splitter that contains the text edit and the result tabs
         splitter = QSplitter()
         splitter.setOrientation(Qt.Vertical)
         splitter.addWidget(self.query_entry_field)
-        splitter.addWidget(table_view)
+        splitter.addWidget(self.result_tabs)
 
         main_h_box = QHBoxLayout()
         main_h_box.addWidget(tree_view)
@@ -104,28 +127,236 @@ class SQLManager(QMainWindow):
         clear_text_act.setToolTip("Clear the queries in the text field.")
         clear_text_act.triggered.connect(self.clearText)
 
-        run_query_act = QAction(QIcon("icons/run.png"), "Run Query", toolbar)
-        run_query_act.setToolTip("Run the queries in the text field.")
-        run_query_act.triggered.connect(self.runQuery)
+        self.run_query_act = QAction(QIcon("icons/run.png"), "Run Query", toolbar)
+        self.run_query_act.setToolTip("Run the queries in the text field.")
+        self.run_query_act.triggered.connect(self.runQuery)
+
+        self.cancel_query_act = QAction(self.style().standardIcon(QStyle.SP_BrowserStop),
+            "Cancel Query", toolbar)
+        self.cancel_query_act.setToolTip("Stop the running queries.")
+        self.cancel_query_act.setEnabled(False)
+        self.cancel_query_act.triggered.connect(self.cancelQuery)
+
+        explain_query_act = QAction(self.style().standardIcon(QStyle.SP_FileDialogContentsView),
+            "Explain Query", toolbar)
+        explain_query_act.setToolTip("Show the query plan of the statement at the cursor.")
+        explain_query_act.triggered.connect(self.explainQuery)
+
+        self.export_query_act = QAction(self.style().standardIcon(QStyle.SP_DialogSaveButton),
+            "Export Results", toolbar)
+        self.export_query_act.setToolTip("Export the rows of the statement at the cursor to a file.")
+        self.export_query_act.triggered.connect(self.exportQuery)
 
         # Add actions to the toolbar 
         toolbar.addAction(clear_text_act)
-        toolbar.addAction(run_query_act)
+        toolbar.addAction(self.run_query_act)
+        toolbar.addAction(self.cancel_query_act)
+        toolbar.addAction(explain_query_act)
+        toolbar.addAction(self.export_query_act)
+
+    def setupStatusBar(self):
+        """Show the progress of the running queries in the status bar, refreshed by a timer."""
+        self.status_timer = QTimer(self)
+        self.status_timer.setInterval(100)
+        self.status_timer.timeout.connect(self.updateStatus)
+        self.statusBar().showMessage("Ready")
 
     def runQuery(self):
-        """Run the query/queries entered in the QTextEdit widget."""
-        query_text = self.query_entry_field.toPlainText()
-        queries = query_text.split('\n')
-
-        if query_text != "":
-            for qry in queries:
-                if qry == "":
-                    # Pass over empty lines
-                    pass
-                else:
-                    query = QSqlQuery(qry)
-                    self.sql_model.setQuery(query)
-        
+        """Run the SQL script entered in the QTextEdit widget on a worker thread. The
+        statements run in one transaction, and the thread reads the rows of each
+        SELECT as its tab is scrolled."""
+        statements = splitStatements(self.query_entry_field.toPlainText())
+        if not statements:
+            return
+        self.stopQueryThread() # Stop serving the pages of the previous results
+        self.clearResults()
+
+        thread = QueryWorkerThread(self.connections, statements)
+        thread.columns_ready.connect(self.addResultTab)
+        thread.page_ready.connect(self.pageReady)
+        thread.numbered_page_ready.connect(lambda result, number, rows:
+            self.results[result][0].setPage(number, rows))
+        thread.statement_finished.connect(self.statementFinished)
+        thread.query_failed.connect(self.queryFailed)
+        thread.script_finished.connect(self.scriptFinished)
+        thread.finished.connect(lambda: self.queryThreadFinished(thread))
+        self.query_thread = thread
+        self.statement_count = len(statements)
+        self.row_total = 0 # Rows read or changed by the statements that have finished
+
+        self.run_query_act.setEnabled(False)
+        self.cancel_query_act.setEnabled(True)
+        self.query_start = time.perf_counter()
+        self.status_timer.start()
+        thread.start()
+
+    def clearResults(self):
+        """Remove the timings and the result tabs of the last script."""
+        self.statements_table.setRowCount(0)
+        while self.result_tabs.count() > self.fixed_tab_count:
+            widget = self.result_tabs.widget(self.fixed_tab_count)
+            self.result_tabs.removeTab(self.fixed_tab_count)
+            widget.deleteLater()
+        self.results = []
+
+    def addResultTab(self, result, column_names):
+        """Add a tab for the rows of a SELECT, which the query thread reads page by page."""
+        model = PagedResultModel()
+        model.setColumns(column_names)
+        model.more_requested.connect(lambda: self.query_thread and self.query_thread.requestNextPage(result))
+        model.page_requested.connect(lambda number: self.query_thread and
+            self.query_thread.requestPage(result, number))
+
+        view = QTableView()
+        view.setAlternatingRowColors(True)
+        view.setModel(model)
+        setupHeaders(view, model.page_size)
+        self.results.append((model, view))
+        self.result_tabs.addTab(view, "Result {}".format(result + 1))
+
+    def pageReady(self, result, rows, at_end):
+        model, view = self.results[result]
+        first_page = model.rowCount() == 0
+        model.appendPage(rows, at_end)
+        if first_page:
+            view.resizeColumnsToContents() # Measures the rows of the first page only
+
+    def stopQueryThread(self):
+        """Stop listening to the query thread and ask it to stop. If it is in the
+        middle of a long step, it is kept until it finishes so it isn't deleted while running."""
+        if self.query_thread is None:
+            return
+        thread, self.query_thread = self.query_thread, None
+        thread.cancel()
+        for signal in [thread.columns_ready, thread.page_ready, thread.numbered_page_ready,
+                thread.statement_finished, thread.query_failed, thread.script_finished,
+                thread.finished]:
+            signal.disconnect()
+        for model, view in self.results:
+            model.at_end = True # The rows that weren't read can't be fetched any more
+        if thread.isRunning():
+            self.finishing_threads.add(thread)
+            thread.finished.connect(lambda: self.finishing_threads.discard(thread))
+
+    def cancelQuery(self):
+        """Stop the running script; its changes are rolled back."""
+        self.stopQueryThread()
+        self.showFinished("Cancelled after {:.2f} s; changes rolled back".format(
+            time.perf_counter() - self.query_start))
+
+    def statementFinished(self, line, statement, count, row_count, more, elapsed):
+        """List the timing of a statement, or of a group of statements that ran as one batch."""
+        text = " ".join(statement.split())
+        if count > 1:
+            text = "{} (and {:,} more like it)".format(text, count - 1)
+        row = self.statements_table.rowCount()
+        self.statements_table.insertRow(row)
+        for column, value in enumerate([str(line), text,
+                "{:,}{}".format(row_count, "+" if more else ""), "{:.3f}".format(1000 * elapsed),
+                "{:,.0f}".format(rowsPerSecond(row_count, elapsed))]):
+            self.statements_table.setItem(row, column, QTableWidgetItem(value))
+        self.row_total += row_count
+        if count == 1 and elapsed >= self.slow_query_log.threshold:
+            self.logSlowQuery(statement, elapsed, row_count)
+
+    def logSlowQuery(self, statement, elapsed, row_count):
+        """Add a slow statement to the slow query log with the hash of its plan, so
+        that the runs before and after a change of plan can be compared."""
+        try:
+            plan_hash = planHash(explainQueryPlan(self.database, statement))
+        except RuntimeError:
+            plan_hash = "" # E.g. the statement dropped a table that it used
+        self.slow_query_log.record(self.database.databaseName(), statement, elapsed,
+            row_count, plan_hash)
+        self.profiler_panel.refreshLog()
+
+    def explainQuery(self):
+        """Show the query plan of the statement that the cursor is in, with the steps
+        that scan whole tables highlighted and the indexes that could avoid them."""
+        statement = self.statementAtCursor()
+        if statement is not None:
+            self.profiler_panel.showPlan(self.database, statement)
+            self.result_tabs.setCurrentWidget(self.profiler_panel)
+
+    def statementAtCursor(self):
+        """Return the statement that the cursor of the text edit is in, or None if there is none."""
+        statements = splitStatements(self.query_entry_field.toPlainText())
+        if not statements:
+            return None
+        cursor_line = self.query_entry_field.textCursor().blockNumber() + 1
+        # The last statement that starts on or before the cursor's line
+        statement = statements[0][1]
+        for line, text in statements:
+            if line > cursor_line:
+                break
+            statement = text
+        return statement
+
+    def exportQuery(self):
+        """Export the rows of the statement at the cursor to a CSV or columnar file on
+        a worker thread, which reads and writes them in chunks."""
+        statement = self.statementAtCursor()
+        if statement is None:
+            return
+        file_name, _ = QFileDialog.getSaveFileName(self, "Export Results", "",
+            "CSV Files (*.csv);;Columnar Files (*.qcol)")
+        if not file_name:
+            return
+        thread = ExportWorkerThread(self.connections, statement, file_name,
+            exportFormat(file_name))
+        thread.export_progress.connect(lambda rows, size, elapsed: self.statusBar().showMessage(
+            "Exporting: {:,} rows, {:.1f} MB, {:.1f} MB/s".format(rows, size / 1e6, size / 1e6 / elapsed)))
+        thread.export_finished.connect(lambda rows, size, elapsed: self.statusBar().showMessage(
+            "Exported {:,} rows ({:.1f} MB) in {:.2f} s, {:.1f} MB/s".format(
+                rows, size / 1e6, elapsed, size / 1e6 / elapsed)))
+        thread.export_failed.connect(lambda error: QMessageBox.warning(self, "Export Failed", error))
+        thread.finished.connect(lambda: self.export_query_act.setEnabled(True))
+        self.export_thread = thread
+        self.export_query_act.setEnabled(False) # One export at a time
+        thread.start()
+
+    def queryFailed(self, line, statement, error):
+        QMessageBox.warning(self, "Query Failed", "Line {}: {}\n\n{}".format(line, statement, error))
+
+    def scriptFinished(self, kept, elapsed):
+        """Show the total time of the script, and the last result if there is one."""
+        self.showFinished("{:,} statements, {:,} rows in {:.3f} s ({:,.0f} rows/s); {}".format(
+            self.statement_count, self.row_total, elapsed, rowsPerSecond(self.row_total, elapsed),
+            "committed" if kept else "rolled back"))
+        self.result_tabs.setCurrentIndex(self.result_tabs.count() - 1 if kept and self.results else 0)
+
+    def showFinished(self, status):
+        self.status_timer.stop()
+        self.run_query_act.setEnabled(True)
+        self.cancel_query_act.setEnabled(False)
+        self.statusBar().showMessage(status)
+
+    def queryThreadFinished(self, thread):
+        if self.query_thread is thread:
+            self.query_thread = None
+
+    def updateStatus(self):
+        """Show the elapsed time, and the rows read or changed so far with their rate,
+        while the script runs; each statement's timing is listed when it finishes."""
+        elapsed = time.perf_counter() - self.query_start
+        self.statusBar().showMessage("Running: {:.1f} s, {:,} rows ({:,.0f} rows/s)".format(
+            elapsed, self.row_total, rowsPerSecond(self.row_total, elapsed)))
+
+    def closeEvent(self, event):
+        """Stop any running query or export thread and close the connections before
+        the window closes."""
+        self.stopQueryThread()
+        if self.export_thread is not None:
+            self.export_thread.cancel() # The partial file is removed
+            self.finishing_threads.add(self.export_thread)
+        for thread in list(self.finishing_threads):
+            thread.wait()
+        # The connection can only be removed once no instance refers to it
+        self.login.credentials = None
+        del self.database
+        self.connections.closeAll()
+        event.accept()
+
     def clearText(self):
         """Clear the QTextEdit widget's text."""
         self.query_entry_field.clear()
@@ -0,0 +1,199 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import re, sqlite3
+from PyQt5.QtSql import QSqlQuery
+
+# Parts of SQLite's SQL that a semicolon can hide in: strings, quoted names and
+# comments. Text between them is skipped over
+QUOTED = r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]"""
+COMMENT = r"--[^\n]*|/\*.*?(?:\*/|$)"
+SEMICOLONS = re.compile("{}|{}|;".format(QUOTED, COMMENT), re.DOTALL)
+COMMENTS = re.compile("(?P<quoted>{})|{}".format(QUOTED, COMMENT), re.DOTALL)
+LEADING_COMMENTS = re.compile(r"(?:\s+|{})*".format(COMMENT), re.DOTALL)
+FIRST_WORD = re.compile(r"[A-Za-z]+")
+# Whitespace, and whitespace around punctuation, that doesn't change a template
+LAYOUT = re.compile(r"\s*([(),=<>+*/%|-])\s*|\s+")
+
+# Literals of a statement, and what must be kept as written: quoted names, blobs,
+# hex numbers and digits that are part of a name
+LITERALS = re.compile(r"""
+      (?P<kept>"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]|(?<![\w$])[xX]'[0-9a-fA-F]*'
+        |(?<![\w$.])0[xX][0-9a-fA-F]+)
+    | (?P<string>'(?:[^']|'')*')
+    | (?P<number>(?<![\w$.])(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<parameter>(?<![\w$])[?:@$][A-Za-z0-9_]*)""", re.VERBOSE | re.DOTALL)
+
+# Statements whose literals are bound as parameters, so that statements that only
+# differ in their values share one prepared query
+PARAMETERIZED = {"INSERT", "REPLACE", "UPDATE", "DELETE"}
+# Clauses in which a number can be a column ordinal (GROUP BY 1 groups by the first
+# column, GROUP BY ? by a constant), so statements with them run as written
+ORDINAL_CLAUSES = re.compile(r"\b(?:SELECT|GROUP\s+BY|ORDER\s+BY)\b", re.IGNORECASE)
+# Statements that control transactions themselves or can't run inside one
+TRANSACTION_CONTROL = {"BEGIN", "COMMIT", "END", "ROLLBACK", "VACUUM", "ATTACH", "DETACH"}
+
+def splitStatements(text):
+    """Split a script into its statements. Return a list of (line number, statement)
+    pairs, without the closing semicolons. Semicolons in strings, quoted names and
+    comments don't end a statement, and neither do the ones inside the body of a
+    CREATE TRIGGER; sqlite3.complete_statement() decides that the way SQLite does.
+    Statements that only hold comments are left out."""
+    spans, start = [], 0
+    for match in SEMICOLONS.finditer(text):
+        if match.group() == ";" and sqlite3.complete_statement(text[start:match.end()]):
+            spans.append((start, match.start()))
+            start = match.end()
+    spans.append((start, len(text)))
+
+    statements, line, counted = [], 1, 0
+    for start, end in spans:
+        start = LEADING_COMMENTS.match(text, start, end).end()
+        statement = text[start:end].strip()
+        if stripComments(statement).strip(" \t\r\n;"):
+            line += text.count("\n", counted, start) # Count from the last statement only
+            counted = start
+            statements.append((line, statement))
+    return statements
+
+def stripComments(statement):
+    if "--" not in statement and "/*" not in statement:
+        return statement
+    return COMMENTS.sub(lambda match: match.group("quoted") or " ", statement)
+
+def firstWord(statement):
+    match = FIRST_WORD.match(statement, LEADING_COMMENTS.match(statement).end())
+    return match.group().upper() if match else ""
+
+def parameterize(statement):
+    """Replace the string and number literals of an INSERT, REPLACE, UPDATE or DELETE
+    statement with ? placeholders. Return the template and the list of values, or
+    (None, None) for other statements, for ones that already have parameters and for
+    ones with a SELECT, GROUP BY or ORDER BY, where a number may be a column ordinal."""
+    if firstWord(statement) not in PARAMETERIZED:
+        return None, None
+    statement = stripComments(statement)
+    if ORDINAL_CLAUSES.search(LITERALS.sub(" ", statement)):
+        return None, None
+    values = []
+
+    def replaceLiteral(match):
+        kind, token = match.lastgroup, match.group()
+        if kind in ("string", "number"):
+            value = literalValue(token)
+            if value is not None:
+                values.append(value)
+                return "?"
+        elif kind == "parameter":
+            raise ValueError(token)
+        return token
+
+    try:
+        template = LITERALS.sub(replaceLiteral, statement)
+    except ValueError:
+        return None, None
+    return template, values
+
+def literalValue(token):
+    """Return the value of a string or number literal, or None for an integer too
+    large to bind."""
+    if token.startswith("'"):
+        return token[1:-1].replace("''", "'")
+    if "." in token or "e" in token or "E" in token:
+        return float(token)
+    value = int(token)
+    return value if value < 2 ** 63 else None
+
+def templatePattern(template):
+    """Return a regex that matches the statements written exactly like template apart
+    from the literals in its placeholders, capturing the literals. Matching it is
+    much faster than parameterize() for the long runs of similar statements that
+    generated scripts consist of."""
+    literal = r"('(?:[^']|'')*'|(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)"
+    return re.compile(literal.join(re.escape(part) for part in template.split("?")), re.DOTALL)
+
+def groupStatements(statements):
+    """Group consecutive statements that share a template from parameterize(), so
+    each group runs as one batch. Return a list of (line number, statements,
+    template, list of values per statement); template is None for statements that
+    run as written, which are never grouped."""
+    groups, last_key, pattern = [], None, None
+    for line, statement in statements:
+        match = pattern.fullmatch(statement) if pattern is not None else None
+        if match:
+            values = [literalValue(token) for token in match.groups()]
+            if None not in values:
+                groups[-1][1].append(statement)
+                groups[-1][3].append(values)
+                continue
+
+        template, values = parameterize(statement)
+        # Statements that only differ in layout share a template
+        key = LAYOUT.sub(lambda match: match.group(1) or " ", template) if template is not None else None
+        if key is not None and key == last_key:
+            groups[-1][1].append(statement)
+            groups[-1][3].append(values)
+        else:
+            groups.append((line, [statement], template, [values] if template is not None else None))
+            pattern = templatePattern(template) if template is not None else None
+        last_key = key
+    return groups
+
+def controlsTransactions(statements):
+    """Return True if any statement starts, ends or can't run inside a transaction,
+    in which case the script can't be wrapped in one."""
+    return any(firstWord(statement) in TRANSACTION_CONTROL for _, statement in statements)
+
+class ScriptRunner:
+    """Runs the statement groups of a script on one connection. Each template is
+    prepared once and reused; a group of several statements is bound as lists and
+    sent with one execBatch() call. A template that SQLite won't prepare, e.g. because
+    a literal was replaced where SQL doesn't allow parameters, falls back to running
+    the statements as written."""
+
+    def __init__(self, database):
+        self.database = database
+        self.prepared = {} # Template: prepared QSqlQuery, or None if it couldn't be prepared
+        self.changes_query = QSqlQuery(database)
+        self.changes_query.prepare("SELECT total_changes()")
+
+    def totalChanges(self):
+        self.changes_query.exec_()
+        self.changes_query.next()
+        changes = self.changes_query.value(0)
+        self.changes_query.finish()
+        return changes
+
+    def preparedQuery(self, template):
+        if template not in self.prepared:
+            query = QSqlQuery(self.database)
+            self.prepared[template] = query if query.prepare(template) else None
+        return self.prepared[template]
+
+    def runGroup(self, statements, template, values_list):
+        """Run a group from groupStatements(). Return (query, rows): query is the open,
+        forward-only query of a SELECT (rows is then 0), or None and the number of rows
+        that were changed. Raise RuntimeError if a statement fails."""
+        query = self.preparedQuery(template) if template is not None else None
+        before = self.totalChanges()
+        if query is None:
+            for statement in statements:
+                query = QSqlQuery(self.database)
+                query.setForwardOnly(True) # Rows are read once, so don't keep them in the query
+                if not query.exec_(statement):
+                    raise RuntimeError(query.lastError().text())
+                if query.isSelect():
+                    return query, 0 # Only statements that run on their own can be SELECTs
+        elif len(values_list) == 1:
+            for value in values_list[0]:
+                query.addBindValue(value)
+            if not query.exec_():
+                raise RuntimeError(query.lastError().text())
+        else:
+            for column in zip(*values_list):
+                query.addBindValue(list(column))
+            if not query.execBatch():
+                raise RuntimeError(query.lastError().text())
+        return None, self.totalChanges() - before
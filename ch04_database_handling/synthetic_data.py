@@ -0,0 +1,114 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import random, datetime, itertools
+
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Lijing", "Andrea", "Aaron", "Malik", "Helen",
+    "Linda", "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Ryan", "Cynthia", "Jacob", "Kathleen", "Gary", "Amy", "Nicholas", "Shirley",
+    "Eric", "Angela", "Daniel", "Nancy", "Kevin", "Maria", "Brian", "Laura", "Jorge", "Mei", "Omar", "Priya"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Ye", "Cotman", "Rountree", "Ranger",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas",
+    "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez",
+    "Clark", "Ramirez", "Lewis", "Miller", "Nguyen", "Kim", "Patel", "Walker", "Young", "Allen"]
+
+# Coastal cities for the synthetic stores: city, state, area code. The first two
+# are the cities of the sample stores
+STORE_CITIES = [("Boston", "MA", 617), ("Miami", "FL", 786), ("San Diego", "CA", 619),
+    ("Seattle", "WA", 206), ("Charleston", "SC", 843), ("Galveston", "TX", 409),
+    ("Portland", "ME", 207), ("Tampa", "FL", 813), ("Norfolk", "VA", 757), ("Mobile", "AL", 251),
+    ("Anchorage", "AK", 907), ("Honolulu", "HI", 808), ("Savannah", "GA", 912), ("Erie", "PA", 814),
+    ("Duluth", "MN", 218), ("Monterey", "CA", 831)]
+
+FIRST_ORDER_DATE = datetime.date(2020, 1, 1)
+
+class SyntheticData:
+    """Deterministic generator of realistic FishingStores data. Each table is
+    generated as a stream of chunks, where a chunk holds one list per column (the
+    form that bulkInsert() binds), so memory use depends on the chunk size rather
+    than on the scale. Each table has its own random generator, seeded from seed
+    and the table's name, and draws the same numbers for every row whatever the
+    chunk size, so the same settings always produce the same database.
+
+    The data is shaped like a real store's: a minority of customers place most of
+    the orders, customers mostly buy from their nearest store, order ids follow the
+    order dates, recent orders are still pending or processing, a few percent are
+    rejected, orders have one to five lines and a few products sell far more often
+    than the rest."""
+
+    def __init__(self, customer_count, products, store_count=2, orders_per_customer=2.0,
+            days=731, seed=41):
+        self.customer_count = customer_count
+        self.products = products # [name, list price, model year] rows; ids start at 1
+        self.store_count = min(store_count, len(STORE_CITIES))
+        self.order_count = int(customer_count * orders_per_customer)
+        self.days = days
+        self.seed = seed
+        # Zipf-like popularity, in the order of a seeded shuffle of the products
+        popularity = list(range(1, len(products) + 1))
+        random.Random("{}:popularity".format(seed)).shuffle(popularity)
+        self.product_weights = list(itertools.accumulate(1 / rank for rank in popularity))
+
+    def random(self, table):
+        return random.Random("{}:{}".format(self.seed, table))
+
+    def chunks(self, table, chunk_size=100000):
+        """Yield the rows of table in chunks of up to chunk_size rows."""
+        rows = getattr(self, table + "Rows")()
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield [list(column) for column in zip(*chunk)]
+
+    def storesRows(self):
+        rng = self.random("stores")
+        for city, state, area_code in STORE_CITIES[:self.store_count]:
+            yield ["{} Fish Supplies".format(city), "({}) {}-{:04d}".format(area_code,
+                rng.randint(200, 999), rng.randint(0, 9999)), state]
+
+    def productsRows(self):
+        return iter(self.products)
+
+    def customersRows(self):
+        rng = self.random("customers")
+        for customer_id in range(1, self.customer_count + 1):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            if rng.random() < 0.4:
+                area_code = STORE_CITIES[self.homeStore(customer_id) - 1][2]
+                phone = "({}) {}-{:04d}".format(area_code, rng.randint(200, 999), rng.randint(0, 9999))
+            else:
+                phone = 'NULL'
+            # The id keeps the address unique among customers with the same name
+            email = "{}.{}{}@email.com".format(last_name.lower(), first_name.lower(), customer_id)
+            yield [first_name, last_name, phone, email]
+
+    def homeStore(self, customer_id):
+        return (customer_id * 7919) % self.store_count + 1
+
+    def ordersRows(self):
+        rng = self.random("orders")
+        for order_id in range(1, self.order_count + 1):
+            # Squaring a uniform number makes low ids (long time customers) more likely
+            customer_id = int(self.customer_count * rng.random() ** 2) + 1
+            day = (order_id - 1) * self.days // self.order_count
+            if day >= self.days - 7:
+                order_status = rng.choice([1, 2, 3]) # Pending, Processing, Completed
+            else:
+                order_status = 4 if rng.random() < 0.03 else 3 # Rejected or Completed
+            store_id = (self.homeStore(customer_id) if rng.random() < 0.8
+                else rng.randint(1, self.store_count))
+            yield [customer_id, (FIRST_ORDER_DATE + datetime.timedelta(days=day)).isoformat(),
+                order_status, store_id]
+
+    def order_productsRows(self):
+        rng = self.random("order_products")
+        product_ids = range(1, len(self.products) + 1)
+        for order_id in range(1, self.order_count + 1):
+            line_count = 1 + min(int(rng.expovariate(1.2)), 4)
+            for product_id in sorted(set(rng.choices(product_ids, cum_weights=self.product_weights,
+                    k=line_count))):
+                quantity = 1 + min(int(rng.expovariate(1.5)), 9)
+                yield [order_id, product_id, quantity, self.products[product_id - 1][1]]
@@ -0,0 +1,49 @@
+"""
+Tests for the per-thread connections of connection_manager.py.
+Run with: python -m pytest ch04_database_handling
+"""
+import sys, threading
+import pytest
+from PyQt5.QtCore import QCoreApplication
+from connection_manager import ConnectionManager
+
+@pytest.fixture
+def connections(tmp_path):
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    connections = ConnectionManager(str(tmp_path / "test.sql"))
+    yield connections
+    connections.closeAll()
+
+def connectionName(connections, release=False):
+    """Return the name of the connection a new thread gets, optionally releasing it."""
+    names = []
+
+    def run():
+        database = connections.connection()
+        names.append(database.connectionName())
+        del database
+        if release:
+            connections.releaseConnection()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return names[0]
+
+def testThreadGetsTheSameConnectionBack(connections):
+    first = connections.connection()
+    assert connections.connection().connectionName() == first.connectionName()
+
+def testUnreleasedConnectionIsNotHandedToALaterThread(connections):
+    # Thread ids are often reused once a thread exits; the second thread must still
+    # open its own connection
+    leaked = connectionName(connections)
+    assert connectionName(connections, release=True) != leaked
+    assert connections.names == {leaked}
+
+def testConnectionIsReopenedAfterCloseAll(connections):
+    name = connections.connection().connectionName()
+    connections.closeAll()
+    database = connections.connection()
+    assert database.isOpen()
+    assert database.connectionName() != name
@@ -0,0 +1,69 @@
+"""
+Tests for the statement grouping and parameter binding of sql_script.py.
+Run with: python -m pytest ch04_database_handling
+"""
+import sys
+import pytest
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtSql import QSqlDatabase, QSqlQuery
+from sql_script import splitStatements, groupStatements, parameterize, ScriptRunner
+
+@pytest.fixture
+def database():
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    database = QSqlDatabase.addDatabase("QSQLITE", "test_sql_script")
+    database.setDatabaseName(":memory:")
+    assert database.open()
+    yield database
+    database.close()
+    del database # The connection can only be removed once no instance refers to it
+    QSqlDatabase.removeDatabase("test_sql_script")
+
+def runScript(database, script):
+    runner = ScriptRunner(database)
+    for line, statements, template, values_list in groupStatements(splitStatements(script)):
+        runner.runGroup(statements, template, values_list)
+
+def selectRows(database, statement):
+    query = QSqlQuery(database)
+    assert query.exec_(statement), query.lastError().text()
+    rows = []
+    while query.next():
+        rows.append(tuple(query.value(i) for i in range(query.record().count())))
+    return rows
+
+def testValuesAreBound():
+    assert parameterize("INSERT INTO x VALUES (1, 'a''b', 2.5)") == (
+        "INSERT INTO x VALUES (?, ?, ?)", [1, "a'b", 2.5])
+    assert parameterize("UPDATE x SET a = 3 WHERE b = 'c'") == (
+        "UPDATE x SET a = ? WHERE b = ?", [3, "c"])
+
+@pytest.mark.parametrize("statement", [
+    "INSERT INTO x SELECT a, count(*) FROM y GROUP BY 1",
+    "DELETE FROM x WHERE a IN (SELECT a FROM x ORDER BY 1 LIMIT 2)",
+    "UPDATE x SET a = 1 WHERE b IN (SELECT b FROM y group by 1)"])
+def testStatementsWithOrdinalsRunAsWritten(statement):
+    assert parameterize(statement) == (None, None)
+
+def testOrdinalsInKeywordsOfStringsDontCount():
+    assert parameterize("INSERT INTO x VALUES ('SELECT 1 ORDER BY 1')") == (
+        "INSERT INTO x VALUES (?)", ["SELECT 1 ORDER BY 1"])
+
+def testGroupByOrdinal(database):
+    runScript(database, """
+        CREATE TABLE y (a INTEGER, b INTEGER);
+        INSERT INTO y VALUES (1, 10);
+        INSERT INTO y VALUES (3, 20);
+        INSERT INTO y VALUES (3, 30);
+        CREATE TABLE x (a INTEGER, n INTEGER);
+        INSERT INTO x SELECT a, count(*) FROM y GROUP BY 1;""")
+    assert selectRows(database, "SELECT a, n FROM x ORDER BY a") == [(1, 1), (3, 2)]
+
+def testOrderByOrdinalInDelete(database):
+    runScript(database, """
+        CREATE TABLE x (a INTEGER, b INTEGER);
+        INSERT INTO x VALUES (1, 30);
+        INSERT INTO x VALUES (2, 20);
+        INSERT INTO x VALUES (3, 10);
+        DELETE FROM x WHERE a IN (SELECT a FROM x ORDER BY 1 DESC LIMIT 1);""")
+    assert selectRows(database, "SELECT a FROM x ORDER BY a") == [(1,), (2,)]
@@ -3,10 +3,16 @@ Written by Joshua Willman
 Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
 """
 # Import necessary modules
-import sys, argparse
+import sys, csv, json, time, argparse
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTableView, 
-    QHeaderView, QMessageBox)
-from PyQt5.QtSql import QSqlDatabase, QSqlQuery, QSqlQueryModel, QSqlTableModel
+    QMessageBox, QTabWidget, QAction)
+from PyQt5.QtSql import QSqlQuery, QSqlTableModel
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtCore import QCoreApplication
+from paged_model import PagedResultModel, QueryPageSource, setupHeaders
+from query_cache import QueryCache, columnNames
+from query_export import readExportRows
+from connection_manager import ConnectionManager
 
 def parseCommandLine():
     """Use argparse to parse the command line for the SQL data model and any 
@@ -15,9 +21,22 @@ def parseCommandLine():
     parser.add_argument("-d", "--data-model", type=str, 
         choices=['read-only', 'read-write'], default="read-only",
         help="Select the type of data model for viewing SQL data: \
-            read-only = QSqlQueryModel; read-write = QSqlTableModel")
+            read-only = PagedResultModel, read page by page; read-write = QSqlTableModel")
     parser.add_argument("-q", "--query", type=str, default=["SELECT * FROM customers"], 
         nargs="*", help="Pass a query in the command line")
+    parser.add_argument("--cached-pages", type=int, default=64,
+        help="Pages of query results kept in the result cache for the read-only model (0 = off)")
+    parser.add_argument("-f", "--database", type=str, default="databases/FishingStores.sql",
+        help="Database to open")
+    parser.add_argument("--headless", action="store_true",
+        help="Run the queries without a window and write their rows to stdout")
+    parser.add_argument("-o", "--output-format", type=str, choices=["csv", "json"], default="csv",
+        help="Format of the rows in headless mode: csv = a header and rows for each query; \
+            json = one JSON object per row (JSON Lines)")
+    parser.add_argument("-r", "--repeat", type=int, default=1,
+        help="Run each query this many times in headless mode; the rows are written once")
+    parser.add_argument("-t", "--timing", action="store_true",
+        help="Print the latency percentiles of each query to stderr in headless mode")
     args = vars(parser.parse_args())
     return args
 
@@ -38,12 +57,12 @@ class DisplayDatabase(QMainWindow):
     
     def createConnection(self):
         """Set up connection to the database. Check if the tables needed exist."""
-        self.database = QSqlDatabase.addDatabase("QSQLITE")
-        self.database.setDatabaseName("databases/FishingStores.sql")
-
-        if not self.database.open():
+        self.connections = ConnectionManager(args["database"])
+        try:
+            self.database = self.connections.connection()
+        except RuntimeError as error:
             print("Unable to open data source file.")
-            print("Connection failed: ", self.database.lastError().text())
+            print("Connection failed: ", error)
             sys.exit(1) # Error code 1 - signifies error in opening file
     
         # Check if the tables we want to use exist in the database
@@ -59,28 +78,127 @@ class DisplayDatabase(QMainWindow):
         The query_cmdline argument is a list of queries from the command line."""
         if data_model == "read-write":
             # Create the model instance
-            self.model = QSqlTableModel()
+            self.model = QSqlTableModel(db=self.database)
             # Populate the model with data. Example of using setQuery() to display data in the 
             # table view; you would typically use setTable() to populate the model
             for qry in query_cmdline:
-                query = QSqlQuery(qry)
+                query = QSqlQuery(qry, self.database)
                 self.model.setQuery(query)
                 
         elif data_model == "read-only":
-            self.model = QSqlQueryModel()
-            # Populate the model with data
+            # Each query gets a tab. Only the pages of rows that are scrolled to are
+            # read and kept in memory, and the queries share one cache of prepared
+            # statements and results, so refreshing the tabs (F5) only reads the
+            # database again if the data changed
+            self.query_cache = QueryCache(self.database, max_results=args["cached_pages"])
+            self.query_tabs = [] # (page source, query, table view) for each tab
+            tabs = QTabWidget()
             for qry in query_cmdline:
-                self.model.setQuery(qry)
+                model = PagedResultModel()
+                table_view = self.createTableView(model)
+                self.query_tabs.append((QueryPageSource(self.database, model, self.query_cache), qry, table_view))
+                tabs.addTab(table_view, qry)
+            self.refreshQueries()
+
+            refresh_act = QAction("Refresh", self)
+            refresh_act.setShortcut(QKeySequence.Refresh)
+            refresh_act.triggered.connect(self.refreshQueries)
+            self.addAction(refresh_act)
+            self.setCentralWidget(tabs)
+            return
+
+        self.setCentralWidget(self.createTableView(self.model))
+
+    def refreshQueries(self):
+        """Run the queries of the tabs again. Pages whose data didn't change come from the cache."""
+        for page_source, qry, table_view in self.query_tabs:
+            try:
+                page_source.setQuery(qry)
+            except RuntimeError as error:
+                print("Query failed: ", error)
+            # Setting a query resets the model, which shows every column again
+            table_view.resizeColumnsToContents()
+            table_view.hideColumn(0)
 
+    def createTableView(self, model):
         table_view = QTableView()
-        table_view.setModel(self.model)
+        table_view.setModel(model)
+        setupHeaders(table_view)
+        table_view.resizeColumnsToContents()
         table_view.hideColumn(0) # Useful if you don't want to view the id values
-        table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        return table_view
 
-        self.setCentralWidget(table_view)
+def runHeadless(database, queries, output_format="csv", repeat=1, timing=False, chunk_size=1000):
+    """Run each query repeat times and write its rows from the first run to stdout,
+    chunk_size rows at a time. Every run reads all the rows, so the timings include
+    reading them. Queries are prepared once and their results are never cached, so
+    each run measures the database. Return 0, or 1 if a query failed."""
+    cache = QueryCache(database, max_results=0)
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    for number, qry in enumerate(queries):
+        if number > 0 and output_format == "csv":
+            sys.stdout.write("\n") # A blank line between the results of the queries
+        try:
+            query = cache.preparedQuery(qry)
+        except RuntimeError as error:
+            print("Query failed: ", error, file=sys.stderr)
+            return 1
+        times = []
+        for run in range(repeat):
+            start = time.perf_counter()
+            if not query.exec_():
+                print("Query failed: ", query.lastError().text(), file=sys.stderr)
+                return 1
+            columns = columnNames(query)
+            if run == 0 and output_format == "csv":
+                writer.writerow(columns)
+            while True:
+                rows = readExportRows(query, chunk_size, lambda value: bytes(value).hex())
+                if run == 0:
+                    if output_format == "csv":
+                        writer.writerows(rows)
+                    else:
+                        sys.stdout.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+                if len(rows) < chunk_size:
+                    break
+            query.finish() # Release the statement, which ends SQLite's read transaction
+            times.append(time.perf_counter() - start)
+        if timing:
+            times.sort()
+            print("[INFO] {} runs of {}: min {:.3f} ms, p50 {:.3f} ms, p90 {:.3f} ms, "
+                "p99 {:.3f} ms, max {:.3f} ms".format(repeat, " ".join(qry.split()),
+                *[1000 * value for value in [times[0]] + [percentile(times, p) for p in (50, 90, 99)]
+                    + [times[-1]]]), file=sys.stderr)
+    return 0
+
+def percentile(sorted_values, p):
+    """Return the p-th percentile of sorted_values, interpolated linearly like np.percentile()."""
+    position = (len(sorted_values) - 1) * p / 100
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
 
 if __name__ == "__main__":
     args = parseCommandLine() # Return any command line arguments
+    if args["headless"]:
+        # No window, so no display is needed
+        app = QCoreApplication(sys.argv)
+        connections = ConnectionManager(args["database"])
+        try:
+            database = connections.connection()
+        except RuntimeError as error:
+            print("Connection failed: ", error, file=sys.stderr)
+            sys.exit(1) # Error code 1 - signifies error in opening file
+        exit_code = runHeadless(database, args["query"], args["output_format"],
+            max(args["repeat"], 1), args["timing"])
+        del database # The connection can only be removed once no instance refers to it
+        connections.closeAll()
+        sys.exit(exit_code)
+
     app = QApplication(sys.argv)
     window = DisplayDatabase()
-    sys.exit(app.exec_())
\ No newline at end of file
+    exit_code = app.exec_()
+    connections = window.connections
+    del window # Delete the models and views that use the connection before closing it
+    connections.closeAll()
+    sys.exit(exit_code)
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import numpy as np
+
+# Most bars to hand to Q3DBars at once. Without a GPU, Qt renders through a
+# software OpenGL implementation, which stays responsive up to a few thousand bars
+MAX_BARS = 4096
+
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"]
+
+# Statistics shown in the GUI: name: statistic passed to rollup()
+STATISTICS = {"Mean": "mean", "Minimum": "min", "Maximum": "max",
+    "10th Percentile": 10, "Median": 50, "90th Percentile": 90}
+
+class TemperatureAggregator:
+    """Groups a series of dated temperature samples into a grid of bars and reduces
+    each bar to one statistic. The granularities are:
+        month: one row per year, one column per month
+        week: one row per year, one column per week of the year (daily samples only)
+        year: one row per decade, one column per year of the decade
+    Each rollup is computed once with NumPy and cached, so switching between them
+    never goes back to the source file."""
+
+    def __init__(self, dates, values):
+        dates = np.asarray(dates)
+        values = np.asarray(values, dtype=float)
+        keep = ~np.isnan(values) # Missing samples don't count towards any bar
+        self.dates, self.values = dates[keep], values[keep]
+        self.resolution = np.datetime_data(dates.dtype)[0] # "D" for daily, "M" for monthly
+        self.rollups = {}
+
+    @classmethod
+    def fromMonthlyTable(cls, years, monthly_temps):
+        """Create an aggregator from a table with one row of 12 monthly values per year,
+        such as the one returned by loadTemperatureCSV()."""
+        monthly_temps = np.asarray(monthly_temps, dtype=float)
+        first_months = np.array([str(year) for year in years], dtype="datetime64[M]")
+        dates = first_months[:, np.newaxis] + np.arange(monthly_temps.shape[1])
+        return cls(dates.ravel(), monthly_temps.ravel())
+
+    def granularities(self):
+        """Return the granularities that the resolution of the samples supports."""
+        if self.resolution == "D":
+            return ["month", "week", "year"]
+        return ["month", "year"]
+
+    def rollup(self, granularity="month", statistic="mean", max_bars=MAX_BARS):
+        """Return the row labels, column labels and 2D array of values for the
+        granularity. statistic is "mean", "min", "max" or a percentile from 0 to 100.
+        If the grid has more than max_bars bars, only the most recent rows that fit
+        are returned. Bars without samples are NaN."""
+        key = (granularity, statistic)
+        if key not in self.rollups:
+            self.rollups[key] = self.computeRollup(granularity, statistic)
+        row_labels, column_labels, values = self.rollups[key]
+
+        row_count = max(1, max_bars // len(column_labels)) if max_bars else len(row_labels)
+        return row_labels[-row_count:], column_labels, values[-row_count:]
+
+    def computeRollup(self, granularity, statistic):
+        if granularity not in self.granularities():
+            raise ValueError("{} granularity is not available for samples with {} resolution".format(
+                granularity, self.resolution))
+        years = self.dates.astype("datetime64[Y]").astype(int) + 1970
+
+        if granularity == "year":
+            rows = years // 10
+            columns = years % 10
+            column_labels = ["Year {}".format(i) for i in range(10)]
+            row_label = lambda row: "{}s".format(row * 10)
+        else:
+            rows = years
+            if granularity == "month":
+                columns = self.dates.astype("datetime64[M]").astype(int) % 12
+                column_labels = MONTH_NAMES
+            else:
+                day_of_year = (self.dates.astype("datetime64[D]")
+                    - self.dates.astype("datetime64[Y]")).astype(int)
+                columns = day_of_year // 7 # Days 364 and 365 form a short 53rd week
+                column_labels = ["Week {}".format(i + 1) for i in range(53)]
+            row_label = str
+
+        if len(rows) == 0:
+            return [], column_labels, np.empty((0, len(column_labels)))
+        first_row = rows.min()
+        row_count = rows.max() - first_row + 1
+        groups = (rows - first_row) * len(column_labels) + columns
+        values = groupStatistic(groups, self.values, row_count * len(column_labels), statistic)
+
+        row_labels = [row_label(row) for row in range(first_row, first_row + row_count)]
+        return row_labels, column_labels, values.reshape(row_count, len(column_labels))
+
+def groupStatistic(groups, values, group_count, statistic):
+    """Reduce the values in each group (an int from 0 to group_count - 1) to one
+    number. Percentiles interpolate linearly, like np.percentile(). Empty groups are NaN."""
+    counts = np.bincount(groups, minlength=group_count)
+    result = np.full(group_count, np.nan)
+    filled = counts > 0
+
+    if statistic == "mean":
+        sums = np.bincount(groups, weights=values, minlength=group_count)
+        result[filled] = sums[filled] / counts[filled]
+    elif statistic in ("min", "max"):
+        extreme = np.full(group_count, np.inf if statistic == "min" else -np.inf)
+        (np.minimum if statistic == "min" else np.maximum).at(extreme, groups, values)
+        result[filled] = extreme[filled]
+    else:
+        # Sort by group, then by value, and read each percentile from its group's slice
+        order = np.lexsort((values, groups))
+        sorted_values = values[order]
+        starts = np.cumsum(counts) - counts
+        position = starts[filled] + (counts[filled] - 1) * (float(statistic) / 100)
+        lower = np.floor(position).astype(int)
+        upper = np.ceil(position).astype(int)
+        fraction = position - lower
+        result[filled] = sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+    return result
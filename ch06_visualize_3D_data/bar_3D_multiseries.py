@@ -3,13 +3,15 @@ Written by Joshua Willman
 Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
 """
 # Import necessary modules
-import sys, csv
-import numpy as np
+import sys, argparse
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QLabel, 
-    QSlider, QComboBox, QPushButton, QCheckBox, QToolBox, QHBoxLayout, QVBoxLayout)
-from PyQt5.QtDataVisualization import (Q3DBars, QBarDataItem, QBar3DSeries, 
+    QSlider, QComboBox, QPushButton, QCheckBox, QToolBox, QScrollArea, QHBoxLayout, QVBoxLayout)
+from PyQt5.QtDataVisualization import (Q3DBars, QBar3DSeries, 
     QValue3DAxis, QAbstract3DSeries, QAbstract3DGraph, Q3DCamera, Q3DTheme)
 from PyQt5.QtCore import Qt, QObject, pyqtSignal
+from bar_data import BarDataBridge
+from series_registry import SeriesRegistry
+from aggregation import TemperatureAggregator, MAX_BARS, STATISTICS
 
 style_sheet = """
     QToolBox:tab { /* Style for tabs in QToolBox */
@@ -27,6 +29,31 @@ style_sheet = """
         color: #FFFFFF
     }"""
 
+# Qt themes, in the order of the Q3DTheme.Theme enum, and the bar styles
+THEMES = ["Qt", "Primary Colors", "Digia", "Stone Moss", "Army Blue",
+    "Retro", "Ebony", "Isabelle"]
+BAR_STYLES = {"Bar": QAbstract3DSeries.MeshBar, "Pyramid": QAbstract3DSeries.MeshPyramid,
+    "Cylinder": QAbstract3DSeries.MeshCylinder, "Sphere": QAbstract3DSeries.MeshSphere}
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the cities to show and the
+    streaming mode. Without a source, the CSV files are shown as they are."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--cities", type=str, nargs="+",
+        default=["LasVegas", "Spokane", "Richmond"],
+        help="Cities to compare, each with a files/<city>_temp.csv file; the first is the primary series")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--stream-csv", type=str,
+        help="Tail a CSV file for new rows of the form city,label,Jan,...,Dec")
+    source.add_argument("--stream-socket", type=str,
+        help="Listen on a local socket with this name for new rows")
+    parser.add_argument("-w", "--window", type=int, default=11,
+        help="Number of rows shown for each city while streaming")
+    parser.add_argument("--fps", type=int, default=30,
+        help="Maximum number of graph updates per second while streaming")
+    args = vars(parser.parse_args())
+    return args
+
 class GraphModifier(QObject):
     # Create pyqtSignals for keeping track of the state of the background 
     # and grid when the theme is changed
@@ -45,6 +72,10 @@ class GraphModifier(QObject):
         self.bar_style = QAbstract3DSeries.MeshBar
         self.bars_are_smooth = False
 
+        # Rollup shown in the graph
+        self.granularity = "month"
+        self.statistic = "mean"
+
     def rotateHorizontal(self, rotation):
         self.graph.scene().activeCamera().setCameraPosition(
             rotation, self.vertical_rotation)
@@ -65,6 +96,11 @@ class GraphModifier(QObject):
         else: 
             self.camera_preset = Q3DCamera.CameraPreset(preset)
         
+    def setCameraPreset(self, preset):
+        """Move the camera to preset. changeCameraView() continues from there."""
+        self.camera_preset = preset
+        self.graph.scene().activeCamera().setCameraPreset(preset)
+
     def showOrHideBackground(self, state):
         self.graph.activeTheme().setBackgroundEnabled(state)
 
@@ -88,23 +124,16 @@ class GraphModifier(QObject):
         """Change the visual style of the bars."""
         combo_box = self.sender()
         if isinstance(combo_box, QComboBox):
-            self.bar_style = QAbstract3DSeries.Mesh(combo_box.itemData(style))
-            for series in self.graph.seriesList():
-                series.setMesh(self.bar_style)
-
-    def showOrHideSeries(self, state):
-        """Show or hide the secondary series. seriesList()[1] refers to Spokane; 
-        seriesList()[2] refers to Richmond."""
-        checkbox = self.sender()
-        if state == Qt.Checked and checkbox.text() == "Show Second Series":
-            self.graph.seriesList()[1].setVisible(True)
-        elif state != Qt.Checked and checkbox.text() == "Show Second Series":
-            self.graph.seriesList()[1].setVisible(False)
-
-        if state == Qt.Checked and checkbox.text() == "Show Third Series":
-            self.graph.seriesList()[2].setVisible(True)
-        elif state != Qt.Checked and checkbox.text() == "Show Third Series":
-            self.graph.seriesList()[2].setVisible(False)
+            self.setBarStyle(QAbstract3DSeries.Mesh(combo_box.itemData(style)))
+
+    def setBarStyle(self, bar_style):
+        self.bar_style = bar_style
+        for series in self.graph.seriesList():
+            series.setMesh(self.bar_style)
+
+    def showOrHideSeries(self, series, state):
+        """Show or hide one of the secondary series."""
+        series.setVisible(state == Qt.Checked)
         
     def changeSelectionStyle(self, style):
         """Choose the style used to select data, by rows, columns or other options."""
@@ -113,15 +142,30 @@ class GraphModifier(QObject):
             selection_style = combo_box.itemData(style)
             self.graph.setSelectionMode(QAbstract3DGraph.SelectionFlags(selection_style))
     
+    def changeGranularity(self, index):
+        """Regroup the bars by month, week or year. The rollups come from each city's
+        aggregator, which computes a rollup once and caches it."""
+        combo_box = self.sender()
+        if isinstance(combo_box, QComboBox):
+            self.granularity = combo_box.itemData(index)
+            self.parent.showRollup(self.granularity, self.statistic)
+
+    def changeStatistic(self, index):
+        """Choose the statistic that each bar shows: mean, minimum, maximum or a percentile."""
+        combo_box = self.sender()
+        if isinstance(combo_box, QComboBox):
+            self.statistic = combo_box.itemData(index)
+            self.parent.showRollup(self.granularity, self.statistic)
+
     def selectYears(self, year):
-        """Select a specific year to view."""
+        """Select a specific year (a row of the current granularity) to view."""
         if year >= len(self.parent.years):
             self.graph.axes()[1].setRange(0, len(self.parent.years) - 1)
         else:
             self.graph.axes()[1].setRange(year, year)
 
     def selectMonths(self, month):
-        """Select a specific month to view."""
+        """Select a specific month (a column of the current granularity) to view."""
         if month >= len(self.parent.months):
             self.graph.axes()[0].setRange(0, len(self.parent.months) - 1)
         else:
@@ -129,18 +173,26 @@ class GraphModifier(QObject):
 
 class SimpleBarGraph(QMainWindow):
 
-    def __init__(self):
+    def __init__(self, cities, stream_csv=None, stream_socket=None, window=11, fps=30, show=True):
         super().__init__() 
+        self.cities = cities
+        self.stream_csv, self.stream_socket = stream_csv, stream_socket
+        self.window, self.fps = window, fps
+        self.show_window = show # False when the graph is only rendered to images
         self.initializeUI() 
 
     def initializeUI(self):
         """Initialize the window and display its contents."""
-        self.showMaximized()
+        if self.show_window:
+            self.showMaximized()
         self.setMinimumSize(1000, 800)
         self.setWindowTitle('6.1 - 3D Bar Graph Multiseries')
 
         self.setupWindow()
-        self.show()
+        if self.stream_csv or self.stream_socket:
+            self.setupStream()
+        if self.show_window:
+            self.show()
 
     def setupWindow(self):
         """The window is comprised of two main parts: A Q3DBars graph on the left, and QToolBox
@@ -148,52 +200,33 @@ class SimpleBarGraph(QMainWindow):
         header_label = QLabel("Comparison of Average Monthly Temperatures of Select U.S. Cities 1990-2000 (˚C)")
         header_label.setAlignment(Qt.AlignCenter)
 
-        # Load and prepare the data for the three datasets
-        data_files = ["LasVegas_temp.csv", "Spokane_temp.csv", "Richmond_temp.csv"]
-        temperature_data = {}
-        # Create a dictionary with key, value pairs pertaining to each city and dataset
-        for f in data_files:
-            data_name = f.split("_")[0] + "_data" # Create a dictionary key for each city
-            data = self.loadCSVFile("files/" + f)
-    
-            # Select 11 years: 1990-2000; the first column in each file is the years
-            rows, columns = data.shape
-            self.years = data[:, 0]
-            monthly_temps = data[:, 1:columns].astype(float)
-            temperature_data[data_name] = monthly_temps
+        # Load the datasets for every city in parallel; the first one is the primary
+        # series, which holds the row and column labels
+        registry = SeriesRegistry()
+        registry.discover("files", names=self.cities)
+        temperature_data = registry.load()
+
+        # Each city's aggregator computes the rollups that the bars show. The bar 
+        # limit is shared between the series
+        self.aggregators = {city: TemperatureAggregator.fromMonthlyTable(years, monthly_temps)
+            for city, (years, monthly_temps) in temperature_data.items()}
+        self.max_bars = max(1, MAX_BARS // len(self.cities))
+        self.years, self.months, _ = self.aggregators[self.cities[0]].rollup(max_bars=self.max_bars)
 
-        bar_graph = Q3DBars() # Create instance for bar graph
+        bar_graph = self.createGraph() # Create instance for bar graph
         bar_graph.setMultiSeriesUniform(True) # Bars are scaled proportionately
         bar_graph.scene().activeCamera().setCameraPreset(Q3DCamera.CameraPresetFront)
 
-        # Create lists of QBarDataItem objects for each city 
-        vegas_data_items = []
-        for row in temperature_data["LasVegas_data"]:
-            vegas_data_items.append([QBarDataItem(value) for value in row])
-
-        spokane_data_items = []
-        for row in temperature_data["Spokane_data"]:
-            spokane_data_items.append([QBarDataItem(value) for value in row])
-    
-        richmond_data_items = []
-        for row in temperature_data["Richmond_data"]:
-            richmond_data_items.append([QBarDataItem(value) for value in row])
-
-        self.months = ["January", "February", "March", "April", "May", "June",
-        "July", "August", "September", "October", "November", "December"]
-
-        # Create instances of QBar3DSeries for each set of data; dataProxy() handles 
-        # modifying data in the series
-        vegas_series = QBar3DSeries()
-        vegas_series.dataProxy().addRows(vegas_data_items)
-        vegas_series.dataProxy().setRowLabels(self.years) # rowLabel
-        vegas_series.dataProxy().setColumnLabels(self.months) # colLabel
-
-        spokane_series = QBar3DSeries()
-        spokane_series.dataProxy().addRows(spokane_data_items)
-
-        richmond_series = QBar3DSeries()
-        richmond_series.dataProxy().addRows(richmond_data_items)
+        # Create an instance of QBar3DSeries for each city; dataProxy() handles 
+        # modifying data in the series. Each BarDataBridge fills its series' proxy 
+        # from the array in one call
+        self.series, self.bar_data = {}, {}
+        for city, aggregator in self.aggregators.items():
+            _, _, monthly_temps = aggregator.rollup(max_bars=self.max_bars)
+            self.series[city], self.bar_data[city] = self.createSeries(city, monthly_temps)
+        self.primary_series = self.series[self.cities[0]]
+        self.primary_series.dataProxy().setRowLabels(self.years) # rowLabel
+        self.primary_series.dataProxy().setColumnLabels(self.months) # colLabel
 
         # Create the valueLabel
         temperature_axis = QValue3DAxis()
@@ -201,18 +234,14 @@ class SimpleBarGraph(QMainWindow):
         temperature_axis.setLabelFormat(u"%.1f \N{degree sign}C")
         bar_graph.setValueAxis(temperature_axis)
 
-        # Set the format for the labels that appear when items are clicked on
-        vegas_series.setItemLabelFormat("LasVegas - @colLabel @rowLabel: @valueLabel")
-        spokane_series.setItemLabelFormat("Spokane - @colLabel @rowLabel: @valueLabel")
-        richmond_series.setItemLabelFormat("Richmond - @colLabel @rowLabel: @valueLabel")
-
-        # Add the three series to the bar graph
-        bar_graph.setPrimarySeries(vegas_series)
-        bar_graph.addSeries(spokane_series)
-        bar_graph.addSeries(richmond_series)
+        # Add the series to the bar graph
+        bar_graph.setPrimarySeries(self.primary_series)
+        for series in self.series.values():
+            if series is not self.primary_series:
+                bar_graph.addSeries(series)
 
         # Create a QWidget to hold only the graph
-        graph_container = QWidget.createWindowContainer(bar_graph)
+        graph_container = self.createGraphContainer(bar_graph)
         main_h_box = QHBoxLayout() # Main layout for the entire window
         graph_v_box = QVBoxLayout() # Layout that holds the graph
         graph_v_box.addWidget(header_label)
@@ -275,19 +304,15 @@ class SimpleBarGraph(QMainWindow):
         smooth_bars_cb.stateChanged.connect(self.modifier.smoothenBars)
 
         # QComboBox for selecting the Qt theme
-        themes = ["Qt", "Primary Colors", "Digia", "Stone Moss", "Army Blue",
-            "Retro", "Ebony", "Isabelle"]
         select_theme_combo = QComboBox()
-        select_theme_combo.addItems(themes)
+        select_theme_combo.addItems(THEMES)
         select_theme_combo.setCurrentIndex(0)
         select_theme_combo.currentIndexChanged.connect(self.modifier.changeTheme)
 
         # QComboBox for selecting the visual style of the bars
         bar_style_combo = QComboBox()
-        bar_style_combo.addItem("Bar", QAbstract3DSeries.MeshBar)
-        bar_style_combo.addItem("Pyramid", QAbstract3DSeries.MeshPyramid)
-        bar_style_combo.addItem("Cylinder", QAbstract3DSeries.MeshCylinder)        
-        bar_style_combo.addItem("Sphere", QAbstract3DSeries.MeshSphere)
+        for name, bar_style in BAR_STYLES.items():
+            bar_style_combo.addItem(name, bar_style)
         bar_style_combo.setCurrentIndex(0)
         bar_style_combo.currentIndexChanged.connect(self.modifier.changeBarStyle)
 
@@ -308,13 +333,23 @@ class SimpleBarGraph(QMainWindow):
 
         # The third tab - Widgets for hiding/showing different series and changing how 
         # items are viewed and selected
-        second_series_cb = QCheckBox("Show Second Series")
-        second_series_cb.setChecked(True)
-        second_series_cb.stateChanged.connect(self.modifier.showOrHideSeries)
-
-        third_series_cb = QCheckBox("Show Third Series")
-        third_series_cb.setChecked(True)
-        third_series_cb.stateChanged.connect(self.modifier.showOrHideSeries)
+        # One checkbox for each secondary series, in a scroll area for long lists
+        series_toggles = QWidget()
+        series_toggles_v_box = QVBoxLayout()
+        series_toggles_v_box.setContentsMargins(0, 0, 0, 0)
+        for city in self.cities[1:]:
+            series_cb = QCheckBox("Show {}".format(city))
+            series_cb.setChecked(True)
+            series_cb.stateChanged.connect(
+                lambda state, series=self.series[city]: self.modifier.showOrHideSeries(series, state))
+            series_toggles_v_box.addWidget(series_cb)
+        series_toggles.setLayout(series_toggles_v_box)
+
+        series_scroll_area = QScrollArea()
+        series_scroll_area.setWidget(series_toggles)
+        series_scroll_area.setWidgetResizable(True)
+        series_scroll_area.setFrameShape(QScrollArea.NoFrame)
+        series_scroll_area.setMaximumHeight(200)
 
         # QComboBox for changing how items in the bar graph are selected
         selection_mode_combo = QComboBox()
@@ -326,31 +361,45 @@ class SimpleBarGraph(QMainWindow):
         selection_mode_combo.setCurrentIndex(1)
         selection_mode_combo.currentIndexChanged.connect(self.modifier.changeSelectionStyle)
 
+        # QComboBoxes for grouping the bars and choosing what each bar shows
+        self.granularity_combo = QComboBox()
+        for granularity in self.aggregators[self.cities[0]].granularities():
+            self.granularity_combo.addItem(granularity.title(), granularity)
+        self.granularity_combo.currentIndexChanged.connect(self.modifier.changeGranularity)
+
+        self.statistic_combo = QComboBox()
+        for name, statistic in STATISTICS.items():
+            self.statistic_combo.addItem(name, statistic)
+        self.statistic_combo.currentIndexChanged.connect(self.modifier.changeStatistic)
+
         # QComboBox for selecting which years to view
-        select_year_combo = QComboBox()
-        select_year_combo.addItems(self.years)
-        select_year_combo.addItem("All Years")
-        select_year_combo.setCurrentIndex(len(self.years))
-        select_year_combo.currentIndexChanged.connect(self.modifier.selectYears)
+        self.select_year_combo = QComboBox()
+        self.select_year_combo.addItems(self.years)
+        self.select_year_combo.addItem("All Years")
+        self.select_year_combo.setCurrentIndex(len(self.years))
+        self.select_year_combo.currentIndexChanged.connect(self.modifier.selectYears)
 
         # QComboBox for selecting which months to view
-        select_month_combo = QComboBox()
-        select_month_combo.addItems(self.months)
-        select_month_combo.addItem("All Months")
-        select_month_combo.setCurrentIndex(len(self.months))
-        select_month_combo.currentIndexChanged.connect(self.modifier.selectMonths)    
+        self.select_month_combo = QComboBox()
+        self.select_month_combo.addItems(self.months)
+        self.select_month_combo.addItem("All Months")
+        self.select_month_combo.setCurrentIndex(len(self.months))
+        self.select_month_combo.currentIndexChanged.connect(self.modifier.selectMonths)
 
         # Layout for the Selection tab (third tab)
         selection_tab_container = QWidget()
         selection_tab_v_box = QVBoxLayout()
-        selection_tab_v_box.addWidget(second_series_cb)
-        selection_tab_v_box.addWidget(third_series_cb)
+        selection_tab_v_box.addWidget(series_scroll_area)
         selection_tab_v_box.addWidget(QLabel("Choose Selection Mode"))
         selection_tab_v_box.addWidget(selection_mode_combo)
+        selection_tab_v_box.addWidget(QLabel("Group Bars By"))
+        selection_tab_v_box.addWidget(self.granularity_combo)
+        selection_tab_v_box.addWidget(QLabel("Show Statistic"))
+        selection_tab_v_box.addWidget(self.statistic_combo)
         selection_tab_v_box.addWidget(QLabel("Select Year"))
-        selection_tab_v_box.addWidget(select_year_combo)
+        selection_tab_v_box.addWidget(self.select_year_combo)
         selection_tab_v_box.addWidget(QLabel("Select Month"))
-        selection_tab_v_box.addWidget(select_month_combo)
+        selection_tab_v_box.addWidget(self.select_month_combo)
         selection_tab_container.setLayout(selection_tab_v_box)
 
         settings_toolbox.addItem(selection_tab_container, "Selection") 
@@ -366,16 +415,95 @@ class SimpleBarGraph(QMainWindow):
         main_widget.setLayout(main_h_box)
         self.setCentralWidget(main_widget)
 
-    def loadCSVFile(self, file_name):
-        """Load CSV files. Return data as numpy arrays."""
-        with open(file_name, "r") as csv_f:
-            reader = csv.reader(csv_f)
-            header_labels = next(reader)
-            data = np.array(list(reader))
-        return data
+    def createGraph(self):
+        return Q3DBars()
+
+    def createGraphContainer(self, bar_graph):
+        """Return the widget that shows bar_graph. Q3DBars is a QWindow, so it is
+        placed in a window container."""
+        return QWidget.createWindowContainer(bar_graph)
+
+    def setupStream(self):
+        """Start the streaming mode. Rows from the source are batched and applied at
+        most fps times a second; each city keeps its last window rows, which slide
+        by removing the oldest rows from its data proxy and adding the new ones."""
+        from temperature_stream import TailedCSVSource, LocalSocketSource, StreamBatcher
+
+        # Start from the last window rows of each file. Streamed rows are raw monthly
+        # values, so the rollup can't be changed while streaming
+        self.granularity_combo.setEnabled(False)
+        self.statistic_combo.setEnabled(False)
+        self.years = self.years[-self.window:]
+        for bridge in self.bar_data.values():
+            bridge.setValues(bridge.values[-self.window:])
+        self.primary_series.dataProxy().setRowLabels(self.years)
+        self.refreshSelectionCombos()
+
+        self.batcher = StreamBatcher(self.bar_data, self.window, self.fps, self)
+        self.batcher.flushed.connect(self.reportStreamUpdate)
+        if self.stream_csv:
+            self.source = TailedCSVSource(self.stream_csv, parent=self)
+        else:
+            self.source = LocalSocketSource(self.stream_socket, self)
+            self.stream_socket = self.source.server.fullServerName()
+        self.source.rows_received.connect(self.batcher.addRows)
+        self.statusBar().showMessage("Waiting for rows from {}".format(
+            self.stream_csv or self.stream_socket))
+
+    def reportStreamUpdate(self, row_count, elapsed):
+        """Show the cost of the last batch and the mean cost per row, and keep the year
+        labels and the Select Year combo box in step with the primary series."""
+        self.years = self.primary_series.dataProxy().rowLabels()
+        self.refreshSelectionCombos()
+        self.statusBar().showMessage(
+            "Last batch: {} rows in {:.2f} ms | Mean update cost: {:.1f} µs/row over {} rows".format(
+            row_count, 1000 * elapsed, 1e6 * self.batcher.costPerRow(), self.batcher.total_rows))
+
+    def showRollup(self, granularity, statistic):
+        """Show the rollup of every city for granularity and statistic. Only the bars
+        whose values changed are sent to the data proxies. Bars without samples are NaN."""
+        for city, aggregator in self.aggregators.items():
+            _, _, values = aggregator.rollup(granularity, statistic, self.max_bars)
+            self.bar_data[city].updateValues(values)
+
+        # The labels come from the primary series
+        row_labels, column_labels, _ = self.aggregators[self.cities[0]].rollup(
+            granularity, statistic, self.max_bars)
+        if (row_labels, column_labels) != (self.years, self.months):
+            self.years, self.months = row_labels, column_labels
+            self.primary_series.dataProxy().setRowLabels(self.years)
+            self.primary_series.dataProxy().setColumnLabels(self.months)
+            # The rows and columns are different, so show all of them again
+            self.refreshSelectionCombos(reset=True)
+            self.modifier.selectYears(len(self.years))
+            self.modifier.selectMonths(len(self.months))
+
+    def refreshSelectionCombos(self, reset=False):
+        """Replace the year and month labels in the combo boxes. The selections are kept
+        unless reset is True, which selects all years and months."""
+        for combo_box, labels, all_label in [(self.select_year_combo, self.years, "All Years"),
+                (self.select_month_combo, self.months, "All Months")]:
+            index = len(labels) if reset else min(combo_box.currentIndex(), len(labels))
+            combo_box.blockSignals(True)
+            combo_box.clear()
+            combo_box.addItems(labels)
+            combo_box.addItem(all_label)
+            combo_box.setCurrentIndex(index)
+            combo_box.blockSignals(False)
+
+    def createSeries(self, city, monthly_temps):
+        """Create the series for one city and fill it from monthly_temps. Return the
+        series and the BarDataBridge that holds its values."""
+        series = QBar3DSeries()
+        bridge = BarDataBridge(series.dataProxy())
+        bridge.setValues(monthly_temps)
+        # Set the format for the labels that appear when items are clicked on
+        series.setItemLabelFormat("{} - @colLabel @rowLabel: @valueLabel".format(city))
+        return series, bridge
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     app.setStyleSheet(style_sheet)
-    window = SimpleBarGraph()
+    args = parseCommandLine() # Return any command line arguments
+    window = SimpleBarGraph(args["cities"], args["stream_csv"], args["stream_socket"], args["window"], args["fps"])
     sys.exit(app.exec_())
\ No newline at end of file
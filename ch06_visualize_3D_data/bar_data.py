@@ -0,0 +1,119 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+from collections import deque
+from itertools import chain
+import numpy as np
+from PyQt5.QtDataVisualization import QBarDataItem
+
+def createBarRows(values):
+    """Convert a 2D array of values into the rows of QBarDataItem objects that
+    QBarDataProxy expects. tolist() converts the whole array to Python floats at
+    once, which is cheaper than reading NumPy scalars one at a time."""
+    return [[QBarDataItem(value) for value in row] for row in np.asarray(values, dtype=float).tolist()]
+
+class BarDataBridge:
+    """Keeps the values shown by a QBarDataProxy in a 2D NumPy array. setValues()
+    replaces the proxy's data array in a single resetArray() call; updateValues()
+    compares the new values with the current ones and only sends the changed rows
+    (setRow()) or single bars (setItem()) to the proxy.
+
+    PyQt5 doesn't bind QBarDataArray, so the proxy can only be given lists of
+    QBarDataItem, and creating the Python wrapper of an item costs about six times
+    as much as setting its value. The proxy copies the items it is given, so with
+    keep_items the bridge keeps the items it made and refills them with
+    setValue() the next time, instead of creating new ones. That holds roughly 240
+    bytes per bar; a bridge that is only filled once can pass keep_items=False."""
+
+    def __init__(self, proxy, row_threshold=0.25, keep_items=True):
+        self.proxy = proxy
+        # A row with more than this fraction of its bars changed is replaced as a whole
+        self.row_threshold = row_threshold
+        self.keep_items = keep_items
+        self.values = None
+        self.items = [] # Rows of QBarDataItem reused by barRows()
+
+    def barRows(self, values):
+        """Return the rows of QBarDataItem for a 2D array of values, reusing the
+        items of the last call where the number of columns is the same."""
+        values = np.asarray(values, dtype=float)
+        if not self.keep_items:
+            return createBarRows(values)
+        rows, columns = values.shape
+        if self.items and len(self.items[0]) != columns:
+            self.items = []
+        if len(self.items) < rows:
+            self.items.extend([QBarDataItem() for _ in range(columns)]
+                for _ in range(rows - len(self.items)))
+        item_rows = self.items[:rows]
+        # map() runs the setValue() calls without a Python loop body; deque() drains it
+        deque(map(QBarDataItem.setValue, chain.from_iterable(item_rows), values.ravel().tolist()),
+            maxlen=0)
+        return item_rows
+
+    def setValues(self, values, row_labels=None, column_labels=None):
+        """Replace all of the data in the proxy with values, and optionally the labels."""
+        self.values = np.array(values, dtype=float)
+        self.proxy.resetArray(self.barRows(self.values))
+        if row_labels is not None:
+            self.proxy.setRowLabels(list(row_labels))
+        if column_labels is not None:
+            self.proxy.setColumnLabels(list(column_labels))
+
+    def updateValues(self, values):
+        """Send only the values that differ from the current ones to the proxy. A
+        different shape replaces the whole array. Return the number of rows touched."""
+        values = np.asarray(values, dtype=float)
+        if self.values is None or values.shape != self.values.shape:
+            self.setValues(values)
+            return len(values)
+
+        # NaN != NaN, so bars that stay missing don't count as changed
+        changed = (values != self.values) & ~(np.isnan(values) & np.isnan(self.values))
+        changed_rows = np.flatnonzero(changed.any(axis=1))
+        for row in changed_rows.tolist():
+            columns = np.flatnonzero(changed[row])
+            if len(columns) > self.row_threshold * values.shape[1]:
+                self.updateRow(row, values[row])
+            else:
+                for column, value in zip(columns.tolist(), values[row, columns].tolist()):
+                    self.updateItem(row, column, value)
+        return len(changed_rows)
+
+    def updateRow(self, row, row_values):
+        """Replace the bars in one row."""
+        self.values[row] = row_values
+        self.proxy.setRow(row, self.barRows(self.values[row:row + 1])[0])
+
+    def updateItem(self, row, column, value):
+        """Replace the value of a single bar."""
+        self.values[row, column] = value
+        self.proxy.setItem(row, column, QBarDataItem(float(value)))
+
+    def appendRows(self, values, labels=None, window=None):
+        """Add rows after the current ones. If window is given, the oldest rows are
+        removed from the proxy so that at most window rows remain; rows that would be
+        removed straight away are never sent. Return the number of rows added."""
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        if self.values is None:
+            self.values = np.empty((0, values.shape[1]))
+        old_count = len(self.values)
+        self.values = np.vstack([self.values, values])
+
+        first_new = 0
+        if window is not None and len(self.values) > window:
+            excess = len(self.values) - window
+            self.values = self.values[excess:]
+            removed = min(excess, old_count)
+            if removed:
+                self.proxy.removeRows(0, removed)
+            first_new = excess - removed
+
+        rows = self.barRows(values[first_new:])
+        if labels is None:
+            self.proxy.addRows(rows)
+        else:
+            self.proxy.addRows(rows, list(labels)[first_new:])
+        return len(rows)
@@ -3,13 +3,14 @@ Written by Joshua Willman
 Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
 """
 # Import necessary modules
-import sys, csv
-import numpy as np
+import sys
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QVBoxLayout
-from PyQt5.QtDataVisualization import (Q3DBars, QBarDataItem, QBar3DSeries, 
+from PyQt5.QtDataVisualization import (Q3DBars, QBar3DSeries, 
     QValue3DAxis, Q3DCamera)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor
+from data_loader import loadTemperatureCSV
+from bar_data import BarDataBridge
 
 class SimpleBarGraph(QWidget):
 
@@ -31,20 +32,13 @@ class SimpleBarGraph(QWidget):
         header_label.setAlignment(Qt.AlignCenter)
 
         # Load the data about average temperatures in Reykjavík from the CSV file
-        temperature_data = self.loadCSVFile()
-        # Select 11 sample years: 1990-2000. Don't select the first and last columns 
-        rows, columns = temperature_data.shape
-        years = temperature_data[rows - 11:rows, 1]
-        monthly_temps = temperature_data[rows - 11:rows, 2:columns - 1].astype(float)
+        years, monthly_temps = self.loadCSVFile()
+        # Select 11 sample years: 1990-2000
+        years, monthly_temps = years[-11:], monthly_temps[-11:]
 
         bar_graph = Q3DBars() # Create instance for bar graph
         bar_graph.scene().activeCamera().setCameraPreset(Q3DCamera.CameraPresetFront)
 
-        # Create a list of QBarDataItem objects
-        data_items = []
-        for row in monthly_temps:
-            data_items.append([QBarDataItem(value) for value in row])
-
         months = ["January", "February", "March", "April", "May", "June",
         "July", "August", "September", "October", "November", "December"]
 
@@ -53,9 +47,10 @@ class SimpleBarGraph(QWidget):
         series = QBar3DSeries()
         series.setBaseColor(QColor("#17A4D9"))
         series.setSingleHighlightColor(QColor("#F8A307"))
-        series.dataProxy().addRows(data_items)
-        series.dataProxy().setRowLabels(years) # rowLabel
-        series.dataProxy().setColumnLabels(months) # colLabel
+        # The bridge converts the array into QBarDataItem objects in one call and
+        # keeps the values for later updates
+        self.bar_data = BarDataBridge(series.dataProxy())
+        self.bar_data.setValues(monthly_temps, row_labels=years, column_labels=months)
         
         # Create the valueLabel. Use QValue3dAxis so we can format the axis's label
         temperature_axis = QValue3DAxis()
@@ -79,14 +74,10 @@ class SimpleBarGraph(QWidget):
         self.setLayout(v_box)
 
     def loadCSVFile(self):
-        """Load the data from a CSV-formatted file using csv and numpy."""
+        """Load the data from a CSV-formatted file into typed numpy arrays. The second 
+        column holds the years; skip the first (nr) and last (arid) columns."""
         file_name = "files/Reykjavik_temp.csv"
-
-        with open(file_name, "r") as csv_f:
-            reader = csv.reader(csv_f)
-            header_labels = next(reader)
-            data = np.array(list(reader))
-        return data
+        return loadTemperatureCSV(file_name, year_column=1, first_month_column=2)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
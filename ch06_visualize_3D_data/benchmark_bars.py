@@ -0,0 +1,67 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules. Only the series' data proxy is timed, so no window is needed
+import sys, time, argparse
+import numpy as np
+from PyQt5.QtDataVisualization import QBarDataItem, QBar3DSeries
+from bar_data import BarDataBridge
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the size of the bar grid and
+    the number of rows changed by each update."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--rows", type=int, default=1000,
+        help="Number of rows in the bar grid")
+    parser.add_argument("-c", "--columns", type=int, default=1000,
+        help="Number of columns in the bar grid")
+    parser.add_argument("-u", "--updated-rows", type=int, default=10,
+        help="Number of rows changed by each update")
+    args = vars(parser.parse_args())
+    return args
+
+def measure(function):
+    """Return the time taken by function() in seconds."""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def addRowsPerItem(values):
+    """The original approach: a loop over NumPy rows, then addRows()."""
+    series = QBar3DSeries()
+    data_items = []
+    for row in values:
+        data_items.append([QBarDataItem(value) for value in row])
+    series.dataProxy().addRows(data_items)
+
+if __name__ == "__main__":
+    args = parseCommandLine()
+    rng = np.random.default_rng(34)
+    values = rng.uniform(-10, 40, size=(args["rows"], args["columns"]))
+    bars = values.size
+
+    series = QBar3DSeries()
+    bridge = BarDataBridge(series.dataProxy())
+    results = [
+        ("Per-item loop + addRows", measure(lambda: addRowsPerItem(values))),
+        ("BarDataBridge.setValues (new items)", measure(lambda: bridge.setValues(values))),
+        ("BarDataBridge.setValues (reused)", measure(lambda: bridge.setValues(values + 1.0)))]
+
+    # Change a few whole rows, then a few scattered bars
+    updated = values.copy()
+    rows = rng.choice(args["rows"], size=min(args["updated_rows"], args["rows"]), replace=False)
+    updated[rows] += 1.0
+    results.append(("updateValues ({} rows)".format(len(rows)),
+        measure(lambda: bridge.updateValues(updated))))
+    updated = updated.copy()
+    updated[rows, rng.integers(0, args["columns"], size=len(rows))] -= 1.0
+    results.append(("updateValues ({} bars)".format(len(rows)),
+        measure(lambda: bridge.updateValues(updated))))
+    results.append(("Full rebuild for the same change",
+        measure(lambda: bridge.setValues(updated))))
+
+    print("{}x{} bars ({} items)".format(args["rows"], args["columns"], bars))
+    for name, elapsed in results:
+        print("{:38} {:9.1f} ms".format(name, 1000 * elapsed))
+    sys.exit(0)
@@ -0,0 +1,49 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import os, sys, time, shutil, argparse, tempfile
+from series_registry import SeriesRegistry
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the numbers of cities to load."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--counts", type=int, nargs="+", default=[3, 50],
+        help="Numbers of city files to load")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+        help="Number of loader threads (default: ThreadPoolExecutor's default)")
+    args = vars(parser.parse_args())
+    return args
+
+def createCityFiles(folder, count):
+    """Copy the sample city files into folder until there are count of them. 
+    Return the dataset names."""
+    samples = ["files/LasVegas_temp.csv", "files/Spokane_temp.csv", "files/Richmond_temp.csv"]
+    names = []
+    for i in range(count):
+        name = "City{:03d}".format(i)
+        shutil.copy(samples[i % len(samples)], os.path.join(folder, name + "_temp.csv"))
+        names.append(name)
+    return names
+
+def timeLoad(folder, names, workers):
+    """Return the time taken to load the named datasets with a new registry."""
+    registry = SeriesRegistry()
+    registry.discover(folder, names=names)
+    start = time.perf_counter()
+    registry.load(max_workers=workers)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    args = parseCommandLine()
+    for count in args["counts"]:
+        with tempfile.TemporaryDirectory() as folder:
+            names = createCityFiles(folder, count)
+            # The files write their binary caches on the first load and read them after
+            first = timeLoad(folder, names, args["workers"])
+            second = timeLoad(folder, names, args["workers"])
+            serial = timeLoad(folder, names, 1)
+        print("{:3d} cities: first load {:6.1f} ms | second load {:6.1f} ms | 1 thread {:6.1f} ms".format(
+            count, 1000 * first, 1000 * second, 1000 * serial))
+    sys.exit(0)
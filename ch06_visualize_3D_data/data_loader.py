@@ -0,0 +1,132 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import os, csv, json, tempfile
+import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
+
+# Column type used in a schema for text columns that should be dictionary-encoded
+CATEGORY = "category"
+
+_PARSERS = {"f": float, "i": int, "u": int}
+
+# Bump when the layout of the cache files changes so that old caches are rebuilt
+CACHE_VERSION = 2
+
+def loadTypedCSV(file_name, schema, categories=None, has_header=True):
+    """Parse a CSV file straight into a NumPy structured array.
+    schema is a list of (column_name, type) pairs, where type is a NumPy dtype
+    string or CATEGORY. Categorical columns are dictionary-encoded to ints;
+    categories can hold the known labels for a column to fix their codes.
+    Return the structured array and a dict of the labels for each categorical column."""
+    categories = {name: list(labels) for name, labels in (categories or {}).items()}
+    lookups = {}
+    dtype, converters = [], []
+
+    for name, column_type in schema:
+        if column_type == CATEGORY:
+            labels = categories.setdefault(name, [])
+            lookups[name] = {label: code for code, label in enumerate(labels)}
+            dtype.append((name, "i4"))
+            converters.append(_encoder(lookups[name], labels))
+        else:
+            column_dtype = np.dtype(column_type)
+            dtype.append((name, column_dtype))
+            # Python's float() and int() parse text faster than the NumPy scalar types
+            converters.append(_PARSERS.get(column_dtype.kind, column_dtype.type))
+
+    with open(file_name, "r", newline="") as csv_f:
+        reader = csv.reader(csv_f)
+        if has_header:
+            next(reader)
+        # Convert each row as it is read so that no intermediate string array is built
+        rows = (tuple(convert(value) for convert, value in zip(converters, row))
+            for row in reader if row)
+        data = np.fromiter(rows, dtype=np.dtype(dtype))
+    return data, categories
+
+def loadCachedCSV(file_name, schema, categories=None, has_header=True):
+    """Load a CSV file through a binary sidecar cache (file_name + ".cache.npz").
+    The cache is used when it was built from the same file (path, size and 
+    modification time) with the same schema; otherwise the CSV is parsed with 
+    loadTypedCSV() and the cache is rebuilt. Return the same values as loadTypedCSV()."""
+    def parse():
+        data, labels = loadTypedCSV(file_name, schema, categories, has_header)
+        return {"data": data, "categories": np.array(json.dumps(labels))}
+
+    params = {"schema": schema, "categories": categories, "has_header": has_header}
+    arrays = loadCachedArrays(file_name, ".cache.npz", params, parse)
+    return arrays["data"], json.loads(str(arrays["categories"]))
+
+def loadCachedArrays(file_name, suffix, params, compute):
+    """Return the dict of arrays made by compute(), cached in file_name + suffix.
+    The cache is keyed by the source file (path, size and modification time) and by 
+    params, a JSON-serializable description of how the arrays are computed, so 
+    compute() only runs again when the data or the parameters change."""
+    cache_name = file_name + suffix
+    key = _cacheKey(file_name, params)
+
+    try:
+        with np.load(cache_name, allow_pickle=False) as cache:
+            if str(cache["key"]) == key:
+                return {name: cache[name] for name in cache.files if name != "key"}
+    except (OSError, KeyError, ValueError):
+        pass # No cache yet, or it can't be read; rebuild it below
+
+    arrays = compute()
+    _writeCache(cache_name, key, arrays, os.stat(file_name).st_mode)
+    return arrays
+
+def _cacheKey(file_name, params):
+    """Describe the source file and the parameters used to process it as a JSON string."""
+    stat = os.stat(file_name)
+    return json.dumps({"version": CACHE_VERSION, "path": os.path.abspath(file_name),
+        "size": stat.st_size, "mtime": stat.st_mtime_ns, "params": params}, sort_keys=True)
+
+def _writeCache(cache_name, key, arrays, source_mode):
+    """Write the cache to a temporary file and move it into place, so that a reader 
+    never sees a partly written cache. Caching is skipped if the folder is read-only.
+    The cache gets the read and write permissions of its source file, as mkstemp()
+    creates the file readable by its owner only."""
+    try:
+        fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(cache_name) or ".", suffix=".tmp")
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as cache_f:
+            np.savez(cache_f, key=np.array(key), **arrays)
+        os.chmod(temp_name, source_mode & 0o666)
+        os.replace(temp_name, cache_name)
+    except OSError:
+        os.remove(temp_name)
+
+def _encoder(lookup, labels):
+    """Return a function that maps a label to its integer code, adding new labels
+    to the end of labels."""
+    def encode(label):
+        code = lookup.get(label)
+        if code is None:
+            code = lookup[label] = len(labels)
+            labels.append(label)
+        return code
+    return encode
+
+def loadTemperatureCSV(file_name, year_column, first_month_column, month_count=12):
+    """Load a table of monthly temperatures. The columns are named by the file's 
+    header; year_column and first_month_column are column indices. 
+    Return the years as a list of str (used for row labels) and the monthly 
+    temperatures as a 2D float array with one row per year."""
+    with open(file_name, "r", newline="") as csv_f:
+        header_labels = next(csv.reader(csv_f))
+
+    schema = [(name, "i4" if i == year_column else "f8") 
+        for i, name in enumerate(header_labels)]
+    data, _ = loadCachedCSV(file_name, schema)
+
+    month_names = header_labels[first_month_column:first_month_column + month_count]
+    years = [str(year) for year in data[header_labels[year_column]]]
+    monthly_temps = structured_to_unstructured(data[month_names], dtype=float)
+    return years, monthly_temps
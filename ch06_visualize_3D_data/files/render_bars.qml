@@ -0,0 +1,8 @@
+import QtQuick 2.0
+import QtDataVisualization 1.2
+
+// Empty bar graph for render_views.py, which adds the series and axes. Indirect
+// rendering draws into a framebuffer object, so no window surface is needed
+Bars3D {
+    renderingMode: AbstractGraph3D.RenderIndirect
+}
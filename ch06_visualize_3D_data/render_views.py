@@ -0,0 +1,217 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules. Q3DBars needs a window surface to render, which servers
+# without a display don't have, so the graph is a Bars3D QML item in a hidden
+# QQuickWidget instead; it renders into a framebuffer object. By default Qt uses the
+# eglfs platform on Mesa's surfaceless EGL, which needs neither a display nor a GPU
+# (Mesa falls back to its llvmpipe software rasterizer). /dev/null stands in for the
+# framebuffer device that eglfs opens. Set QT_QPA_PLATFORM to use another platform
+import os, sys, json, time, argparse
+for variable, value in {"QT_QPA_PLATFORM": "eglfs", "EGL_PLATFORM": "surfaceless",
+        "QT_QPA_EGLFS_INTEGRATION": "none", "QT_QPA_EGLFS_FB": "/dev/null"}.items():
+    os.environ.setdefault(variable, value)
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtQuickWidgets import QQuickWidget
+from PyQt5.QtGui import QShowEvent, QResizeEvent
+from PyQt5.QtDataVisualization import Q3DCamera
+from PyQt5.QtCore import Qt, QObject, QSize, QUrl, QCoreApplication
+from bar_3D_multiseries import SimpleBarGraph, THEMES, BAR_STYLES
+from aggregation import STATISTICS
+
+BARS_QML = os.path.join(os.path.dirname(os.path.abspath(__file__)), "files", "render_bars.qml")
+
+# Settings used for any that a view and the spec's defaults leave out
+VIEW_DEFAULTS = {"camera": "Front", "theme": "Qt", "series": None, "bar_style": "Bar",
+    "smooth": False, "background": True, "grid": True, "granularity": "month",
+    "statistic": "Mean"}
+
+def parseCommandLine():
+    """Use argparse to parse the command line for the spec file and the output options."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-s", "--spec", type=str, default="files/report_views.json",
+        help="JSON file with the views to render")
+    parser.add_argument("-o", "--output-dir", type=str, default="snapshots",
+        help="Folder for the PNG images")
+    parser.add_argument("--size", type=int, nargs=2, default=None, metavar=("WIDTH", "HEIGHT"),
+        help="Image size; overrides the spec's size")
+    parser.add_argument("--msaa", type=int, default=0,
+        help="Multisampling samples; 0 is fastest with software OpenGL. OpenGL ES, \
+            which the default platform gives, doesn't support it")
+    parser.add_argument("--dry-run", action="store_true",
+        help="Only check the spec; nothing is loaded or rendered")
+    args = vars(parser.parse_args())
+    return args
+
+def loadSpec(file_name):
+    """Read the spec file. It is a JSON object of the form
+        {"cities": [...], "size": [width, height], "defaults": {...}, "views": [{...}, ...]}
+    where each view has a name and any of the keys in VIEW_DEFAULTS. camera is the
+    end of a Q3DCamera preset name (e.g. "IsometricLeftHigh"), theme and bar_style
+    are names from the Style tab, series lists the cities to show (all if null) and
+    statistic is a name from the Show Statistic combo box. Return the spec with every
+    view resolved to Qt values; raise ValueError for unknown settings."""
+    with open(file_name, "r") as json_f:
+        spec = json.load(json_f)
+    spec.setdefault("cities", ["LasVegas", "Spokane", "Richmond"])
+    spec.setdefault("size", [1280, 960])
+
+    defaults = dict(VIEW_DEFAULTS, **spec.get("defaults", {}))
+    views = []
+    for view in spec["views"]:
+        settings = dict(defaults, **view)
+        name = settings.get("name")
+        if not name:
+            raise ValueError("Every view needs a name: {}".format(view))
+        try:
+            views.append({"name": name,
+                "camera": getattr(Q3DCamera, "CameraPreset" + settings["camera"]),
+                "theme": THEMES.index(settings["theme"]),
+                "series": spec["cities"] if settings["series"] is None else settings["series"],
+                "bar_style": BAR_STYLES[settings["bar_style"]],
+                "smooth": bool(settings["smooth"]),
+                "background": bool(settings["background"]),
+                "grid": bool(settings["grid"]),
+                "granularity": settings["granularity"],
+                "statistic": STATISTICS[settings["statistic"]]})
+        except (AttributeError, KeyError, ValueError) as error:
+            raise ValueError("Unknown setting in view {}: {}".format(name, error))
+        unknown = set(views[-1]["series"]) - set(spec["cities"])
+        if unknown:
+            raise ValueError("View {} shows cities that aren't loaded: {}".format(name, sorted(unknown)))
+    spec["views"] = views
+    return spec
+
+def applyView(window, view):
+    """Set up the graph in window for view through its GraphModifier, the same way
+    the widgets in the window's toolbox do."""
+    modifier = window.modifier
+    modifier.setCameraPreset(view["camera"])
+    # A theme sets its own background and grid, so apply those afterwards
+    modifier.changeTheme(view["theme"])
+    modifier.showOrHideBackground(view["background"])
+    modifier.showOrHideGrid(view["grid"])
+    modifier.setBarStyle(view["bar_style"])
+    modifier.smoothenBars(view["smooth"])
+    for city, series in window.series.items():
+        modifier.showOrHideSeries(series, Qt.Checked if city in view["series"] else Qt.Unchecked)
+    modifier.granularity, modifier.statistic = view["granularity"], view["statistic"]
+    window.showRollup(view["granularity"], view["statistic"])
+
+class QuickBarGraph(QObject):
+    """Bars3D QML item in a hidden QQuickWidget, with the methods of Q3DBars that
+    SimpleBarGraph and GraphModifier use. The item's scene, theme and axes are read
+    through the QML engine, which returns them as Q3DScene, Q3DTheme and axis objects."""
+
+    def __init__(self):
+        super().__init__()
+        self.view = QQuickWidget()
+        self.view.setResizeMode(QQuickWidget.SizeRootObjectToView)
+        self.view.setSource(QUrl.fromLocalFile(BARS_QML))
+        if self.view.status() != QQuickWidget.Ready:
+            raise RuntimeError("Could not load {}: {}".format(BARS_QML,
+                "; ".join(error.toString() for error in self.view.errors())))
+        self.item = self.view.rootObject()
+        self.item_value = self.view.engine().newQObject(self.item)
+        self.series = []
+        self.shown = False
+
+    def itemProperty(self, name):
+        return self.item_value.property(name).toQObject()
+
+    def scene(self):
+        return self.itemProperty("scene")
+
+    def activeTheme(self):
+        return self.itemProperty("theme")
+
+    def axes(self):
+        # Same order as GraphModifier expects: columns (months), rows (years), values
+        return [self.itemProperty(name) for name in ("columnAxis", "rowAxis", "valueAxis")]
+
+    def seriesList(self):
+        return list(self.series)
+
+    def setMultiSeriesUniform(self, uniform):
+        self.item.setProperty("multiSeriesUniform", uniform)
+
+    def setValueAxis(self, axis):
+        axis.setParent(self) # Kept by Python, not by the QML engine
+        self.item.setProperty("valueAxis", axis)
+
+    def setSelectionMode(self, mode):
+        self.item.setProperty("selectionMode", int(mode))
+
+    def setPrimarySeries(self, series):
+        self.addSeries(series)
+        self.item.setProperty("primarySeries", series)
+
+    def addSeries(self, series):
+        if series in self.series:
+            return
+        # A series with a parent stays owned by Python when the engine wraps it
+        series.setParent(self)
+        add_series = self.item_value.property("addSeries")
+        add_series.callWithInstance(self.item_value, [self.view.engine().newQObject(series)])
+        self.series.append(series)
+
+    def renderToImage(self, msaa, size):
+        """Render the graph at size and return the image. The widget is never shown,
+        so it is sent the show and resize events that create its framebuffer object."""
+        self.item.setProperty("msaaSamples", msaa)
+        if self.view.size() != size:
+            old_size = self.view.size()
+            self.view.resize(size)
+            QApplication.sendEvent(self.view, QResizeEvent(size, old_size))
+        if not self.shown:
+            QApplication.sendEvent(self.view, QShowEvent())
+            self.shown = True
+        return self.view.grabFramebuffer()
+
+class BarGraphRenderer(SimpleBarGraph):
+    """SimpleBarGraph window, never shown, whose graph is a QuickBarGraph."""
+
+    def createGraph(self):
+        return QuickBarGraph()
+
+    def createGraphContainer(self, bar_graph):
+        return bar_graph.view
+
+def renderViews(spec, output_dir, size, msaa=0):
+    """Render every view of the spec with one graph. Return a list of (path, seconds)
+    pairs, where seconds covers applying the view and rendering it, but not saving."""
+    os.makedirs(output_dir, exist_ok=True)
+    window = BarGraphRenderer(spec["cities"], show=False) # Built once and reused for every view
+    graph = window.modifier.graph
+
+    timings = []
+    for view in spec["views"]:
+        path = os.path.join(output_dir, view["name"] + ".png")
+        start = time.perf_counter()
+        applyView(window, view)
+        image = graph.renderToImage(msaa, QSize(*size))
+        elapsed = time.perf_counter() - start
+        if image.isNull() or not image.save(path):
+            raise RuntimeError("Could not render {}; is OpenGL available?".format(view["name"]))
+        timings.append((path, elapsed))
+    return timings
+
+if __name__ == "__main__":
+    args = parseCommandLine() # Return any command line arguments
+    spec = loadSpec(args["spec"])
+    if args["dry_run"]:
+        print("[INFO] {} views in {} are valid.".format(len(spec["views"]), args["spec"]))
+        sys.exit(0)
+
+    # QQuickWidget renders with a context that shares its resources with the others
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv)
+    timings = renderViews(spec, args["output_dir"], args["size"] or spec["size"], args["msaa"])
+
+    for path, elapsed in timings:
+        print("{:50} {:8.1f} ms".format(path, 1000 * elapsed))
+    total = sum(elapsed for _, elapsed in timings)
+    print("[INFO] Rendered {} images in {:.2f} s ({:.1f} ms per image).".format(
+        len(timings), total, 1000 * total / max(1, len(timings))))
+    sys.exit(0)
@@ -0,0 +1,51 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import os, glob
+from concurrent.futures import ThreadPoolExecutor
+from data_loader import loadTemperatureCSV
+
+class SeriesRegistry:
+    """Registry of the datasets shown as series in a bar graph. Each dataset has a
+    name and a CSV file with the years in year_column followed by the monthly
+    temperatures. load() reads all of the files in a pool of threads."""
+
+    def __init__(self, year_column=0, first_month_column=1):
+        self.year_column = year_column
+        self.first_month_column = first_month_column
+        self.files = {} # Dataset name: file name, in the order they were registered
+        self.datasets = {} # Dataset name: (years, monthly temperatures), once loaded
+
+    def register(self, name, file_name):
+        """Add a dataset. Registering a name again replaces its file."""
+        self.files[name] = file_name
+        self.datasets.pop(name, None)
+
+    def discover(self, folder, pattern="*_temp.csv", names=None):
+        """Register the files in folder that match pattern. The dataset name is the
+        part of the file name before the first underscore, e.g. LasVegas_temp.csv
+        is LasVegas. If names is given, only those datasets are registered, in that order."""
+        found = {os.path.basename(path).split("_")[0]: path
+            for path in sorted(glob.glob(os.path.join(folder, pattern)))}
+        for name in (names if names is not None else found):
+            if name not in found:
+                raise FileNotFoundError("No {} file for {} in {}".format(pattern, name, folder))
+            self.register(name, found[name])
+
+    def names(self):
+        return list(self.files)
+
+    def load(self, max_workers=None):
+        """Load every registered dataset that isn't loaded yet, in parallel. Each file
+        is parsed once and then read from its binary sidecar cache (see loadCachedCSV),
+        which spends its time in NumPy and file I/O, so threads overlap well.
+        Return the datasets as a dict in registration order."""
+        pending = [name for name in self.files if name not in self.datasets]
+        if pending:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(lambda name: loadTemperatureCSV(self.files[name],
+                    self.year_column, self.first_month_column), pending)
+                self.datasets.update(zip(pending, results))
+        return {name: self.datasets[name] for name in self.files}
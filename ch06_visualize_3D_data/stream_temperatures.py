@@ -0,0 +1,60 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules. Simulates sensors for the streaming mode of bar_3D_multiseries
+import sys, time, socket, argparse
+import numpy as np
+from data_loader import loadTemperatureCSV
+
+def parseCommandLine():
+    """Use argparse to parse the command line for where the rows are sent and how fast."""
+    parser = argparse.ArgumentParser()
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--csv", type=str, help="CSV file to append the rows to")
+    target.add_argument("--socket", type=str, help="Path of the local socket to send the rows to")
+    parser.add_argument("-r", "--rate", type=float, default=100,
+        help="Rows sent per second, for each city")
+    parser.add_argument("-n", "--count", type=int, default=0,
+        help="Number of rows for each city; 0 keeps sending until interrupted")
+    args = vars(parser.parse_args())
+    return args
+
+def generateRows(cities, rng):
+    """Yield one line per city at a time: the city's mean monthly temperatures
+    with some noise, labeled with a running index."""
+    means = {city: loadTemperatureCSV("files/{}_temp.csv".format(city), 0, 1)[1].mean(axis=0)
+        for city in cities}
+    index = 0
+    while True:
+        for city in cities:
+            values = means[city] + rng.normal(0, 2, size=len(means[city]))
+            yield "{},{},{}\n".format(city, index, ",".join("{:.1f}".format(v) for v in values))
+        index += 1
+
+if __name__ == "__main__":
+    args = parseCommandLine()
+    cities = ["LasVegas", "Spokane", "Richmond"]
+    rows = generateRows(cities, np.random.default_rng(35))
+
+    if args["socket"]:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(args["socket"])
+        send = lambda line: connection.sendall(line.encode("utf-8"))
+    else:
+        csv_f = open(args["csv"], "a")
+        send = lambda line: (csv_f.write(line), csv_f.flush())
+
+    sent, delay = 0, 1 / args["rate"]
+    start = time.perf_counter()
+    try:
+        while args["count"] == 0 or sent < args["count"]:
+            for city in cities:
+                send(next(rows))
+            sent += 1
+            # Sleep until the next row is due, so the rate holds over time
+            time.sleep(max(0.0, start + sent * delay - time.perf_counter()))
+    except KeyboardInterrupt:
+        pass
+    print("[INFO] Sent {} rows for each city.".format(sent))
+    sys.exit(0)
@@ -0,0 +1,143 @@
+"""
+Written by Joshua Willman
+Featured in "Modern Pyqt - Create GUI Applications for Project Management, Computer Vision, and Data Analysis"
+"""
+# Import necessary modules
+import os, time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer
+
+def parseStreamLines(lines):
+    """Parse lines of the form "series,label,value,value,..." into a list of
+    (series, label, values) tuples. Lines that can't be parsed, such as headers
+    or blank lines, are skipped."""
+    rows = []
+    for line in lines:
+        fields = line.strip().split(",")
+        if len(fields) < 3:
+            continue
+        try:
+            values = [float(value) for value in fields[2:]]
+        except ValueError:
+            continue
+        rows.append((fields[0], fields[1], values))
+    return rows
+
+class TailedCSVSource(QObject):
+    """Poll a CSV file that another process appends to and emit the rows added
+    since the last poll. Only rows written after the source starts are read,
+    unless from_start is True."""
+    rows_received = pyqtSignal(list)
+
+    def __init__(self, file_name, interval=50, from_start=False, parent=None):
+        super().__init__(parent)
+        self.file_name = file_name
+        self.position = 0 if from_start or not os.path.exists(file_name) else os.path.getsize(file_name)
+        self.partial_line = ""
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(interval)
+        self.poll_timer.timeout.connect(self.readNewRows)
+        self.poll_timer.start()
+
+    def readNewRows(self):
+        """Read whatever was appended to the file. A line without its newline yet is
+        kept until the rest of it arrives. If the file shrank, start from the top again."""
+        if not os.path.exists(self.file_name):
+            return
+        if os.path.getsize(self.file_name) < self.position:
+            self.position, self.partial_line = 0, ""
+        with open(self.file_name, "r") as csv_f:
+            csv_f.seek(self.position)
+            text = csv_f.read()
+            self.position = csv_f.tell()
+        if not text:
+            return
+
+        lines = (self.partial_line + text).split("\n")
+        self.partial_line = lines.pop()
+        rows = parseStreamLines(lines)
+        if rows:
+            self.rows_received.emit(rows)
+
+class LocalSocketSource(QObject):
+    """Listen on a local socket (a Unix domain socket on Linux and macOS) and emit
+    the rows that the connected clients send, one line per row."""
+    rows_received = pyqtSignal(list)
+
+    def __init__(self, server_name, parent=None):
+        super().__init__(parent)
+        self.partial_lines = {}
+
+        self.server = QLocalServer(self)
+        QLocalServer.removeServer(server_name) # Left behind if the app crashed
+        if not self.server.listen(server_name):
+            raise OSError("Could not listen on {}: {}".format(server_name, self.server.errorString()))
+        self.server.newConnection.connect(self.acceptConnection)
+
+    def acceptConnection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.partial_lines[socket] = ""
+            socket.readyRead.connect(lambda socket=socket: self.readNewRows(socket))
+            socket.disconnected.connect(lambda socket=socket: self.closeConnection(socket))
+
+    def readNewRows(self, socket):
+        text = bytes(socket.readAll()).decode("utf-8", errors="replace")
+        lines = (self.partial_lines[socket] + text).split("\n")
+        self.partial_lines[socket] = lines.pop()
+        rows = parseStreamLines(lines)
+        if rows:
+            self.rows_received.emit(rows)
+
+    def closeConnection(self, socket):
+        self.partial_lines.pop(socket, None)
+        socket.deleteLater()
+
+class StreamBatcher(QObject):
+    """Collect the rows from a source and apply them to the BarDataBridge of each
+    series at most fps times a second, sliding each series to its last window rows.
+    flushed is emitted after each batch with the number of rows and the time taken."""
+    flushed = pyqtSignal(int, float)
+
+    def __init__(self, bridges, window, fps=30, parent=None):
+        super().__init__(parent)
+        self.bridges = bridges
+        self.window = window
+        self.pending = {}
+        self.total_rows, self.total_time = 0, 0.0
+
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setInterval(max(1, round(1000 / fps)))
+        self.frame_timer.timeout.connect(self.flush)
+        self.frame_timer.start()
+
+    def addRows(self, rows):
+        """Queue rows from a source. Rows for unknown series, or with a different
+        number of values than the series has columns, are ignored."""
+        for series_name, label, values in rows:
+            bridge = self.bridges.get(series_name)
+            if bridge is None or (bridge.values is not None and len(values) != bridge.values.shape[1]):
+                continue
+            self.pending.setdefault(series_name, []).append((label, values))
+
+    def flush(self):
+        """Send the queued rows to the data proxies, one call per series."""
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+
+        start = time.perf_counter()
+        row_count = 0
+        for series_name, rows in pending.items():
+            labels, values = zip(*rows)
+            row_count += self.bridges[series_name].appendRows(values, labels, self.window)
+        elapsed = time.perf_counter() - start
+
+        self.total_rows += row_count
+        self.total_time += elapsed
+        self.flushed.emit(row_count, elapsed)
+
+    def costPerRow(self):
+        """Return the mean update time per row in seconds."""
+        return self.total_time / self.total_rows if self.total_rows else 0.0